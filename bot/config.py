@@ -9,26 +9,35 @@ LATEX_PREAMBLE_PATH = BASE_DIR / "templates" / "latex_preamble.tex"
 PUPPETEER_CONFIG_PATH = BASE_DIR / "puppeteer-config.json"
 MERMAID_FILTER_PATH = BASE_DIR / "pandoc_mermaid_filter.py"
 MATH_FILTER_PATH = BASE_DIR / "pandoc_math_filter.lua"
+# Per-build topics_data cache (JSON). Created with mode 0o700, never in the shared temp dir.
+TOPICS_DATA_CACHE_DIR = Path(
+    os.getenv("TOPICS_DATA_CACHE_DIR", str(Path.home() / ".cache" / "matplobbot"))
+)
 
 LATEX_POSTAMBLE = r"\end{document}"
 MD_LATEX_PADDING = 15
 SEARCH_RESULTS_PER_PAGE = 10
 
-# Parse comma-separated string of admin IDs into a list of integers
+# Parse comma-separated string of admin IDs once at import. A frozenset keeps the
+# `user_id in ADMIN_USER_IDS` checks done on every keyboard build O(1).
 admin_ids_str = os.getenv("ADMIN_USER_IDS", "")
 if not admin_ids_str:
     logging.warning(
         "ADMIN_USER_IDS environment variable is not set. Admin commands will be disabled."
     )
-    ADMIN_USER_IDS = []
+    ADMIN_USER_IDS: frozenset[int] = frozenset()
 else:
-    ADMIN_USER_IDS = [
+    ADMIN_USER_IDS = frozenset(
         int(admin_id.strip()) for admin_id in admin_ids_str.split(",") if admin_id.strip().isdigit()
-    ]
+    )
 
 MD_SEARCH_BRANCH = "main"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
+# Read once here; main() refuses to start without a token instead of building Bot(None).
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+POLLING_RETRY_DELAY_SECONDS = float(os.getenv("BOT_POLLING_RETRY_DELAY_SECONDS", "15"))
+
 
 with open(PANDOC_HEADER_PATH, encoding="utf-8") as f:
     PANDOC_HEADER_INCLUDES = f.read()
@@ -18,6 +18,9 @@ from shared_lib.database import (
 from shared_lib.database import (
     delete_user_search_preset as delete_user_search_preset,
 )
+from shared_lib.database import (
+    ensure_user_exists as ensure_user_exists,
+)
 from shared_lib.database import (
     get_admin_daily_summary as get_admin_daily_summary,
 )
@@ -72,6 +75,9 @@ from shared_lib.database import (
 from shared_lib.database import (
     log_user_action as log_user_action,
 )
+from shared_lib.database import (
+    log_user_actions_batch as log_user_actions_batch,
+)
 from shared_lib.database import (
     regenerate_calendar_secret as regenerate_calendar_secret,
 )
@@ -141,7 +147,9 @@ __all__ = [
     "set_onboarding_completed",
     "add_schedule_subscription",
     "get_subscriptions_for_notification",
+    "ensure_user_exists",
     "log_user_action",
+    "log_user_actions_batch",
     "get_user_subscriptions",
     "update_subscription_hash",
     "get_or_create_calendar_secret",
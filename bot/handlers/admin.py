@@ -280,56 +280,53 @@ class AdminManager:
 
         # 2. Fetch Pending Shorter Name Offers
         try:
-            pending_offers_raw = await redis_client.client.lrange("pending_shorter_offers", 0, -1)
-            if pending_offers_raw:
-                summary_parts.append(
-                    "\n\n" + translator.gettext(lang, "admin_summary_pending_offers_header")
-                )
-
-                for offer_raw in pending_offers_raw:
-                    offer = json.loads(offer_raw)
-                    notification_text = translator.gettext(
-                        lang,
-                        "shorter_name_admin_notification",
-                        user_id=offer["user_id"],
-                        user_name=offer["user_name"],
-                        full_name=offer["full_name"],
-                        short_name=offer["short_name"],
-                    )
-
-                    data_to_hash = f"{offer['user_id']}:{offer['full_name']}:{offer['short_name']}"
-                    data_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()[:24]
-
-                    builder = InlineKeyboardBuilder()
-                    builder.row(
-                        InlineKeyboardButton(
-                            text="✅ Одобрить",
-                            callback_data=f"shorter_name_admin:approve:{data_hash}",
-                        ),
-                        InlineKeyboardButton(
-                            text="❌ Отклонить",
-                            callback_data=f"shorter_name_admin:decline:{data_hash}",
-                        ),
-                    )
-                    # Send the message and store its ID for potential future edits
-                    sent_message = await bot.send_message(
-                        admin_id,
-                        notification_text,
-                        reply_markup=builder.as_markup(),
-                        parse_mode="Markdown",
+            header_added = False
+            # Looked up once; offer dicts carry every field the template uses
+            notification_template = translator.get_template(lang, "shorter_name_admin_notification")
+            async for suggestion_id, offer_raw in redis_client.iter_pending_offers():
+                if not header_added:
+                    summary_parts.append(
+                        "\n\n" + translator.gettext(lang, "admin_summary_pending_offers_header")
                     )
+                    header_added = True
+
+                offer = json.loads(offer_raw)
+                notification_text = notification_template.format_map(offer)
+
+                data_to_hash = f"{offer['user_id']}:{offer['full_name']}:{offer['short_name']}"
+                data_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()[:24]
+
+                builder = InlineKeyboardBuilder()
+                builder.row(
+                    InlineKeyboardButton(
+                        text="✅ Одобрить",
+                        callback_data=f"shorter_name_admin:approve:{data_hash}",
+                    ),
+                    InlineKeyboardButton(
+                        text="❌ Отклонить",
+                        callback_data=f"shorter_name_admin:decline:{data_hash}",
+                    ),
+                )
+                # Send the message and store its ID for potential future edits
+                sent_message = await bot.send_message(
+                    admin_id,
+                    notification_text,
+                    reply_markup=builder.as_markup(),
+                    parse_mode="Markdown",
+                )
 
-                    # --- REFACTOR: Use Redis instead of in-memory cache ---
-                    # Store the suggestion context in Redis with a TTL (e.g., 7 days)
-                    # This makes the approval/decline buttons stateful across restarts.
-                    redis_key = f"suggestion_cache:{data_hash}"
-                    payload_to_cache = {
-                        "data": data_to_hash,
-                        "user_name": offer["user_name"],  # Store the user_name
-                        "messages": [{"chat_id": admin_id, "message_id": sent_message.message_id}],
-                    }
-                    # We use set_cache which handles JSON serialization. TTL is in seconds.
-                    await redis_client.set_cache(redis_key, payload_to_cache, ttl=604800)  # 7 days
+                # --- REFACTOR: Use Redis instead of in-memory cache ---
+                # Store the suggestion context in Redis with a TTL (e.g., 7 days)
+                # This makes the approval/decline buttons stateful across restarts.
+                redis_key = f"suggestion_cache:{data_hash}"
+                payload_to_cache = {
+                    "data": data_to_hash,
+                    "suggestion_id": suggestion_id,
+                    "user_name": offer["user_name"],  # Store the user_name
+                    "messages": [{"chat_id": admin_id, "message_id": sent_message.message_id}],
+                }
+                # We use set_cache which handles JSON serialization. TTL is in seconds.
+                await redis_client.set_cache(redis_key, payload_to_cache, ttl=604800)  # 7 days
 
         except Exception as e:
             logging.error(f"Failed to process pending shorter name offers: {e}", exc_info=True)
@@ -48,16 +48,19 @@ class MentionedFilter(Filter):
             return False
 
         # Check if the message has entities and any of them is a 'mention'
-        if not message.entities:
+        entities = message.entities
+        if not entities or not any(entity.type == "mention" for entity in entities):
             return False
 
-        me = await bot.get_me()
-        bot_username = me.username
-
+        # Bot.me() caches the getMe result on the bot, unlike get_me()
+        me = await bot.me()
+        mention = f"@{me.username}"
+        text = message.text
         return any(
             entity.type == "mention"
-            and message.text[entity.offset : entity.offset + entity.length] == f"@{bot_username}"
-            for entity in message.entities
+            and entity.length == len(mention)
+            and text.startswith(mention, entity.offset)
+            for entity in entities
         )
 
 
@@ -193,6 +196,7 @@ class BaseManager:
         settings = await database.get_user_settings(user_id)
         settings["language"] = lang_code
         await database.update_user_settings_db(user_id, settings)
+        kb.invalidate_language_cache(user_id)
 
         await callback.answer(translator.gettext(lang_code, "language_chosen"))
 
@@ -405,7 +409,7 @@ class BaseManager:
     async def command_start_group(self, message: Message):
         """Handler for /start or /help in a group chat."""
         lang = await translator.get_language(message.from_user.id, message.chat.id)
-        bot_info = await message.bot.get_me()
+        bot_info = await message.bot.me()
         bot_username = bot_info.username
 
         # Create a button that links to a private chat with the bot
@@ -1,8 +1,6 @@
 # bot/handlers/github.py
 import asyncio
-import hashlib
 import logging
-import os
 import re
 
 import aiohttp
@@ -27,6 +25,7 @@ from shared_lib.redis_client import redis_client
 from .. import database
 from .. import keyboards as kb
 from ..config import *
+from ..config import GITHUB_TOKEN
 from ..services import github_display
 from ..services.repo_indexer import index_github_repository
 from ..services.search_center import search_repository_markdown
@@ -98,7 +97,7 @@ class GitHubManager:
 
         builder = InlineKeyboardBuilder()
         for repo in repos:
-            repo_hash = hashlib.sha1(repo.encode()).hexdigest()[:16]
+            repo_hash = kb.callback_hash(repo)
             kb.code_path_cache[repo_hash] = repo
             builder.row(
                 InlineKeyboardButton(text=repo, callback_data=f"lec_browse_repo:{repo_hash}")
@@ -189,7 +188,7 @@ class GitHubManager:
         page_items = results[start:end]
 
         for item in page_items:
-            path_hash = hashlib.sha1(item["path"].encode()).hexdigest()[:16]
+            path_hash = kb.callback_hash(item["path"])
             kb.code_path_cache[path_hash] = item["path"]
             builder.row(
                 InlineKeyboardButton(
@@ -231,7 +230,8 @@ class GitHubManager:
         return builder.as_markup()
 
     async def _search_github_md(self, query: str, repo_path: str) -> list[dict] | None:
-        github_token = os.getenv("GITHUB_TOKEN")
+        # Read once at import in bot.config instead of from the environment per search
+        github_token = GITHUB_TOKEN
         if not github_token:
             logging.error("GITHUB_TOKEN environment variable not set. Markdown search is disabled.")
             return None
@@ -283,7 +283,7 @@ class GitHubManager:
 
         builder = InlineKeyboardBuilder()
         for repo in repos:
-            repo_hash = hashlib.sha1(repo.encode()).hexdigest()[:16]
+            repo_hash = kb.callback_hash(repo)
             kb.code_path_cache[repo_hash] = repo
             builder.row(
                 InlineKeyboardButton(text=repo, callback_data=f"lec_search_repo:{repo_hash}")
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 
 import matplobblib
@@ -70,7 +69,7 @@ class LibraryManager:
             header_text = translator.gettext(lang, "matp_all_select_submodule")
             items = sorted(matplobblib.submodules)
             for item in items:
-                path_hash = hashlib.sha1(item.encode()).hexdigest()[:16]
+                path_hash = kb.callback_hash(item)
                 kb.code_path_cache[path_hash] = item
                 builder.row(
                     InlineKeyboardButton(
@@ -85,7 +84,7 @@ class LibraryManager:
             start, end = page * SEARCH_RESULTS_PER_PAGE, (page + 1) * SEARCH_RESULTS_PER_PAGE
             for item in all_topics[start:end]:
                 full_path = f"{submodule}.{item}"
-                path_hash = hashlib.sha1(full_path.encode()).hexdigest()[:16]
+                path_hash = kb.callback_hash(full_path)
                 kb.code_path_cache[path_hash] = full_path
                 builder.row(
                     InlineKeyboardButton(
@@ -108,7 +107,7 @@ class LibraryManager:
             start, end = page * SEARCH_RESULTS_PER_PAGE, (page + 1) * SEARCH_RESULTS_PER_PAGE
             for item in all_codes[start:end]:
                 full_code_path = f"{path}.{item}"
-                path_hash = hashlib.sha1(full_code_path.encode()).hexdigest()[:16]
+                path_hash = kb.callback_hash(full_code_path)
                 kb.code_path_cache[path_hash] = full_code_path
                 builder.row(
                     InlineKeyboardButton(
@@ -117,7 +116,7 @@ class LibraryManager:
                 )
 
             back_path = submodule
-            path_hash = hashlib.sha1(back_path.encode()).hexdigest()[:16]
+            path_hash = kb.callback_hash(back_path)
             kb.code_path_cache[path_hash] = back_path
             builder.row(
                 InlineKeyboardButton(
@@ -154,7 +153,7 @@ class LibraryManager:
         total_pages = (total_items + SEARCH_RESULTS_PER_PAGE - 1) // SEARCH_RESULTS_PER_PAGE
         if total_pages > 1:
             pagination_buttons = []
-            path_hash = hashlib.sha1(path.encode()).hexdigest()[:16]
+            path_hash = kb.callback_hash(path)
             kb.code_path_cache[path_hash] = path
             if page > 0:
                 pagination_buttons.append(
@@ -354,7 +353,7 @@ class LibraryManager:
 
         builder = InlineKeyboardBuilder()
         for code_path in favs:
-            path_hash = hashlib.sha1(code_path.encode()).hexdigest()[:16]
+            path_hash = kb.callback_hash(code_path)
             kb.code_path_cache[path_hash] = code_path
             builder.row(
                 InlineKeyboardButton(
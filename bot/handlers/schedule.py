@@ -21,6 +21,7 @@ from bot.keyboards import (
     InlineKeyboardButton,
     build_calendar_keyboard,
     build_search_results_keyboard,
+    callback_hash,
     code_path_cache,
     get_modules_keyboard,
     get_myschedule_calendar_keyboard,
@@ -63,6 +64,8 @@ from shared_lib.services.schedule_service import (
 )
 from shared_lib.services.university_api import RuzAPIClient  # Import the class for type hinting
 
+from .settings import invalidate_subscription_list_cache
+
 router = Router()
 module_name_cache = {}
 MOSCOW_TZ = ZoneInfo("Europe/Moscow")
@@ -258,16 +261,17 @@ class ScheduleManager:
         self, lang: str, results: list[dict], search_type: str
     ):
         base_markup = build_search_results_keyboard(results, search_type)
-        builder = InlineKeyboardBuilder()
-        for row in base_markup.inline_keyboard:
-            builder.row(*row)
-        builder.row(
-            InlineKeyboardButton(
-                text=translator.gettext(lang, "search_preset_save_button"),
-                callback_data="search_preset_save:schedule",
-            )
+        # Append the preset row to the result rows directly instead of copying them
+        # through a builder
+        base_markup.inline_keyboard.append(
+            [
+                InlineKeyboardButton(
+                    text=translator.gettext(lang, "search_preset_save_button"),
+                    callback_data="search_preset_save:schedule",
+                )
+            ]
         )
-        return builder.as_markup()
+        return base_markup
 
     async def handle_search_query(self, message: Message, state: FSMContext):
         user_id = message.from_user.id
@@ -366,7 +370,7 @@ class ScheduleManager:
         now = datetime.now()
 
         if len(entity_id) > 32:
-            id_hash = hashlib.sha1(entity_id.encode()).hexdigest()[:16]
+            id_hash = callback_hash(entity_id)
             code_path_cache[id_hash] = entity_id
             entity_id_for_callback = id_hash
         else:
@@ -509,7 +513,7 @@ class ScheduleManager:
 
         safe_entity_id = entity_id
         if len(entity_id) > 20:
-            id_hash = hashlib.sha1(entity_id.encode()).hexdigest()[:16]
+            id_hash = callback_hash(entity_id)
             code_path_cache[id_hash] = entity_id
             safe_entity_id = id_hash
 
@@ -807,6 +811,7 @@ class ScheduleManager:
                 sub_data["sub_entity_name"],
                 notification_time,
             )
+            invalidate_subscription_list_cache(user_id)
 
             sem_start, sem_end = get_semester_bounds()
             logging.info(
@@ -1274,7 +1279,7 @@ class ScheduleManager:
         for l in schedule:
             l_copy = l.copy()
             l_copy["lecturer_title"] = (
-                f"{l_copy.get('lecturer_title','')} ({l.get('source_entity')})"
+                f"{l_copy.get('lecturer_title', '')} ({l.get('source_entity')})"
             )
             formatted_lessons.append(l_copy)
 
@@ -1465,7 +1470,7 @@ class ScheduleManager:
         for l in schedule:
             l_copy = l.copy()
             l_copy["lecturer_title"] = (
-                f"{l_copy.get('lecturer_title','')} ({l.get('source_entity')})"
+                f"{l_copy.get('lecturer_title', '')} ({l.get('source_entity')})"
             )
             formatted_lessons.append(l_copy)
 
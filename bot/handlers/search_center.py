@@ -1,4 +1,3 @@
-import hashlib
 import logging
 
 from aiogram import F, Router
@@ -250,7 +249,7 @@ class SearchCenterManager:
 
             if github_enabled:
                 for repo_path in repo_paths:
-                    repo_hash = hashlib.sha1(repo_path.encode()).hexdigest()[:16]
+                    repo_hash = kb.callback_hash(repo_path)
                     kb.code_path_cache[repo_hash] = repo_path
                     builder.row(
                         InlineKeyboardButton(
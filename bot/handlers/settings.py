@@ -8,8 +8,9 @@ from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, InlineKeyboardButton, Message
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from cachetools import LRUCache, TTLCache
 
 if TYPE_CHECKING:
     from .admin import AdminManager
@@ -19,7 +20,7 @@ import logging
 
 from aiogram import Bot
 
-from bot.keyboards import get_modules_keyboard
+from bot.keyboards import get_modules_keyboard, invalidate_language_cache
 from shared_lib.database import (
     SubscriptionConflictError,
     delete_all_user_data,
@@ -31,16 +32,17 @@ from shared_lib.database import (
     get_disabled_short_names_for_user,
     get_subscription_by_id,
     get_subscription_modules,
-    get_user_repos,
     get_user_settings,
+    get_user_settings_and_repo_flag,
     get_user_subscriptions,
     remove_schedule_subscription,
     toggle_short_name_for_user,
     toggle_subscription_status,
     update_chat_settings_db,
     update_subscription_notification_time,
-    update_user_settings_db,
+    update_user_setting_field,
 )
+from shared_lib.i18n import cached_gettext as _gt
 from shared_lib.i18n import translator
 from shared_lib.services.schedule_service import (
     generate_module_details_text,
@@ -60,6 +62,95 @@ AVAILABLE_LANGUAGES = {"en": "English", "ru": "Русский"}
 MD_DISPLAY_MODES = ["md_file", "html_file", "pdf_file"]
 SUBSCRIPTIONS_PER_PAGE = 5
 
+# Successor of each value for the "cycle" buttons; unknown values restart at the first entry.
+_NEXT_MD_MODE = dict(zip(MD_DISPLAY_MODES, MD_DISPLAY_MODES[1:] + MD_DISPLAY_MODES[:1]))
+_LANGUAGE_CODES = list(AVAILABLE_LANGUAGES)
+_NEXT_LANG = dict(zip(_LANGUAGE_CODES, _LANGUAGE_CODES[1:] + _LANGUAGE_CODES[:1]))
+
+# callback_data -> (settings field, step, min, max) for the LaTeX ➖/➕ buttons.
+_LATEX_OPS = {
+    "latex_padding_incr": ("latex_padding", 5, 0, 10_000),
+    "latex_padding_decr": ("latex_padding", -5, 0, 10_000),
+    "latex_dpi_incr": ("latex_dpi", 50, 100, 600),
+    "latex_dpi_decr": ("latex_dpi", -50, 100, 600),
+}
+# The ➖/➕ buttons around the LaTeX values never change, so they are built once and shared.
+_BTN_PADDING_DECR = InlineKeyboardButton(text="➖", callback_data="latex_padding_decr")
+_BTN_PADDING_INCR = InlineKeyboardButton(text="➕", callback_data="latex_padding_incr")
+_BTN_DPI_DECR = InlineKeyboardButton(text="➖", callback_data="latex_dpi_decr")
+_BTN_DPI_INCR = InlineKeyboardButton(text="➕", callback_data="latex_dpi_incr")
+# settings field -> (default, toast translation key, toast format argument).
+_LATEX_FIELDS = {
+    "latex_padding": (15, "settings_latex_padding_changed", "padding"),
+    "latex_dpi": (300, "settings_latex_dpi_changed", "dpi"),
+}
+
+# Localized names of the markdown display modes, resolved once per language at import.
+_MD_MODE_TEXT = {
+    lang: {
+        mode: translator.gettext(lang, f"settings_md_mode_{suffix}")
+        for mode, suffix in (("md_file", "md"), ("html_file", "html"), ("pdf_file", "pdf"))
+    }
+    for lang in AVAILABLE_LANGUAGES
+}
+
+# render key -> markup, shared by all users. The render key captures every setting shown on
+# the keyboard, so users with identical settings get the same markup object and a write
+# never needs to invalidate anything: the new settings simply map to a different key.
+settings_keyboard_cache = LRUCache(maxsize=4096)
+# (user_id, page, lang) -> (header text, markup) of the subscriptions list, so paging back and
+# forth does not hit the DB. Subscription writes made by the bot drop the user's pages.
+subscription_list_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+def invalidate_subscription_list_cache(user_id: int):
+    """Drops every cached subscriptions list page of the user."""
+    for key in [key for key in subscription_list_cache if key[0] == user_id]:
+        subscription_list_cache.pop(key, None)
+
+
+def _settings_render_key(settings: dict, has_repos: bool, is_admin: bool) -> tuple:
+    """Returns a hashable snapshot of everything the main settings keyboard depends on."""
+    key = (
+        settings.get("language", "en"),
+        settings.get("use_short_names", True),
+        settings.get("show_schedule_emojis", True),
+        settings.get("show_lecturer_emails", True),
+        settings["show_docstring"],
+        settings.get("md_display_mode", "md_file"),
+        settings.get("show_module_details", True),
+        settings["latex_padding"],
+        settings["latex_dpi"],
+        has_repos,
+        is_admin,
+    )
+    if is_admin:
+        key += (
+            settings.get("admin_daily_summary_time", "09:00"),
+            tuple(settings.get("admin_summary_days", [0, 1, 2, 3, 4])),
+        )
+    return key
+
+
+def _parse_id_and_page(data: str) -> tuple[int, int] | None:
+    """
+    Parses "<action>:<id>:<page>" callback data without raising.
+    Returns None for malformed (e.g. stale) data instead of going through ValueError.
+    """
+    first = data.find(":")
+    second = data.find(":", first + 1)
+    if first < 0 or second < 0:
+        return None
+    id_str, page_str = data[first + 1 : second], data[second + 1 :]
+    if not (id_str.isascii() and id_str.isdigit() and page_str.isascii() and page_str.isdigit()):
+        return None
+    return int(id_str), int(page_str)
+
+
+def _subscription_op(data: str | None) -> str:
+    """Returns the action part of a subscription callback, e.g. "sub_open" for "sub_open:12"."""
+    return (data or "").partition(":")[0]
+
 
 class SettingsStates(StatesGroup):
     awaiting_new_sub_time = State()
@@ -106,28 +197,23 @@ class SettingsManager:
         self.router.callback_query(F.data == "settings_cycle_language")(self.cq_cycle_language)
 
         # LaTeX settings
-        self.router.callback_query(F.data.startswith("latex_padding_"))(
-            self.cq_change_latex_padding
-        )
-        self.router.callback_query(F.data.startswith("latex_dpi_"))(self.cq_change_latex_dpi)
-
-        # Subscription management
-        self.router.callback_query(F.data == "manage_personal_subscriptions")(self.cq_subs_list)
-        self.router.callback_query(F.data.startswith("subs_page:"))(self.cq_subs_list)
-
-        # Открытие карточки
-        self.router.callback_query(F.data.startswith("sub_open:"))(self.cq_sub_card)
-
-        # Действия внутри карточки
-        self.router.callback_query(F.data.startswith("sub_toggle:"))(self.cq_sub_toggle)
-        self.router.callback_query(F.data.startswith("sub_del_ask:"))(self.cq_sub_delete_ask)
-        self.router.callback_query(F.data.startswith("sub_del_confirm:"))(
-            self.cq_sub_delete_confirm
+        self.router.callback_query(F.data.in_(_LATEX_OPS))(self.cq_change_latex_setting)
+
+        # Subscription management: list, card and card actions share one prefix-dispatched
+        # handler instead of a chain of startswith filters.
+        self._subscription_handlers = {
+            "manage_personal_subscriptions": self.cq_subs_list,
+            "subs_page": self.cq_subs_list,
+            "sub_open": self.cq_sub_card,
+            "sub_toggle": self.cq_sub_toggle,
+            "sub_del_ask": self.cq_sub_delete_ask,
+            "sub_del_confirm": self.cq_sub_delete_confirm,
+            "sub_time": self.cq_sub_time,
+            "sub_mods": self.cq_sub_modules_menu,
+        }
+        self.router.callback_query(F.data.func(_subscription_op).in_(self._subscription_handlers))(
+            self.cq_subscription_action
         )
-        self.router.callback_query(F.data.startswith("sub_time:"))(self.cq_sub_time)
-
-        # МОДУЛИ
-        self.router.callback_query(F.data.startswith("sub_mods:"))(self.cq_sub_modules_menu)
         self.router.callback_query(F.data == "settings_toggle_module_details")(
             self.cq_toggle_module_details
         )
@@ -243,6 +329,7 @@ class SettingsManager:
         user_id = callback.from_user.id
         lang = await translator.get_language(user_id, callback.message.chat.id)
         success = await delete_all_user_data(user_id)
+        invalidate_subscription_list_cache(user_id)
         if success:
             await callback.message.edit_text(translator.gettext(lang, "delete_my_data_success"))
         else:
@@ -263,10 +350,8 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang,
-                    "settings_use_short_names",
-                    status=translator.gettext(lang, short_names_status_key),
+                text=translator.gettext_fast(
+                    lang, "settings_use_short_names", _gt(lang, short_names_status_key)
                 ),
                 callback_data="settings_toggle_short_names",
             )
@@ -278,10 +363,8 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang,
-                    "settings_show_schedule_emojis",
-                    status=translator.gettext(lang, emojis_status_key),
+                text=translator.gettext_fast(
+                    lang, "settings_show_schedule_emojis", _gt(lang, emojis_status_key)
                 ),
                 callback_data="settings_toggle_emojis",
             )
@@ -293,10 +376,8 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang,
-                    "settings_show_lecturer_emails",
-                    status=translator.gettext(lang, emails_status_key),
+                text=translator.gettext_fast(
+                    lang, "settings_show_lecturer_emails", _gt(lang, emails_status_key)
                 ),
                 callback_data="settings_toggle_emails",
             )
@@ -307,27 +388,20 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang,
-                    "settings_show_docstring",
-                    status=translator.gettext(lang, docstring_status_key),
+                text=translator.gettext_fast(
+                    lang, "settings_show_docstring", _gt(lang, docstring_status_key)
                 ),
                 callback_data="settings_toggle_docstring",
             )
         )
         # Markdown display mode
         md_mode = settings.get("md_display_mode", "md_file")
-        md_mode_map = {
-            "md_file": translator.gettext(lang, "settings_md_mode_md"),
-            "html_file": translator.gettext(lang, "settings_md_mode_html"),
-            "pdf_file": translator.gettext(lang, "settings_md_mode_pdf"),
-        }
-        md_mode_text = md_mode_map.get(
-            md_mode, translator.gettext(lang, "settings_md_mode_unknown")
-        )
+        md_mode_text = _MD_MODE_TEXT.get(lang, _MD_MODE_TEXT["en"]).get(md_mode)
+        if md_mode_text is None:
+            md_mode_text = _gt(lang, "settings_md_mode_unknown")
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_md_display_mode", mode_text=md_mode_text),
+                text=translator.gettext_fast(lang, "settings_md_display_mode", md_mode_text),
                 callback_data="settings_cycle_md_mode",
             )
         )
@@ -339,10 +413,8 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang,
-                    "settings_show_module_details",
-                    status=translator.gettext(lang, details_status_key),
+                text=translator.gettext_fast(
+                    lang, "settings_show_module_details", _gt(lang, details_status_key)
                 ),
                 callback_data="settings_toggle_module_details",
             )
@@ -353,50 +425,47 @@ class SettingsManager:
     ):
         """Builds buttons for LaTeX rendering options."""
         builder.row(
-            InlineKeyboardButton(text="➖", callback_data="latex_padding_decr"),
+            _BTN_PADDING_DECR,
             InlineKeyboardButton(
-                text=translator.gettext(
-                    lang, "settings_latex_padding", padding=settings["latex_padding"]
+                text=translator.gettext_fast(
+                    lang, "settings_latex_padding", settings["latex_padding"]
                 ),
                 callback_data="noop",
             ),
-            InlineKeyboardButton(text="➕", callback_data="latex_padding_incr"),
+            _BTN_PADDING_INCR,
         )
         builder.row(
-            InlineKeyboardButton(text="➖", callback_data="latex_dpi_decr"),
+            _BTN_DPI_DECR,
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_latex_dpi", dpi=settings["latex_dpi"]),
+                text=translator.gettext_fast(lang, "settings_latex_dpi", settings["latex_dpi"]),
                 callback_data="noop",
             ),
-            InlineKeyboardButton(text="➕", callback_data="latex_dpi_incr"),
+            _BTN_DPI_INCR,
         )
 
     async def _build_data_management_settings(
-        self, builder: InlineKeyboardBuilder, user_id: int, lang: str
+        self, builder: InlineKeyboardBuilder, has_repos: bool, lang: str
     ):
         """Builds buttons for managing user-specific data."""
-        user_repos = await get_user_repos(user_id)
-        repo_button_key = "settings_manage_repos_btn" if user_repos else "settings_add_repos_btn"
+        repo_button_key = "settings_manage_repos_btn" if has_repos else "settings_add_repos_btn"
         builder.row(
-            InlineKeyboardButton(
-                text=translator.gettext(lang, repo_button_key), callback_data="manage_repos"
-            )
+            InlineKeyboardButton(text=_gt(lang, repo_button_key), callback_data="manage_repos")
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_manage_subscriptions_btn"),
+                text=_gt(lang, "settings_manage_subscriptions_btn"),
                 callback_data="manage_personal_subscriptions",
             )
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_manage_short_names_btn"),
+                text=_gt(lang, "settings_manage_short_names_btn"),
                 callback_data="manage_short_names",
             )
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_delete_my_data_btn"),
+                text=_gt(lang, "settings_delete_my_data_btn"),
                 callback_data="delete_my_data",
             )
         )
@@ -408,18 +477,18 @@ class SettingsManager:
         summary_time = settings.get("admin_daily_summary_time", "09:00")
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "admin_settings_summary_time_btn", time=summary_time),
+                text=translator.gettext_fast(lang, "admin_settings_summary_time_btn", summary_time),
                 callback_data="admin_settings_summary_time",
             )
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "admin_get_summary_now_btn"),
+                text=_gt(lang, "admin_get_summary_now_btn"),
                 callback_data="admin_get_summary_now",
             )
         )
         summary_days = settings.get("admin_summary_days", [0, 1, 2, 3, 4])
-        day_names = translator.gettext(lang, "calendar_days_short").split(",")
+        day_names = _gt(lang, "calendar_days_short").split(",")
         day_buttons = [
             InlineKeyboardButton(
                 text=f"{'✅' if i in summary_days else '❌'} {day_name}",
@@ -429,34 +498,63 @@ class SettingsManager:
         ]
         builder.row(*day_buttons)
 
-    async def get_settings_keyboard(self, user_id: int) -> InlineKeyboardBuilder:
-        """Creates the main inline keyboard for user settings."""
-        settings = await get_user_settings(user_id)
+    async def get_settings_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
+        """Loads the user's settings and creates the main inline keyboard for them."""
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        return await self._build_settings_keyboard(user_id, settings, has_repos)
+
+    async def _build_settings_keyboard(
+        self, user_id: int, settings: dict, has_repos: bool
+    ) -> InlineKeyboardMarkup:
+        """
+        Creates the main settings keyboard from already loaded settings, without touching the DB.
+        The rendered markup is cached bot-wide by its render key and shared between users.
+        """
+        is_admin = user_id in ADMIN_USER_IDS
+        render_key = _settings_render_key(settings, has_repos, is_admin)
+        cached = settings_keyboard_cache.get(render_key)
+        if cached is not None:
+            return cached
+
         lang = settings.get("language", "en")
         builder = InlineKeyboardBuilder()
 
         await self._build_display_settings(builder, settings, lang)
         await self._build_latex_settings(builder, settings, lang)
-        await self._build_data_management_settings(builder, user_id, lang)
+        await self._build_data_management_settings(builder, has_repos, lang)
 
         current_lang_name = AVAILABLE_LANGUAGES.get(lang, "Unknown")
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_language_btn", lang_name=current_lang_name),
+                text=translator.gettext_fast(lang, "settings_language_btn", current_lang_name),
                 callback_data="settings_cycle_language",
             )
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_restart_onboarding_btn"),
+                text=_gt(lang, "settings_restart_onboarding_btn"),
                 callback_data="restart_onboarding",
             )
         )
 
-        if user_id in ADMIN_USER_IDS:
+        if is_admin:
             await self._build_admin_settings(builder, settings, lang)
 
-        return builder
+        markup = builder.as_markup()
+        settings_keyboard_cache[render_key] = markup
+        return markup
+
+    @staticmethod
+    async def _edit_settings_markup(message: Message, keyboard: InlineKeyboardMarkup):
+        """
+        Edits the settings keyboard in place, skipping the API call when the message
+        already shows an identical markup (Telegram would reject it as "not modified").
+        The callback's message carries the markup Telegram currently shows, so edits made
+        through any other path are taken into account.
+        """
+        if message.reply_markup is not None and message.reply_markup == keyboard:
+            return
+        await message.edit_reply_markup(reply_markup=keyboard)
 
     async def _get_group_settings_menu(
         self, chat_id: int, user_id: int
@@ -475,7 +573,7 @@ class SettingsManager:
         )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "settings_language_btn", lang_name=current_lang_name),
+                text=translator.gettext_fast(lang, "settings_language_btn", current_lang_name),
                 callback_data="manage_chat_language",
             )
         )
@@ -488,7 +586,7 @@ class SettingsManager:
         lang = await translator.get_language(user_id)
         keyboard = await self.get_settings_keyboard(user_id)
         await message.answer(
-            translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard.as_markup()
+            translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard
         )
 
     async def command_settings_group(self, message: Message):
@@ -501,76 +599,77 @@ class SettingsManager:
         lang = await translator.get_language(user_id)
         keyboard = await self.get_settings_keyboard(user_id)
         await callback.message.edit_text(
-            translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard.as_markup()
+            translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard
         )
         await callback.answer()
 
     async def cq_toggle_schedule_emojis(self, callback: CallbackQuery):
         """Toggles the display of colored squares in the schedule."""
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
 
         # Toggle the boolean
         settings["show_schedule_emojis"] = not settings.get("show_schedule_emojis", True)
 
-        await update_user_settings_db(user_id, settings)
+        await update_user_setting_field(
+            user_id, "show_schedule_emojis", settings["show_schedule_emojis"]
+        )
 
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(translator.gettext(lang, "settings_schedule_emojis_updated"))
 
     async def cq_toggle_lecturer_emails(self, callback: CallbackQuery):
         """Toggles the display of lecturer emails in the schedule."""
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
 
         # Toggle the boolean
         settings["show_lecturer_emails"] = not settings.get("show_lecturer_emails", True)
 
-        await update_user_settings_db(user_id, settings)
+        await update_user_setting_field(
+            user_id, "show_lecturer_emails", settings["show_lecturer_emails"]
+        )
 
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(translator.gettext(lang, "settings_lecturer_emails_updated"))
 
     async def cq_toggle_short_names(self, callback: CallbackQuery):
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
         settings["use_short_names"] = not settings.get("use_short_names", True)
-        await update_user_settings_db(user_id, settings)
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        await update_user_setting_field(user_id, "use_short_names", settings["use_short_names"])
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(translator.gettext(lang, "settings_short_names_updated"))
 
     async def cq_toggle_docstring(self, callback: CallbackQuery):
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
         settings["show_docstring"] = not settings["show_docstring"]
-        await update_user_settings_db(user_id, settings)
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        await update_user_setting_field(user_id, "show_docstring", settings["show_docstring"])
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(translator.gettext(lang, "settings_docstring_updated"))
 
     async def cq_cycle_md_mode(self, callback: CallbackQuery):
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
         current_mode = settings.get("md_display_mode", "md_file")
-        try:
-            current_index = MD_DISPLAY_MODES.index(current_mode)
-            new_mode = MD_DISPLAY_MODES[(current_index + 1) % len(MD_DISPLAY_MODES)]
-        except ValueError:
-            new_mode = MD_DISPLAY_MODES[0]
+        new_mode = _NEXT_MD_MODE.get(current_mode, MD_DISPLAY_MODES[0])
         settings["md_display_mode"] = new_mode
-        await update_user_settings_db(user_id, settings)
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        await update_user_setting_field(user_id, "md_display_mode", new_mode)
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
+        mode_text = _MD_MODE_TEXT.get(lang, _MD_MODE_TEXT["en"]).get(new_mode, new_mode)
         await callback.answer(
-            translator.gettext(lang, "settings_md_mode_updated", mode_text=new_mode)
+            translator.gettext(lang, "settings_md_mode_updated", mode_text=mode_text)
         )
 
     async def _cycle_language(self, user_id: int) -> str:
@@ -580,30 +679,22 @@ class SettingsManager:
         """
         settings = await get_user_settings(user_id)
         current_lang = settings.get("language", "en")
-        language_codes = list(AVAILABLE_LANGUAGES.keys())
-        try:
-            current_index = language_codes.index(current_lang)
-            new_lang = language_codes[(current_index + 1) % len(language_codes)]
-        except ValueError:
-            new_lang = language_codes[0]  # Default to the first language if something is wrong
+        new_lang = _NEXT_LANG.get(current_lang, _LANGUAGE_CODES[0])
         settings["language"] = new_lang
-        await update_user_settings_db(user_id, settings)
+        await update_user_setting_field(user_id, "language", new_lang)
+        invalidate_language_cache(user_id)
         return new_lang
 
     async def cq_cycle_language(self, callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
         current_lang = settings.get("language", "en")
-        language_codes = list(AVAILABLE_LANGUAGES.keys())
-        try:
-            current_index = language_codes.index(current_lang)
-            new_lang = language_codes[(current_index + 1) % len(language_codes)]
-        except ValueError:
-            new_lang = language_codes[0]
+        new_lang = _NEXT_LANG.get(current_lang, _LANGUAGE_CODES[0])
         settings["language"] = new_lang
-        new_lang = await self._cycle_language(user_id)
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        await update_user_setting_field(user_id, "language", new_lang)
+        invalidate_language_cache(user_id)
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(
             translator.gettext(
                 new_lang, "settings_language_updated", lang_name=AVAILABLE_LANGUAGES[new_lang]
@@ -616,14 +707,10 @@ class SettingsManager:
 
         chat_settings = await get_chat_settings(chat_id)
         current_lang = chat_settings.get("language", "en")
-        language_codes = list(AVAILABLE_LANGUAGES.keys())
-        try:
-            current_index = language_codes.index(current_lang)
-            new_lang = language_codes[(current_index + 1) % len(language_codes)]
-        except ValueError:
-            new_lang = language_codes[0]
+        new_lang = _NEXT_LANG.get(current_lang, _LANGUAGE_CODES[0])
         chat_settings["language"] = new_lang
         await update_chat_settings_db(chat_id, chat_settings)
+        invalidate_language_cache(chat_id)
 
         # Edit the existing message instead of sending a new one
         text, builder = await self._get_group_settings_menu(chat_id, callback.from_user.id)
@@ -634,107 +721,25 @@ class SettingsManager:
             )
         )
 
-    async def cq_change_latex_padding(self, callback: CallbackQuery):
-        user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
-        current_padding = settings.get("latex_padding", 15)
-        action = callback.data.split("_")[-1]
-        new_padding = (
-            max(0, current_padding + 5) if action == "incr" else max(0, current_padding - 5)
-        )
-        if new_padding != current_padding:
-            settings["latex_padding"] = new_padding
-            await update_user_settings_db(user_id, settings)
-            keyboard = await self.get_settings_keyboard(user_id)
-            await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
-        await callback.answer(
-            translator.gettext(lang, "settings_latex_padding_changed", padding=new_padding)
-        )
-
-    async def cq_change_latex_dpi(self, callback: CallbackQuery):
+    async def cq_change_latex_setting(self, callback: CallbackQuery):
+        """Handles the ➖/➕ buttons for LaTeX padding and DPI."""
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
-        current_dpi = settings.get("latex_dpi", 300)
-        action = callback.data.split("_")[-1]
-        new_dpi = min(600, current_dpi + 50) if action == "incr" else max(100, current_dpi - 50)
-        if new_dpi != current_dpi:
-            settings["latex_dpi"] = new_dpi
-            await update_user_settings_db(user_id, settings)
-            keyboard = await self.get_settings_keyboard(user_id)
-            await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
-        await callback.answer(translator.gettext(lang, "settings_latex_dpi_changed", dpi=new_dpi))
-
-    async def get_personal_subscriptions_keyboard(
-        self, user_id: int, page: int = 0
-    ) -> InlineKeyboardBuilder:
-        lang = await translator.get_language(user_id)
-        subscriptions, total_count = await get_user_subscriptions(
-            user_id, page=page, page_size=SUBSCRIPTIONS_PER_PAGE
-        )
-        builder = InlineKeyboardBuilder()
-        for sub in subscriptions:
-            # Determine if the subscription is for a private chat or a group
-            # A subscription is private if the creator's ID is the same as the target chat ID
-            status_emoji = "✅" if sub["is_active"] else "❌"
-            is_private = sub["user_id"] == sub["chat_id"]
-            target_label = "👤 Private" if is_private else "👥 Group"
-
-            # Create a more descriptive button text
-            button_text = f"{status_emoji} {sub['entity_name']}"
-
-            toggle_button_text = (
-                translator.gettext(lang, "btn_disable")
-                if sub["is_active"]
-                else translator.gettext(lang, "btn_enable")
-            )
-            builder.row(
-                InlineKeyboardButton(text=button_text, callback_data="noop"),
-                InlineKeyboardButton(
-                    text=toggle_button_text, callback_data=f"psub_toggle:{sub['id']}:{page}"
-                ),
-                InlineKeyboardButton(
-                    text=f"⏰ {sub['notification_time']}",
-                    callback_data=f"psub_time:{sub['id']}:{page}",
-                ),
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "btn_delete"),
-                    callback_data=f"psub_del:{sub['id']}:{page}",
-                ),
-                InlineKeyboardButton(text=target_label, callback_data="noop"),
-            )
-        total_pages = (total_count + SUBSCRIPTIONS_PER_PAGE - 1) // SUBSCRIPTIONS_PER_PAGE
-        if total_pages > 1:
-            pagination_buttons = []
-            if page > 0:
-                pagination_buttons.append(
-                    InlineKeyboardButton(
-                        text=translator.gettext(lang, "pagination_back"),
-                        callback_data=f"psub_page:{page - 1}",
-                    )
-                )
-            pagination_buttons.append(
-                InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop")
-            )
-            if (page + 1) < total_pages:
-                pagination_buttons.append(
-                    InlineKeyboardButton(
-                        text=translator.gettext(lang, "pagination_forward"),
-                        callback_data=f"psub_page:{page + 1}",
-                    )
-                )
-            builder.row(*pagination_buttons)
-        builder.row(
-            InlineKeyboardButton(
-                text=translator.gettext(lang, "back_to_settings"), callback_data="back_to_settings"
-            )
-        )
-        return builder
+        field, delta, low, high = _LATEX_OPS[callback.data]
+        default, toast_key, toast_arg = _LATEX_FIELDS[field]
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
+        current_value = settings.get(field, default)
+        new_value = min(high, max(low, current_value + delta))
+        if new_value != current_value:
+            settings[field] = new_value
+            await update_user_setting_field(user_id, field, new_value)
+            keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+            await self._edit_settings_markup(callback.message, keyboard)
+        await callback.answer(translator.gettext(lang, toast_key, **{toast_arg: new_value}))
 
     async def get_chat_subscriptions_keyboard(
         self, chat_id: int, lang: str, page: int = 0
-    ) -> InlineKeyboardBuilder:
+    ) -> tuple[InlineKeyboardBuilder, int]:
         """Builds the keyboard for managing subscriptions within a specific chat."""
         subscriptions, total_count = await get_chat_subscriptions(
             chat_id, page=page, page_size=SUBSCRIPTIONS_PER_PAGE
@@ -784,67 +789,27 @@ class SettingsManager:
                 )
             builder.row(*pagination_buttons)
         # No "back to settings" button needed here as it's a transient menu in a group.
-        return builder
-
-    async def cq_manage_personal_subscriptions(self, callback: CallbackQuery, state: FSMContext):
-        user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        page = int(callback.data.split(":")[1]) if callback.data.startswith("psub_page:") else 0
-        _, total_count = await get_user_subscriptions(
-            user_id, page=page, page_size=SUBSCRIPTIONS_PER_PAGE
-        )
-        header_text = (
-            translator.gettext(lang, "subscriptions_header")
-            if total_count > 0
-            else translator.gettext(lang, "subscriptions_empty")
-        )
-        keyboard = await self.get_personal_subscriptions_keyboard(user_id, page=page)
-        await callback.message.edit_text(header_text, reply_markup=keyboard.as_markup())
-        await callback.answer()
+        return builder, total_count
 
     async def cq_manage_chat_subscriptions(self, callback: CallbackQuery, state: FSMContext):
         user_id = callback.from_user.id
         chat_id = callback.message.chat.id
         lang = await translator.get_language(user_id, chat_id)
         page = int(callback.data.split(":")[1]) if callback.data.startswith("csub_page:") else 0
-        _, total_count = await get_chat_subscriptions(
-            chat_id, page=page, page_size=SUBSCRIPTIONS_PER_PAGE
-        )
+        await self._render_chat_subscriptions(callback.message, chat_id, page, lang)
+        await callback.answer()
+
+    async def _render_chat_subscriptions(
+        self, message: Message, chat_id: int, page: int, lang: str
+    ):
+        """Shows the given page of the chat subscriptions menu in `message`."""
+        keyboard, total_count = await self.get_chat_subscriptions_keyboard(chat_id, lang, page=page)
         header_text = (
             translator.gettext(lang, "subscriptions_chat_header")
             if total_count > 0
             else translator.gettext(lang, "subscriptions_empty")
         )
-        keyboard = await self.get_chat_subscriptions_keyboard(chat_id, lang, page=page)
-        await callback.message.edit_text(header_text, reply_markup=keyboard.as_markup())
-        await callback.answer()
-
-    async def cq_toggle_personal_subscription(
-        self, callback: CallbackQuery, state: FSMContext
-    ):  # Keep this handler
-        user_id, lang = callback.from_user.id, await translator.get_language(callback.from_user.id)
-        try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            toggle_result = await toggle_subscription_status(
-                int(subscription_id_str), user_id, is_chat_admin=False
-            )
-            if toggle_result:
-                new_status, entity_name = toggle_result
-                status_text = "enabled" if new_status else "disabled"
-                await callback.answer(
-                    translator.gettext(lang, f"subscription_{status_text}", entity_name=entity_name)
-                )
-                # Refresh the keyboard
-                callback.data = f"psub_page:{page_str}"
-                await self.cq_manage_personal_subscriptions(callback, state)
-            else:
-                await callback.answer(
-                    translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-                )
-        except (ValueError, IndexError):
-            await callback.answer(
-                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-            )
+        await message.edit_text(header_text, reply_markup=keyboard.as_markup())
 
     async def cq_toggle_chat_subscription(
         self, callback: CallbackQuery, state: FSMContext
@@ -853,20 +818,32 @@ class SettingsManager:
             callback.from_user.id,
             await translator.get_language(callback.from_user.id, callback.message.chat.id),
         )
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer(
+                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
+            )
+            return
+        subscription_id, page = parsed
         try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            toggle_result = await toggle_subscription_status(
-                int(subscription_id_str), user_id, is_chat_admin=True
+            # The owner's personal subscription list shows this row too
+            subscription = await get_subscription_by_id(
+                subscription_id, chat_id=callback.message.chat.id
+            )
+            toggle_result = subscription and await toggle_subscription_status(
+                subscription_id, user_id, is_chat_admin=True
             )
             if toggle_result:
+                invalidate_subscription_list_cache(subscription["user_id"])
                 new_status, entity_name = toggle_result
                 status_text = "enabled" if new_status else "disabled"
                 await callback.answer(
                     translator.gettext(lang, f"subscription_{status_text}", entity_name=entity_name)
                 )
                 # Refresh the keyboard
-                callback.data = f"csub_page:{page_str}"
-                await self.cq_manage_chat_subscriptions(callback, state)
+                await self._render_chat_subscriptions(
+                    callback.message, callback.message.chat.id, page, lang
+                )
             else:
                 await callback.answer(
                     translator.gettext(lang, "subscription_info_outdated"), show_alert=True
@@ -878,29 +855,6 @@ class SettingsManager:
 
     # --- NEW TIME CHANGE HANDLERS ---
 
-    async def cq_change_personal_subscription_time_prompt(
-        self, callback: CallbackQuery, state: FSMContext
-    ):
-        user_id, lang = callback.from_user.id, await translator.get_language(callback.from_user.id)
-        try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            await state.set_state(SettingsStates.awaiting_new_sub_time)  # Set state first
-            await state.update_data(
-                sub_id=int(subscription_id_str),
-                page=int(page_str),
-                is_chat_admin=False,
-                original_chat_id=callback.message.chat.id,
-                original_message_id=callback.message.message_id,
-            )
-            await callback.message.edit_text(
-                translator.gettext(lang, "subscription_change_time_prompt")
-            )
-            await callback.answer()
-        except (ValueError, IndexError):
-            await callback.answer(
-                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-            )
-
     async def cq_change_chat_subscription_time_prompt(
         self, callback: CallbackQuery, state: FSMContext
     ):
@@ -908,12 +862,16 @@ class SettingsManager:
             callback.from_user.id,
             await translator.get_language(callback.from_user.id, callback.message.chat.id),
         )
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer(
+                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
+            )
+            return
+        subscription_id, page = parsed
         try:
-            _, subscription_id_str, page_str = callback.data.split(":")
             await state.set_state(SettingsStates.awaiting_new_sub_time)
-            await state.update_data(
-                sub_id=int(subscription_id_str), page=int(page_str), is_chat_admin=True
-            )
+            await state.update_data(sub_id=subscription_id, page=page, is_chat_admin=True)
             await callback.message.edit_text(
                 translator.gettext(lang, "subscription_change_time_prompt")
             )
@@ -946,18 +904,20 @@ class SettingsManager:
         user_id = callback.from_user.id
         try:
             day_to_toggle = int(callback.data.split(":")[1])
-            settings = await get_user_settings(user_id)
+            settings, has_repos = await get_user_settings_and_repo_flag(user_id)
             summary_days = settings.get("admin_summary_days", [])
             if day_to_toggle in summary_days:
                 summary_days.remove(day_to_toggle)
             else:
                 summary_days.append(day_to_toggle)
             settings["admin_summary_days"] = sorted(summary_days)
-            await update_user_settings_db(user_id, settings)
-            keyboard = await self.get_settings_keyboard(user_id)
-            await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+            await update_user_setting_field(
+                user_id, "admin_summary_days", settings["admin_summary_days"]
+            )
+            keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+            await self._edit_settings_markup(callback.message, keyboard)
         except (ValueError, IndexError):
-            logger.error(f"Invalid admin_toggle_summary_day callback data: {callback.data}")
+            logger.error("Invalid admin_toggle_summary_day callback data: %s", callback.data)
         finally:
             await callback.answer()
 
@@ -983,11 +943,17 @@ class SettingsManager:
             original_chat_id = state_data["original_chat_id"]
             original_message_id = state_data["original_message_id"]
 
+            # A chat admin may edit a subscription created by someone else: drop the owner's list
+            owner_id = user_id
+            if is_chat_admin:
+                subscription = await get_subscription_by_id(sub_id)
+                owner_id = subscription["user_id"] if subscription else user_id
             updated_entity_name = await update_subscription_notification_time(
                 sub_id, new_time, user_id, is_chat_admin
             )
 
             if updated_entity_name:
+                invalidate_subscription_list_cache(owner_id)
                 await message.answer(
                     translator.gettext(
                         lang,
@@ -1001,7 +967,7 @@ class SettingsManager:
                 try:
                     await message.delete()
                 except TelegramBadRequest as e:
-                    logger.warning(f"Could not delete user's time message: {e}")
+                    logger.warning("Could not delete user's time message: %s", e)
 
                 # Create a mock object that mimics a CallbackQuery to refresh the menu.
                 # This is necessary because the target handlers expect a CallbackQuery object, not a Message.
@@ -1022,7 +988,7 @@ class SettingsManager:
                 )
 
                 if is_chat_admin:
-                    await self.cq_manage_chat_subscriptions(mock_callback, state)
+                    await self._render_chat_subscriptions(mock_msg, original_chat_id, page, lang)
                 else:
                     await self.cq_sub_card(mock_callback)
             else:
@@ -1039,7 +1005,10 @@ class SettingsManager:
             )  # Use answer instead of reply
         except Exception as e:  # Catch any other unexpected errors during DB operation
             logging.error(
-                f"Unexpected error updating subscription time for sub {sub_id}: {e}", exc_info=True
+                "Unexpected error updating subscription time for sub %s: %s",
+                sub_id,
+                e,
+                exc_info=True,
             )
             await message.answer(
                 translator.gettext(lang, "subscription_update_failed_general")
@@ -1061,13 +1030,10 @@ class SettingsManager:
 
         try:
             new_time = datetime.datetime.strptime(time_str, "%H:%M").time()
-            settings = await get_user_settings(user_id)
-            settings["admin_daily_summary_time"] = new_time.strftime("%H:%M")
-            await update_user_settings_db(user_id, settings)
+            summary_time = new_time.strftime("%H:%M")
+            await update_user_setting_field(user_id, "admin_daily_summary_time", summary_time)
             await message.answer(
-                translator.gettext(
-                    lang, "admin_summary_time_updated", time=new_time.strftime("%H:%M")
-                )
+                translator.gettext(lang, "admin_summary_time_updated", time=summary_time)
             )
         except ValueError:
             await message.answer(translator.gettext(lang, "schedule_invalid_time_value"))
@@ -1076,97 +1042,37 @@ class SettingsManager:
             # Show the main settings menu again
             keyboard = await self.get_settings_keyboard(user_id)
             await message.answer(
-                translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard.as_markup()
+                translator.gettext(lang, "settings_menu_header"), reply_markup=keyboard
             )
 
     # --- NEW DELETION HANDLERS ---
 
-    async def cq_delete_personal_subscription_prompt(self, callback: CallbackQuery):
-        user_id, lang = callback.from_user.id, await translator.get_language(callback.from_user.id)
-        try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            subscription_id = int(subscription_id_str)
-            subscriptions, _ = await get_user_subscriptions(
-                user_id, page=0, page_size=1000
-            )  # Fetch all to find the one
-            sub_to_delete = next(
-                (sub for sub in subscriptions if sub["id"] == subscription_id), None
-            )
-            if not sub_to_delete:
-                raise ValueError("Subscription not found")
-
-            builder = InlineKeyboardBuilder().row(
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "btn_confirm_delete"),
-                    callback_data=f"psub_del_confirm:{subscription_id}:{page_str}",
-                ),
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "btn_cancel"),
-                    callback_data=f"psub_page:{page_str}",
-                ),
-            )
-            await callback.message.edit_text(
-                translator.gettext(
-                    lang, "subscription_confirm_delete", entity_name=sub_to_delete["entity_name"]
-                ),
-                reply_markup=builder.as_markup(),
-            )
-            await callback.answer()
-        except (ValueError, IndexError):
-            await callback.answer(
-                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-            )
-
-    async def cq_confirm_delete_personal_subscription(
-        self, callback: CallbackQuery, state: FSMContext
-    ):
-        user_id, lang = callback.from_user.id, await translator.get_language(callback.from_user.id)
-        try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            deleted_entity_name = await remove_schedule_subscription(
-                int(subscription_id_str), user_id, is_chat_admin=False
-            )
-            if deleted_entity_name:
-                await callback.answer(
-                    translator.gettext(
-                        lang, "subscription_removed", entity_name=deleted_entity_name
-                    )
-                )
-                callback.data = f"psub_page:{page_str}"
-                await self.cq_manage_personal_subscriptions(callback, state)
-            else:
-                await callback.answer(
-                    translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-                )
-        except (ValueError, IndexError):
-            await callback.answer(
-                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
-            )
-
     async def cq_delete_chat_subscription_prompt(self, callback: CallbackQuery):
         user_id, lang = (
             callback.from_user.id,
             await translator.get_language(callback.from_user.id, callback.message.chat.id),
         )
         chat_id = callback.message.chat.id
-        try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            subscription_id = int(subscription_id_str)
-            subscriptions, _ = await get_chat_subscriptions(chat_id, page=0, page_size=1000)
-            sub_to_delete = next(
-                (sub for sub in subscriptions if sub["id"] == subscription_id), None
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer(
+                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
             )
+            return
+        subscription_id, page = parsed
+        try:
+            sub_to_delete = await get_subscription_by_id(subscription_id, chat_id=chat_id)
             if not sub_to_delete:
                 raise ValueError("Subscription not found in this chat")
 
             builder = InlineKeyboardBuilder().row(
                 InlineKeyboardButton(
                     text=translator.gettext(lang, "btn_confirm_delete"),
-                    callback_data=f"csub_del_confirm:{subscription_id}:{page_str}",
+                    callback_data=f"csub_del_confirm:{subscription_id}:{page}",
                 ),
                 InlineKeyboardButton(
                     text=translator.gettext(lang, "btn_cancel"),
-                    callback_data=f"csub_page:{page_str}",
+                    callback_data=f"csub_page:{page}",
                 ),
             )
             await callback.message.edit_text(
@@ -1186,19 +1092,31 @@ class SettingsManager:
             callback.from_user.id,
             await translator.get_language(callback.from_user.id, callback.message.chat.id),
         )
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer(
+                translator.gettext(lang, "subscription_info_outdated"), show_alert=True
+            )
+            return
+        subscription_id, page = parsed
         try:
-            _, subscription_id_str, page_str = callback.data.split(":")
-            deleted_entity_name = await remove_schedule_subscription(
-                int(subscription_id_str), user_id, is_chat_admin=True
+            # Looked up before the delete: the owner's personal subscription list shows this row
+            subscription = await get_subscription_by_id(
+                subscription_id, chat_id=callback.message.chat.id
+            )
+            deleted_entity_name = subscription and await remove_schedule_subscription(
+                subscription_id, user_id, is_chat_admin=True
             )
             if deleted_entity_name:
+                invalidate_subscription_list_cache(subscription["user_id"])
                 await callback.answer(
                     translator.gettext(
                         lang, "subscription_removed", entity_name=deleted_entity_name
                     )
                 )
-                callback.data = f"csub_page:{page_str}"
-                await self.cq_manage_chat_subscriptions(callback, state)
+                await self._render_chat_subscriptions(
+                    callback.message, callback.message.chat.id, page, lang
+                )
             else:
                 await callback.answer(
                     translator.gettext(lang, "subscription_info_outdated"), show_alert=True
@@ -1289,16 +1207,20 @@ class SettingsManager:
         await callback.answer()
 
     async def cq_delete_short_name(self, callback: CallbackQuery, state: FSMContext):
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer()
+            return
+        short_name_id, page = parsed
         lang = await translator.get_language(callback.from_user.id)
-        _, short_name_id_str, page_str = callback.data.split(":")
         builder = InlineKeyboardBuilder()
         builder.row(
             InlineKeyboardButton(
                 text=translator.gettext(lang, "btn_confirm_delete"),
-                callback_data=f"sname_del_confirm:{short_name_id_str}:{page_str}",
+                callback_data=f"sname_del_confirm:{short_name_id}:{page}",
             ),
             InlineKeyboardButton(
-                text=translator.gettext(lang, "btn_cancel"), callback_data=f"sname_page:{page_str}"
+                text=translator.gettext(lang, "btn_cancel"), callback_data=f"sname_page:{page}"
             ),
         )
         await callback.message.edit_text(
@@ -1308,8 +1230,11 @@ class SettingsManager:
         await callback.answer()
 
     async def cq_confirm_delete_short_name(self, callback: CallbackQuery, state: FSMContext):
-        _, short_name_id_str, page_str = callback.data.split(":")
-        short_name_id = int(short_name_id_str)
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer()
+            return
+        short_name_id, page = parsed
         await delete_short_name_by_id(short_name_id)
         await callback.answer(
             translator.gettext(
@@ -1317,19 +1242,30 @@ class SettingsManager:
             )
         )
         # Refresh the menu
-        callback.data = (
-            f"sname_page:{page_str}"  # Mock the callback data to refresh the correct page
-        )
+        callback.data = f"sname_page:{page}"  # Mock the callback data to refresh the correct page
         await self.cq_manage_short_names(callback, state)
 
     async def cq_toggle_user_short_name(self, callback: CallbackQuery, state: FSMContext):
         """Handles enabling/disabling a short name for a default user."""
         user_id = callback.from_user.id
-        _, short_name_id_str, page_str = callback.data.split(":")
-        await toggle_short_name_for_user(user_id, int(short_name_id_str))
+        parsed = _parse_id_and_page(callback.data)
+        if parsed is None:
+            await callback.answer()
+            return
+        short_name_id, _ = parsed
+        await toggle_short_name_for_user(user_id, short_name_id)
         await callback.answer()
         await self.cq_manage_short_names(callback, state)  # Refresh the menu
 
+    async def cq_subscription_action(self, callback: CallbackQuery, state: FSMContext):
+        """Dispatches subscription list/card callbacks by their action prefix."""
+        op = _subscription_op(callback.data)
+        handler = self._subscription_handlers[op]
+        if op == "sub_time":  # the only action that starts an FSM prompt
+            await handler(callback, state)
+        else:
+            await handler(callback)
+
     async def cq_sub_card(self, callback: CallbackQuery):
         sub_id = int(callback.data.split(":")[1])
         sub = await get_subscription_by_id(sub_id)
@@ -1409,8 +1345,10 @@ class SettingsManager:
                 )
             except Exception as e:
                 logger.warning(
-                    "Fallback schedule fetch failed for modules menu "
-                    f"{sub['entity_type']}:{sub['entity_id']}: {e}"
+                    "Fallback schedule fetch failed for modules menu %s:%s: %s",
+                    sub["entity_type"],
+                    sub["entity_id"],
+                    e,
                 )
                 full_schedule = None
 
@@ -1462,6 +1400,17 @@ class SettingsManager:
             except (IndexError, ValueError):
                 page = 0
 
+        await self._render_subs_list(callback.message, user_id, page, lang)
+        await callback.answer()
+
+    async def _render_subs_list(self, message: Message, user_id: int, page: int, lang: str):
+        """Shows the given page of the user's subscription list in `message`."""
+        cached = subscription_list_cache.get((user_id, page, lang))
+        if cached is not None:
+            text, markup = cached
+            await message.edit_text(text, reply_markup=markup)
+            return
+
         # Размер страницы - 5 подписок
         page_size = 5
         subs, total_count = await get_user_subscriptions(user_id, page=page, page_size=page_size)
@@ -1516,9 +1465,11 @@ class SettingsManager:
             )
         )
 
+        markup = builder.as_markup()
+        subscription_list_cache[(user_id, page, lang)] = (text, markup)
+
         # Редактируем сообщение
-        await callback.message.edit_text(text, reply_markup=builder.as_markup())
-        await callback.answer()
+        await message.edit_text(text, reply_markup=markup)
 
     async def cq_sub_toggle(self, callback: CallbackQuery):
         """Переключает состояние подписки (Вкл/Выкл) и обновляет карточку."""
@@ -1530,6 +1481,7 @@ class SettingsManager:
             result = await toggle_subscription_status(sub_id, user_id, is_chat_admin=False)
 
             if result:
+                invalidate_subscription_list_cache(user_id)
                 # Если успешно, просто обновляем текущую карточку (она перерисуется с новым статусом)
                 # Вызываем уже существующий метод cq_sub_card
                 # Важно: подменяем data, так как cq_sub_card ожидает "sub_open:ID"
@@ -1579,9 +1531,10 @@ class SettingsManager:
             deleted_name = await remove_schedule_subscription(sub_id, user_id, is_chat_admin=False)
 
             if deleted_name:
+                invalidate_subscription_list_cache(user_id)
                 await callback.answer(f"Подписка '{deleted_name}' удалена.")
                 # Возвращаемся в список подписок
-                await self.cq_subs_list(callback)
+                await self._render_subs_list(callback.message, user_id, 0, lang)
             else:
                 await callback.answer(
                     translator.gettext(lang, "subscription_info_outdated"), show_alert=True
@@ -1626,10 +1579,12 @@ class SettingsManager:
 
     async def cq_toggle_module_details(self, callback: CallbackQuery):
         user_id = callback.from_user.id
-        lang = await translator.get_language(user_id)
-        settings = await get_user_settings(user_id)
+        settings, has_repos = await get_user_settings_and_repo_flag(user_id)
+        lang = settings.get("language", "en")
         settings["show_module_details"] = not settings.get("show_module_details", True)
-        await update_user_settings_db(user_id, settings)
-        keyboard = await self.get_settings_keyboard(user_id)
-        await callback.message.edit_reply_markup(reply_markup=keyboard.as_markup())
+        await update_user_setting_field(
+            user_id, "show_module_details", settings["show_module_details"]
+        )
+        keyboard = await self._build_settings_keyboard(user_id, settings, has_repos)
+        await self._edit_settings_markup(callback.message, keyboard)
         await callback.answer(translator.gettext(lang, "settings_module_details_updated"))
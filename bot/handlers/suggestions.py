@@ -1,6 +1,8 @@
-import json
+import asyncio
 import logging
+import re
 
+import orjson
 from aiogram import Bot, F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -9,10 +11,17 @@ from aiogram.types import CallbackQuery, Message
 
 from shared_lib.database import add_short_name, log_user_action
 from shared_lib.i18n import translator
-from shared_lib.redis_client import redis_client
+from shared_lib.redis_client import (
+    PENDING_SHORTER_OFFERS_KEY,
+    pending_offer_id,
+    redis_client,
+)
 
 logger = logging.getLogger(__name__)
 
+# Admin decision buttons: shorter_name_admin:<approve|decline>:<24 hex chars of sha1>
+_ADMIN_DECISION_RE = re.compile(r"^shorter_name_admin:(approve|decline):([0-9a-f]{24})$")
+
 
 class OfferShorterName(StatesGroup):
     awaiting_full_name = State()
@@ -29,17 +38,18 @@ class SuggestionsManager:
         self.router.message(Command("offershorter"))(self.cmd_offer_shorter)
         self.router.message(OfferShorterName.awaiting_full_name)(self.process_full_name)
         self.router.message(OfferShorterName.awaiting_short_name)(self.process_short_name)
-        self.router.callback_query(F.data.startswith("shorter_name_admin:"))(
+        self.router.callback_query(F.data.regexp(_ADMIN_DECISION_RE).as_("decision_match"))(
             self.handle_admin_decision
         )
 
     async def cmd_offer_shorter(self, message: Message, state: FSMContext):
         user_id = message.from_user.id
-        lang = await translator.get_language(user_id, message.chat.id)
-
-        # Rate limiting
+        # Rate limiting; the counter read does not depend on the language lookup
         limit_key = f"shorter_offer_limit:{user_id}"
-        current_count = await redis_client.client.get(limit_key)
+        lang, current_count = await asyncio.gather(
+            translator.get_language(user_id, message.chat.id),
+            redis_client.client.get(limit_key),
+        )
         if current_count and int(current_count) >= 5:
             await message.answer(translator.gettext(lang, "shorter_name_limit_exceeded"))
             return
@@ -62,29 +72,8 @@ class SuggestionsManager:
 
         await state.clear()
 
-        # --- NEW: Check for duplicates before adding ---
-        pending_offers_raw = await redis_client.client.lrange("pending_shorter_offers", 0, -1)
-        is_duplicate = False
-        for offer_raw in pending_offers_raw:
-            try:
-                offer = json.loads(offer_raw)
-                if offer.get("full_name") == full_name and offer.get("short_name") == short_name:
-                    is_duplicate = True
-                    break
-            except json.JSONDecodeError:
-                continue  # Ignore malformed data in Redis
-
-        if is_duplicate:
-            await message.answer(translator.gettext(lang, "shorter_name_suggestion_duplicate"))
-            return
-
-        # Increment rate limit counter
-        limit_key = f"shorter_offer_limit:{user_id}"
-        await redis_client.client.incr(limit_key)
-        await redis_client.client.expire(limit_key, 86400)  # 24 hours
-
         # --- NEW: Store suggestion in Redis instead of sending immediately ---
-        suggestion_payload = json.dumps(
+        suggestion_payload = orjson.dumps(
             {
                 "user_id": user_id,
                 "user_name": message.from_user.full_name,
@@ -92,7 +81,16 @@ class SuggestionsManager:
                 "short_name": short_name,
             }
         )
-        await redis_client.client.rpush("pending_shorter_offers", suggestion_payload)
+        # One script stores the offer unless the same pair is already pending and, only
+        # then, counts it against the user's 24h limit (the window starts with the first one)
+        suggestion_id = pending_offer_id(full_name, short_name)
+        limit_key = f"shorter_offer_limit:{user_id}"
+        if not await redis_client.add_pending_offer(
+            suggestion_id, suggestion_payload, limit_key, 86400
+        ):
+            await message.answer(translator.gettext(lang, "shorter_name_suggestion_duplicate"))
+            return
+
         # --- NEW: Log this as a specific user action for statistics ---
         await log_user_action(
             user_id=user_id,
@@ -105,12 +103,35 @@ class SuggestionsManager:
 
         await message.answer(translator.gettext(lang, "shorter_name_suggestion_sent"))
 
-    async def handle_admin_decision(self, callback: CallbackQuery):
+    async def _update_admin_messages(
+        self, callback: CallbackQuery, messages_to_update: list[dict], final_text: str
+    ):
+        """Replaces the suggestion notification with the decision text."""
+        # --- NEW: Update the message for ALL admins ---
+        for msg_info in messages_to_update:
+            # Only edit the message that this specific admin clicked on.
+            if (
+                msg_info["chat_id"] == callback.message.chat.id
+                and msg_info["message_id"] == callback.message.message_id
+            ):
+                try:
+                    await self.bot.edit_message_text(
+                        final_text,
+                        chat_id=msg_info["chat_id"],
+                        message_id=msg_info["message_id"],
+                        parse_mode="Markdown",
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Could not edit suggestion message {msg_info['message_id']} for admin {msg_info['chat_id']}: {e}"
+                    )
+
+    async def handle_admin_decision(self, callback: CallbackQuery, decision_match: re.Match):
         admin_id = callback.from_user.id
         lang = await translator.get_language(admin_id, callback.message.chat.id)
 
         try:
-            _, decision, data_hash = callback.data.split(":")
+            decision, data_hash = decision_match.groups()
 
             # --- REFACTOR: Use Redis instead of in-memory cache ---
             redis_key = f"suggestion_cache:{data_hash}"
@@ -131,19 +152,8 @@ class SuggestionsManager:
             user_id = int(user_id_str)
             user_lang = await translator.get_language(user_id)
 
-            # --- FIX: Remove the processed suggestion from the Redis list ---
-            # Reconstruct the exact payload that was stored in Redis to remove it,
-            # using the user_name that is now correctly stored in the cached_payload.
-            suggestion_payload_to_remove = json.dumps(
-                {
-                    "user_id": user_id,
-                    "user_name": cached_payload.get("user_name"),
-                    "full_name": full_name,
-                    "short_name": short_name,
-                }
-            )
-            await redis_client.client.lrem(
-                "pending_shorter_offers", 0, suggestion_payload_to_remove
+            suggestion_id = cached_payload.get("suggestion_id") or pending_offer_id(
+                full_name, short_name
             )
 
             if decision == "approve":
@@ -153,39 +163,36 @@ class SuggestionsManager:
                 short_name_cache.clear()
 
                 final_text = f"{callback.message.text}\n\n**{translator.gettext(lang, 'shorter_name_suggestion_approved', short_name=short_name)}**"
-                await self.bot.send_message(
-                    user_id,
-                    translator.gettext(
-                        user_lang, "shorter_name_suggestion_approved", short_name=short_name
-                    ),
+                user_text = translator.gettext(
+                    user_lang, "shorter_name_suggestion_approved", short_name=short_name
                 )
             else:  # Decline
                 # <<< ИЗМЕНЕНИЕ >>>
                 final_text = f"{callback.message.text}\n\n**{translator.gettext(lang, 'shorter_name_suggestion_declined')}**"
-                await self.bot.send_message(
-                    user_id, translator.gettext(user_lang, "shorter_name_suggestion_declined")
+                user_text = translator.gettext(user_lang, "shorter_name_suggestion_declined")
+
+            # Drop the pending offer together with its suggestion cache in one round-trip first:
+            # a failed Telegram call below must not leave the offer pending.
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                pipe.hdel(PENDING_SHORTER_OFFERS_KEY, suggestion_id)
+                pipe.delete(redis_key)
+                await pipe.execute()
+
+            # Notify the user and update the admin messages concurrently; the user may have
+            # blocked the bot, which must not turn an applied decision into an error for the admin.
+            notify_result, update_result = await asyncio.gather(
+                self.bot.send_message(user_id, user_text),
+                self._update_admin_messages(callback, messages_to_update, final_text),
+                return_exceptions=True,
+            )
+            if isinstance(notify_result, Exception):
+                logger.warning(
+                    f"Could not notify user {user_id} about shorter name decision: {notify_result}"
+                )
+            if isinstance(update_result, Exception):
+                logger.warning(
+                    f"Could not update admin messages for suggestion {suggestion_id}: {update_result}"
                 )
-            # --- NEW: Update the message for ALL admins ---
-            for msg_info in messages_to_update:
-                # Only edit the message that this specific admin clicked on.
-                if (
-                    msg_info["chat_id"] == callback.message.chat.id
-                    and msg_info["message_id"] == callback.message.message_id
-                ):
-                    try:
-                        await self.bot.edit_message_text(
-                            final_text,
-                            chat_id=msg_info["chat_id"],
-                            message_id=msg_info["message_id"],
-                            parse_mode="Markdown",
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not edit suggestion message {msg_info['message_id']} for admin {msg_info['chat_id']}: {e}"
-                        )
-
-            # --- REFACTOR: Remove from Redis cache ---
-            await redis_client.client.delete(redis_key)
 
             await callback.answer()
 
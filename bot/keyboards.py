@@ -1,11 +1,17 @@
+import asyncio
 import calendar
+import functools
 import hashlib
 import logging
-from datetime import date, datetime, timedelta
+import os
+import sys
+import types
+from datetime import date, timedelta
 from typing import Any
 from urllib.parse import urlsplit
 
 import matplobblib
+import orjson
 from aiogram.fsm.context import FSMContext
 from aiogram.types import (
     InlineKeyboardButton,
@@ -15,17 +21,18 @@ from aiogram.types import (
     WebAppInfo,
 )
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from cachetools import LRUCache
+from cachetools import LRUCache, TTLCache
 
+from shared_lib.i18n import cached_gettext as _gt
 from shared_lib.i18n import translator
 
 from . import database  # Import database to check for user repos
-from .config import ADMIN_USER_IDS, PUBLIC_SITE_URL
+from .config import ADMIN_USER_IDS, PUBLIC_SITE_URL, TOPICS_DATA_CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
 # Define base commands that are always available
-BASE_COMMANDS = [
+BASE_COMMANDS = (
     "/search",
     "/search_presets",
     "/schedule",
@@ -41,8 +48,25 @@ BASE_COMMANDS = [
     "/latex",
     "/mermaid",
     "🌐 Language / Язык",
-]
-ADMIN_COMMANDS = ["/update", "/clear_cache", "/broadcast_release"]
+)
+ADMIN_COMMANDS = ("/update", "/clear_cache", "/broadcast_release")
+# Buttons of the /help keyboard: text key help_btn_<cmd>, callback_data help_cmd_<cmd>.
+HELP_COMMANDS = (
+    "matp_all",
+    "matp_search",
+    "search",
+    "search_presets",
+    "schedule",
+    "myschedule",
+    "lec_search",
+    "lec_all",
+    "favorites",
+    "settings",
+    "latex",
+    "mermaid",
+    "offershorter",
+)
+HELP_ADMIN_COMMANDS = ("update", "clear_cache")
 WEB_APP_BUTTONS = (
     ("webapp_open_schedule", "/schedule?tg=1"),
     ("webapp_open_calendar_sync", "/schedule?tg=1&calendar=1"),
@@ -50,55 +74,229 @@ WEB_APP_BUTTONS = (
 )
 _WEB_APP_URL_WARNING_EMITTED = False
 
-# Cache for long code paths to use in callback_data
-code_path_cache = LRUCache(maxsize=1024)
 
-# Pre-generate data structure for topics and codes, not actual ReplyKeyboards.
-# This structure will be used by functions to build keyboards dynamically.
-# topics_data = {submodule_name: {'topics': [list_of_topics], 'codes': {topic_name: [list_of_codes]}}}
-topics_data = dict()
+class BoundedPathCache(dict):
+    """
+    hash -> path map for callback_data. Reads are plain dict lookups (no LRU
+    bookkeeping on every callback); writes evict the oldest entry once maxsize is reached.
+    """
 
-logger.info("Начало генерации данных для клавиатур тем и задач.")
-for submodule_name in matplobblib.submodules:
-    logger.debug(f"Обработка подмодуля: {submodule_name} для topics_data.")
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key: str, value: str) -> None:
+        if key not in self and len(self) >= self.maxsize:
+            del self[next(iter(self))]
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+# Cache for long code paths to use in callback_data.
+# Values are interned: many users open the same paths, so entries share one string.
+code_path_cache = BoundedPathCache(maxsize=2048)
+
+# Help keyboards are identical for every user with the same language and admin flag,
+# so build each variant once. PUBLIC_SITE_URL is part of the key because it decides
+# whether the Web App rows are present.
+help_keyboard_cache = LRUCache(maxsize=64)
+
+
+# Language per user id, or per group chat id (negative) where the group setting wins.
+# Dropped by invalidate_language_cache when the language is changed through the bot.
+language_cache = TTLCache(maxsize=10_000, ttl=300)
+
+
+async def _get_lang(user_id: int, chat_id: int | None = None) -> str:
+    """translator.get_language with a short-lived per user / group chat cache."""
+    cache_key = chat_id if chat_id and chat_id < 0 else user_id
+    lang = language_cache.get(cache_key)
+    if lang is None:
+        lang = await translator.get_language(user_id, chat_id)
+        language_cache[cache_key] = lang
+    return lang
+
+
+def invalidate_language_cache(user_or_chat_id: int):
+    """Forgets the cached language of a user or a group chat."""
+    language_cache.pop(user_or_chat_id, None)
+
+
+@functools.lru_cache(maxsize=64)
+def _gt_list(lang: str, key: str) -> tuple[str, ...]:
+    """Cached comma-separated translation, e.g. calendar month and weekday names."""
+    return tuple(translator.gettext(lang, key).split(","))
+
+
+@functools.lru_cache(maxsize=64)
+def _month_weeks(year: int, month: int) -> tuple[tuple[int, ...], ...]:
+    """calendar.monthcalendar as nested tuples, computed once per month."""
+    return tuple(tuple(week) for week in calendar.monthcalendar(year, month))
+
+
+@functools.lru_cache(maxsize=16)
+def _calendar_day_header(lang: str) -> tuple[InlineKeyboardButton, ...]:
+    """Weekday header buttons of the calendar keyboard, built once per language."""
+    return tuple(
+        InlineKeyboardButton(text=day, callback_data="noop")
+        for day in _gt_list(lang, "calendar_days_short")
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def callback_hash(value: str) -> str:
+    """16 hex chars for callback_data keys into code_path_cache; memoized per path."""
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def _topics_data_cache_path() -> str | None:
+    """JSON path keyed by the matplobblib version and install mtime, or None if unavailable."""
+    package_file = getattr(matplobblib, "__file__", None)
+    if not package_file:
+        return None
     try:
+        mtime = int(os.path.getmtime(package_file))
+        os.makedirs(TOPICS_DATA_CACHE_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return None
+    version = getattr(matplobblib, "__version__", "unknown")
+    return os.path.join(TOPICS_DATA_CACHE_DIR, f"topics_data_{version}_{mtime}.json")
+
+
+def _is_topics_entry(entry: Any) -> bool:
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("topics"), list)
+        and isinstance(entry.get("codes"), dict)
+    )
+
+
+def _load_cached_topics_data(cache_path: str | None) -> dict | None:
+    """Cached topics_data, or None on a miss or unreadable file so it is rebuilt lazily."""
+    if cache_path is None or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Не удалось прочитать кэш topics_data {cache_path}: {e}")
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {name: entry for name, entry in data.items() if _is_topics_entry(entry)}
+
+
+def _store_cached_topics_data(cache_path: str | None, data: dict) -> None:
+    if cache_path is None:
+        return
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить кэш topics_data {cache_path}: {e}")
+
+
+def import_matplobblib_submodule(submodule_name: str) -> types.ModuleType:
+    """
+    Returns a matplobblib submodule, reusing it if matplobblib already imported it.
+    The single place the bot imports submodules, shared by topics_data and the search indexer.
+    """
+    module = getattr(matplobblib, submodule_name, None)
+    if not isinstance(module, types.ModuleType):
         module = matplobblib._importlib.import_module(f"matplobblib.{submodule_name}")
+    return module
+
+
+def _load_submodule_topics(submodule_name: str) -> dict | None:
+    """Imports one matplobblib submodule and returns its topics_data entry, or None on error."""
+    logger.debug(f"Обработка подмодуля: {submodule_name} для topics_data.")
+    try:
+        module = import_matplobblib_submodule(submodule_name)
         # We need to get keys from themes_list_dicts_full for topics and codes
         # regardless of show_docstring, as the keyboard structure should be consistent.
         # The content (code with/without docstring) is handled in handlers.py.
         module_full_dict = (
             module.themes_list_dicts_full
         )  # Assuming this always exists and has all keys
-        module_topics = list(module_full_dict.keys())
-        logger.debug(f"Темы для {submodule_name}: {module_topics}")
-
-        sub_topics_codes = {
-            topic_key: list(module_full_dict[topic_key].keys()) for topic_key in module_topics
-        }
-        topics_data[submodule_name] = {"topics": module_topics, "codes": sub_topics_codes}
-        logger.debug(f"Успешно сгенерированы данные для подмодуля: {submodule_name}")
+        sub_topics_codes = {topic_key: list(codes) for topic_key, codes in module_full_dict.items()}
+        module_topics = list(sub_topics_codes)
+        # %-style arguments: the topic list is only formatted when debug logging is on
+        logger.debug("Темы для %s: %s", submodule_name, module_topics)
+        logger.debug("Успешно сгенерированы данные для подмодуля: %s", submodule_name)
+        return {"topics": module_topics, "codes": sub_topics_codes}
     except NameError as e:  # <-- Ловим конкретно эту ошибку
         logger.error(
             f"КРИТИЧЕСКАЯ ОШИБКА в библиотеке matplobblib, подмодуль '{submodule_name}' не будет загружен: {e}"
         )
-        continue
     except KeyError as e:
         logger.error(
             f"КРИТИЧЕСКАЯ ОШИБКА в библиотеке matplobblib, подмодуль '{submodule_name}' не будет загружен: {e}"
         )
-        continue
     except Exception as e:
         logger.error(f"Ошибка генерации данных для подмодуля {submodule_name}: {e}", exc_info=True)
+    return None
 
-logger.info("Завершение генерации данных для клавиатур тем и задач.")
 
+class LazyTopicsData(dict):
+    """
+    topics_data that imports a matplobblib submodule the first time it is looked up.
+    Every newly loaded submodule is written back to the JSON cache, so later
+    starts get it without importing anything.
+    """
 
-def _get_user_commands(user_id: int) -> list[str]:
-    """Helper to get commands for a user."""
-    commands = list(BASE_COMMANDS)
-    if user_id in ADMIN_USER_IDS:
-        commands.extend(ADMIN_COMMANDS)
-    return commands
+    def __init__(self, initial: dict | None = None, cache_path: str | None = None):
+        super().__init__(initial or {})
+        self._cache_path = cache_path
+        self._failed: set[str] = set()
+
+    def __missing__(self, submodule_name: str) -> dict:
+        if submodule_name in self._failed or submodule_name not in matplobblib.submodules:
+            raise KeyError(submodule_name)
+        entry = _load_submodule_topics(submodule_name)
+        if entry is None:
+            self._failed.add(submodule_name)
+            raise KeyError(submodule_name)
+        self[submodule_name] = entry
+        _store_cached_topics_data(self._cache_path, dict(self))
+        return entry
+
+    def get(self, submodule_name, default=None):
+        try:
+            return self[submodule_name]
+        except KeyError:
+            return default
+
+
+# Data structure for topics and codes, not actual ReplyKeyboards.
+# This structure will be used by functions to build keyboards dynamically.
+# topics_data = {submodule_name: {'topics': [list_of_topics], 'codes': {topic_name: [list_of_codes]}}}
+# Submodules are imported on first lookup; what has been loaded is cached per library build.
+_TOPICS_DATA_CACHE_PATH = _topics_data_cache_path()
+topics_data = LazyTopicsData(
+    _load_cached_topics_data(_TOPICS_DATA_CACHE_PATH), cache_path=_TOPICS_DATA_CACHE_PATH
+)
+logger.info(f"Данные для клавиатур тем и задач: из кэша загружено подмодулей: {len(topics_data)}.")
+
+
+# Command rows depend only on the admin flag, so they are built once at import.
+_USER_COMMAND_ROWS = tuple([KeyboardButton(text=cmd)] for cmd in BASE_COMMANDS)
+_ADMIN_COMMAND_ROWS = _USER_COMMAND_ROWS + tuple(
+    [KeyboardButton(text=cmd)] for cmd in ADMIN_COMMANDS
+)
+
+# Keyed by (lang, is_admin, PUBLIC_SITE_URL), same as help_keyboard_cache.
+main_reply_keyboard_cache = LRUCache(maxsize=64)
+
+# Web App buttons keyboard keyed by (lang, PUBLIC_SITE_URL); None when the URL is unusable.
+web_apps_keyboard_cache = LRUCache(maxsize=16)
+
+# Schedule type picker without search history, keyed by lang.
+schedule_type_keyboard_cache = LRUCache(maxsize=16)
 
 
 def _build_site_url(path: str) -> str:
@@ -137,6 +335,13 @@ def _build_web_app_button_text(lang: str, key: str) -> str:
 
 
 def get_web_apps_inline_keyboard(lang: str) -> InlineKeyboardMarkup | None:
+    cache_key = (lang, PUBLIC_SITE_URL)
+    if cache_key not in web_apps_keyboard_cache:
+        web_apps_keyboard_cache[cache_key] = _build_web_apps_inline_keyboard(lang)
+    return web_apps_keyboard_cache[cache_key]
+
+
+def _build_web_apps_inline_keyboard(lang: str) -> InlineKeyboardMarkup | None:
     web_app_buttons = _get_web_app_button_specs()
     if not web_app_buttons:
         return None
@@ -154,8 +359,17 @@ def get_web_apps_inline_keyboard(lang: str) -> InlineKeyboardMarkup | None:
 
 # Function to get the main ReplyKeyboardMarkup (used for /start, after /code)
 async def get_main_reply_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    current_commands = _get_user_commands(user_id)
-    lang = await translator.get_language(user_id)
+    lang = await _get_lang(user_id)
+    is_admin = user_id in ADMIN_USER_IDS
+    cache_key = (lang, is_admin, PUBLIC_SITE_URL)
+    markup = main_reply_keyboard_cache.get(cache_key)
+    if markup is None:
+        markup = _build_main_reply_keyboard(lang, is_admin)
+        main_reply_keyboard_cache[cache_key] = markup
+    return markup
+
+
+def _build_main_reply_keyboard(lang: str, is_admin: bool) -> ReplyKeyboardMarkup:
     keyboard_buttons = [
         [
             KeyboardButton(
@@ -165,7 +379,7 @@ async def get_main_reply_keyboard(user_id: int) -> ReplyKeyboardMarkup:
         ]
         for text_key, url in _get_web_app_button_specs()
     ]
-    keyboard_buttons.extend([[KeyboardButton(text=cmd)] for cmd in current_commands])
+    keyboard_buttons.extend(_ADMIN_COMMAND_ROWS if is_admin else _USER_COMMAND_ROWS)
     return ReplyKeyboardMarkup(
         keyboard=keyboard_buttons,
         resize_keyboard=True,
@@ -176,8 +390,17 @@ async def get_main_reply_keyboard(user_id: int) -> ReplyKeyboardMarkup:
 
 # Function to get the help InlineKeyboardMarkup
 async def get_help_inline_keyboard(user_id: int) -> InlineKeyboardMarkup:
-    lang = await translator.get_language(user_id)
+    lang = await _get_lang(user_id)
+    is_admin = user_id in ADMIN_USER_IDS
+    cache_key = (lang, is_admin, PUBLIC_SITE_URL)
+    markup = help_keyboard_cache.get(cache_key)
+    if markup is None:
+        markup = _build_help_inline_keyboard(lang, is_admin)
+        help_keyboard_cache[cache_key] = markup
+    return markup
 
+
+def _build_help_inline_keyboard(lang: str, is_admin: bool) -> InlineKeyboardMarkup:
     inline_keyboard_rows = [
         [
             InlineKeyboardButton(
@@ -187,111 +410,11 @@ async def get_help_inline_keyboard(user_id: int) -> InlineKeyboardMarkup:
         ]
         for text_key, url in _get_web_app_button_specs()
     ]
+    commands = HELP_COMMANDS + (HELP_ADMIN_COMMANDS if is_admin else ()) + ("help",)
+    texts = translator.gettext_many(lang, tuple(f"help_btn_{cmd}" for cmd in commands))
     inline_keyboard_rows.extend(
-        [
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_matp_all"),
-                    callback_data="help_cmd_matp_all",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_matp_search"),
-                    callback_data="help_cmd_matp_search",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_search"),
-                    callback_data="help_cmd_search",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_search_presets"),
-                    callback_data="help_cmd_search_presets",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_schedule"),
-                    callback_data="help_cmd_schedule",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_myschedule"),
-                    callback_data="help_cmd_myschedule",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_lec_search"),
-                    callback_data="help_cmd_lec_search",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_lec_all"),
-                    callback_data="help_cmd_lec_all",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_favorites"),
-                    callback_data="help_cmd_favorites",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_settings"),
-                    callback_data="help_cmd_settings",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_latex"), callback_data="help_cmd_latex"
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_mermaid"),
-                    callback_data="help_cmd_mermaid",
-                )
-            ],  # <--- ДОБАВЛЕНА ЗАПЯТАЯ
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_offershorter"),
-                    callback_data="help_cmd_offershorter",
-                )
-            ],
-        ]
-    )
-    if user_id in ADMIN_USER_IDS:
-        inline_keyboard_rows.append(
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_update"),
-                    callback_data="help_cmd_update",
-                )
-            ]
-        )
-        inline_keyboard_rows.append(
-            [
-                InlineKeyboardButton(
-                    text=translator.gettext(lang, "help_btn_clear_cache"),
-                    callback_data="help_cmd_clear_cache",
-                )
-            ]
-        )
-
-    inline_keyboard_rows.append(
-        [
-            InlineKeyboardButton(
-                text=translator.gettext(lang, "help_btn_help"), callback_data="help_cmd_help"
-            )
-        ]
+        [InlineKeyboardButton(text=text, callback_data=f"help_cmd_{cmd}")]
+        for cmd, text in zip(commands, texts)
     )
     return InlineKeyboardMarkup(inline_keyboard=inline_keyboard_rows)
 
@@ -302,8 +425,8 @@ def get_code_action_keyboard(code_path: str) -> InlineKeyboardMarkup:
     :param code_path: Уникальный путь к коду, например "pyplot.line_plot.simple_plot"
     """
     # Используем хэш для длинных путей, чтобы избежать ошибки Telegram "BUTTON_DATA_INVALID"
-    path_hash = hashlib.sha1(code_path.encode()).hexdigest()[:16]
-    code_path_cache[path_hash] = code_path
+    path_hash = callback_hash(code_path)
+    code_path_cache[path_hash] = sys.intern(code_path)
 
     builder = InlineKeyboardBuilder()
     builder.row(
@@ -317,26 +440,27 @@ async def get_repo_management_keyboard(
     user_id: int, state: FSMContext | None = None, chat_id: int | None = None
 ) -> InlineKeyboardMarkup:
     """Creates an inline keyboard for managing user repositories."""
-    lang = await translator.get_language(user_id, chat_id)
-    repos = await database.get_user_repos(user_id)
+    # FSM state lives in Redis, so its read is overlapped with the other two lookups too
+    lang, repos, current_state_str = await asyncio.gather(
+        _get_lang(user_id, chat_id),
+        database.get_user_repos(user_id),
+        state.get_state() if state else asyncio.sleep(0, result=None),
+    )
     builder = InlineKeyboardBuilder()
-    current_state_str = await state.get_state() if state else None
 
-    for repo_path in repos:
-        repo_hash = hashlib.sha1(repo_path.encode()).hexdigest()[:16]
-        code_path_cache[repo_hash] = repo_path
+    repo_hashes = list(map(callback_hash, repos))
+    code_path_cache.update(zip(repo_hashes, map(sys.intern, repos)))
+    remove_text = _gt(lang, "favorites_remove_btn")
+    for repo_path, repo_hash in zip(repos, repo_hashes):
         builder.row(
             InlineKeyboardButton(text=f"📂 {repo_path}", callback_data="noop"),
             InlineKeyboardButton(text="✏️", callback_data=f"repo_edit_hash:{repo_hash}"),
             InlineKeyboardButton(text="🔄", callback_data=f"repo_index_hash:{repo_hash}"),
-            InlineKeyboardButton(
-                text=translator.gettext(lang, "favorites_remove_btn"),
-                callback_data=f"repo_del_hash:{repo_hash}",
-            ),
+            InlineKeyboardButton(text=remove_text, callback_data=f"repo_del_hash:{repo_hash}"),
         )
     builder.row(
         InlineKeyboardButton(
-            text=translator.gettext(lang, "onboarding_btn_add_repo"), callback_data="repo_add_new"
+            text=_gt(lang, "onboarding_btn_add_repo"), callback_data="repo_add_new"
         )
     )
 
@@ -344,44 +468,51 @@ async def get_repo_management_keyboard(
     if current_state_str == "onboarding:github":
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "onboarding_back_to_tour"),
+                text=_gt(lang, "onboarding_back_to_tour"),
                 callback_data="go_to_onboarding_library",
             )
         )
     else:
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "back_to_settings"), callback_data="back_to_settings"
+                text=_gt(lang, "back_to_settings"), callback_data="back_to_settings"
             )
         )
     return builder.as_markup()
 
 
 async def get_schedule_type_keyboard(lang: str, history_items: list = None) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    builder.row(
-        InlineKeyboardButton(
-            text=translator.gettext(lang, "schedule_btn_group"), callback_data="sch_type_group"
-        ),
-        InlineKeyboardButton(
-            text=translator.gettext(lang, "schedule_btn_teacher"), callback_data="sch_type_person"
+    # Without history the keyboard depends only on the language.
+    if not history_items:
+        markup = schedule_type_keyboard_cache.get(lang)
+        if markup is None:
+            markup = _build_schedule_type_keyboard(lang, None)
+            schedule_type_keyboard_cache[lang] = markup
+        return markup
+    return _build_schedule_type_keyboard(lang, history_items)
+
+
+def _build_schedule_type_keyboard(lang: str, history_items: list | None) -> InlineKeyboardMarkup:
+    group_text, teacher_text, auditorium_text, previous_text = translator.gettext_many(
+        lang,
+        (
+            "schedule_btn_group",
+            "schedule_btn_teacher",
+            "schedule_btn_auditorium",
+            "schedule_previous_searches",
         ),
     )
+    builder = InlineKeyboardBuilder()
     builder.row(
-        InlineKeyboardButton(
-            text=translator.gettext(lang, "schedule_btn_auditorium"),
-            callback_data="sch_type_auditorium",
-        )
+        InlineKeyboardButton(text=group_text, callback_data="sch_type_group"),
+        InlineKeyboardButton(text=teacher_text, callback_data="sch_type_person"),
     )
+    builder.row(InlineKeyboardButton(text=auditorium_text, callback_data="sch_type_auditorium"))
 
     # --- NEW: Add history buttons if they exist ---
     if history_items:
         builder.row(InlineKeyboardButton(text="---", callback_data="noop"))
-        builder.row(
-            InlineKeyboardButton(
-                text=translator.gettext(lang, "schedule_previous_searches"), callback_data="noop"
-            )
-        )
+        builder.row(InlineKeyboardButton(text=previous_text, callback_data="noop"))
         for item in history_items:
             builder.row(
                 InlineKeyboardButton(
@@ -391,7 +522,7 @@ async def get_schedule_type_keyboard(lang: str, history_items: list = None) -> I
             )
         builder.row(
             InlineKeyboardButton(
-                text=translator.gettext(lang, "schedule_clear_history_btn"),
+                text=_gt(lang, "schedule_clear_history_btn"),
                 callback_data="sch_clear_history",
             )
         )
@@ -402,29 +533,39 @@ async def get_schedule_type_keyboard(lang: str, history_items: list = None) -> I
 def build_search_results_keyboard(
     results: list[dict[str, Any]], search_type: str
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
+    if not results:
+        return InlineKeyboardMarkup(inline_keyboard=[])
+
     # Special handling for the subscribe button which has a different data structure
     # We hash the long data to avoid hitting the 64-byte callback_data limit.
     if search_type == "subscribe":
         item = results[0]
         data_to_hash = item["id"]  # e.g., "person:uuid:Name"
-        data_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()[:16]
-        code_path_cache[data_hash] = data_to_hash  # Store the full data in the cache
-        builder.row(
-            InlineKeyboardButton(
-                text=item["label"], callback_data=f"sch_subscribe_hash:{data_hash}"
-            )
+        data_hash = callback_hash(data_to_hash)
+        code_path_cache[data_hash] = sys.intern(data_to_hash)  # Store the full data in the cache
+        return InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=item["label"], callback_data=f"sch_subscribe_hash:{data_hash}"
+                    )
+                ]
+            ]
         )
-        return builder.as_markup()
 
-    for item in results[:20]:  # Limit to 20 results to avoid hitting Telegram limits
-        builder.row(
-            InlineKeyboardButton(
-                text=item["label"],
-                callback_data=f"sch_result_:{item.get('type', search_type)}:{item['id']}",
-            )
-        )
-    return builder.as_markup()
+    # One button per row; the rows go straight into the markup, skipping the builder's
+    # per-row validation and the copy in as_markup().
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=item["label"],
+                    callback_data=f"sch_result_:{item.get('type', search_type)}:{item['id']}",
+                )
+            ]
+            for item in results[:20]  # Limit to 20 results to avoid hitting Telegram limits
+        ]
+    )
 
 
 def build_calendar_keyboard(
@@ -438,32 +579,35 @@ def build_calendar_keyboard(
     """Builds an inline calendar keyboard for a given month and year."""
     builder = InlineKeyboardBuilder()
 
+    # Parts of callback_data shared by every button of this render
+    entity = f"{entity_type}:{entity_id}"
+    nav_suffix = f"{year}:{month}:{entity}"
+    date_prefix = f"sch_date_:{entity}:{year:04d}-{month:02d}-"
+
     # Month and year navigation
-    month_names = translator.gettext(lang, "calendar_months").split(",")
+    month_names = _gt_list(lang, "calendar_months")
     month_name = month_names[month - 1]
     builder.row(
-        InlineKeyboardButton(
-            text="«", callback_data=f"cal_nav:prev_year:{year}:{month}:{entity_type}:{entity_id}"
-        ),
-        InlineKeyboardButton(
-            text="<", callback_data=f"cal_nav:prev_month:{year}:{month}:{entity_type}:{entity_id}"
-        ),
+        InlineKeyboardButton(text="«", callback_data=f"cal_nav:prev_year:{nav_suffix}"),
+        InlineKeyboardButton(text="<", callback_data=f"cal_nav:prev_month:{nav_suffix}"),
         InlineKeyboardButton(text=f"{month_name} {year}", callback_data="noop"),
-        InlineKeyboardButton(
-            text=">", callback_data=f"cal_nav:next_month:{year}:{month}:{entity_type}:{entity_id}"
-        ),
-        InlineKeyboardButton(
-            text="»", callback_data=f"cal_nav:next_year:{year}:{month}:{entity_type}:{entity_id}"
-        ),
+        InlineKeyboardButton(text=">", callback_data=f"cal_nav:next_month:{nav_suffix}"),
+        InlineKeyboardButton(text="»", callback_data=f"cal_nav:next_year:{nav_suffix}"),
     )
 
     # Days of the week header
-    day_names = translator.gettext(lang, "calendar_days_short").split(",")
-    builder.row(*[InlineKeyboardButton(text=day, callback_data="noop") for day in day_names])
-
-    # Calendar days
-    month_calendar = calendar.monthcalendar(year, month)
-    today = datetime.now().date()
+    builder.row(*_calendar_day_header(lang))
+
+    # Calendar days. Highlights are matched by day number within this month,
+    # so no date object is built per cell.
+    month_calendar = _month_weeks(year, month)
+    today = date.today()
+    today_day = today.day if (today.year, today.month) == (year, month) else None
+    selected_day = (
+        selected_date.day
+        if selected_date and (selected_date.year, selected_date.month) == (year, month)
+        else None
+    )
 
     for week in month_calendar:
         week_buttons = []
@@ -471,44 +615,39 @@ def build_calendar_keyboard(
             if day == 0:
                 week_buttons.append(InlineKeyboardButton(text=" ", callback_data="noop"))
             else:
-                current_date = datetime(year, month, day).date()
-                date_str = current_date.strftime("%Y-%m-%d")
                 label = str(day)
 
                 # Highlight the selected date, with priority over today's date
-                if selected_date and current_date == selected_date:
+                if day == selected_day:
                     label = f"*{label}*"
-                elif current_date == today:
+                elif day == today_day:
                     label = f"[{label}]"
 
-                callback_data = f"sch_date_:{entity_type}:{entity_id}:{date_str}"
+                callback_data = f"{date_prefix}{day:02d}"
                 week_buttons.append(InlineKeyboardButton(text=label, callback_data=callback_data))
         builder.row(*week_buttons)
 
     # --- Add weekly view buttons ---
-    first_day_of_month = datetime(year, month, 1).date()
+    first_day_of_month = date(year, month, 1)
     # Find the Monday of the first week
     start_of_first_week = first_day_of_month - timedelta(days=first_day_of_month.weekday())
 
+    week_template = translator.get_template(lang, "schedule_view_week")
     current_week_start = start_of_first_week
     while current_week_start.month <= month:
         week_end = current_week_start + timedelta(days=6)
-        label = translator.gettext(
-            lang,
-            "schedule_view_week",
-            start=current_week_start.strftime("%d.%m"),
-            end=week_end.strftime("%d.%m"),
-        )
-        callback_data = (
-            f"sch_week_:{entity_type}:{entity_id}:{current_week_start.strftime('%Y-%m-%d')}"
+        label = week_template.format(
+            start=f"{current_week_start.day:02d}.{current_week_start.month:02d}",
+            end=f"{week_end.day:02d}.{week_end.month:02d}",
         )
+        callback_data = f"sch_week_:{entity}:{current_week_start.isoformat()}"
         builder.row(InlineKeyboardButton(text=label, callback_data=callback_data))
         current_week_start += timedelta(weeks=1)
         if current_week_start.year > year:
             break  # Stop if we roll into the next year
 
     # Add a "Today" button to quickly jump back to the current month
-    today_btn_text = translator.gettext(lang, "schedule_date_today")
+    today_btn_text = _gt(lang, "schedule_date_today")
     builder.row(
         InlineKeyboardButton(
             text=today_btn_text,
@@ -517,7 +656,7 @@ def build_calendar_keyboard(
     )
 
     # Add a "Back to Search Results" button
-    back_btn_text = translator.gettext(lang, "schedule_back_to_results")
+    back_btn_text = _gt(lang, "schedule_back_to_results")
     builder.row(InlineKeyboardButton(text=back_btn_text, callback_data="sch_back_to_results"))
 
     return builder.as_markup()
@@ -548,7 +687,7 @@ async def get_modules_keyboard(
         )
 
     sub = await database.get_subscription_by_id(sub_id)
-    lang = await translator.get_language(sub["user_id"])
+    lang = await _get_lang(sub["user_id"])
     # <<< ИЗМЕНЕНИЕ >>>
     builder.row(
         InlineKeyboardButton(
@@ -581,7 +720,7 @@ def get_myschedule_calendar_keyboard(
     builder = InlineKeyboardBuilder()
 
     # 1. Навигация
-    month_names = translator.gettext(lang, "calendar_months").split(",")
+    month_names = _gt_list(lang, "calendar_months")
     month_name = month_names[month - 1]
 
     # <<< ИЗМЕНЕНИЯ >>>
@@ -602,18 +741,17 @@ def get_myschedule_calendar_keyboard(
     builder.row(
         InlineKeyboardButton(text="<<", callback_data=f"mysch_nav:prev:{year}:{month}"),
         InlineKeyboardButton(
-            text=translator.gettext(lang, "schedule_date_today"),
+            text=_gt(lang, "schedule_date_today"),
             callback_data="mysch_nav:today:0:0",
         ),
         InlineKeyboardButton(text=">>", callback_data=f"mysch_nav:next:{year}:{month}"),
     )
 
     # Дни недели
-    day_names = translator.gettext(lang, "calendar_days_short").split(",")
-    builder.row(*[InlineKeyboardButton(text=day, callback_data="noop") for day in day_names])
+    builder.row(*_calendar_day_header(lang))
 
     # Сетка дней
-    month_calendar = calendar.monthcalendar(year, month)
+    month_calendar = _month_weeks(year, month)
     for week in month_calendar:
         row_buttons = []
         for day in week:
@@ -633,6 +771,8 @@ def get_myschedule_calendar_keyboard(
     start_of_first_week = first_day_of_month - timedelta(days=first_day_of_month.weekday())
 
     current_week_start = start_of_first_week
+    last_day_of_month = date(year, month, calendar.monthrange(year, month)[1])
+    week_template = translator.get_template(lang, "schedule_view_week")
 
     # Генерируем строки недель, пока неделя начинается в этом месяце или перекрывает его
     # (Упрощение: просто 5-6 недель, покрывающих месяц)
@@ -640,21 +780,18 @@ def get_myschedule_calendar_keyboard(
         # Если начало недели ушло в следующий месяц, прерываемся,
         # но только если это не первая неделя следующего месяца, которая может содержать конец текущего.
         # Более надежно: проверяем, что week_start <= последнего дня месяца
-        last_day_of_month = date(year, month, calendar.monthrange(year, month)[1])
         if current_week_start > last_day_of_month:
             break
 
         week_end = current_week_start + timedelta(days=6)
 
         # Формируем кнопку
-        label = translator.gettext(
-            lang,
-            "schedule_view_week",
-            start=current_week_start.strftime("%d.%m"),
-            end=week_end.strftime("%d.%m"),
+        label = week_template.format(
+            start=f"{current_week_start.day:02d}.{current_week_start.month:02d}",
+            end=f"{week_end.day:02d}.{week_end.month:02d}",
         )
         # mysch_week:YYYY-MM-DD
-        callback_data = f"mysch_week:{current_week_start.strftime('%Y-%m-%d')}"
+        callback_data = f"mysch_week:{current_week_start.isoformat()}"
         builder.row(InlineKeyboardButton(text=label, callback_data=callback_data))
 
         current_week_start += timedelta(weeks=1)
@@ -671,7 +808,7 @@ async def get_myschedule_filters_keyboard(
     excluded_subs = filter_config.get("excluded_subs", [])
     excluded_types = filter_config.get("excluded_types", [])
 
-    lang = await translator.get_language(user_id)
+    lang = await _get_lang(user_id)
     builder.row(
         InlineKeyboardButton(
             text=translator.gettext(lang, "kb_header_filter_presets"), callback_data="noop"
@@ -1,52 +1,188 @@
+import asyncio
+import atexit
 import logging
 import os
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 
 from aiogram import BaseMiddleware
 from aiogram.types import Update
 
 from shared_lib.request_context import configure_correlation_logging
 
-from .database import log_user_action
+from .database import ensure_user_exists, log_user_actions_batch
+
+# Records are formatted on the event loop (the correlation id lives in a contextvar there)
+# and written to stderr by a listener thread, so a slow log pipe never blocks update handling.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logging.getLogger("aiogram.event").setLevel(logging.WARNING)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - [cid=%(correlation_id)s] - %(name)s - %(module)s.%(funcName)s:%(lineno)d - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[logging.StreamHandler()],
+    handlers=[QueueHandler(_log_queue)],
 )
 configure_correlation_logging()
 
+logger = logging.getLogger(__name__)
+
 AVATAR_CACHE_TTL_SECONDS = int(os.getenv("AVATAR_CACHE_TTL_SECONDS", "21600"))
 AVATAR_ERROR_CACHE_TTL_SECONDS = int(os.getenv("AVATAR_ERROR_CACHE_TTL_SECONDS", "900"))
-_avatar_cache: dict[int, tuple[float, str | None]] = {}
+AVATAR_CACHE_MAXSIZE = 10_000
+# user_id -> (expires_at, url, file_unique_id of the photo behind url).
+# Insertion-ordered, so the oldest entry is evicted first.
+_avatar_cache: dict[int, tuple[float, str | None, str | None]] = {}
+# user_id -> in-flight lookup, so concurrent updates from one user share a single fetch.
+_avatar_fetches: dict[int, asyncio.Task] = {}
 
 
-async def _get_avatar_pic_url(bot, user_id: int) -> str | None:
-    if not bot or not user_id:
-        return None
+def _store_avatar(
+    user_id: int, ttl: int, avatar_pic_url: str | None, file_unique_id: str | None = None
+) -> None:
+    _avatar_cache.pop(user_id, None)
+    if len(_avatar_cache) >= AVATAR_CACHE_MAXSIZE:
+        del _avatar_cache[next(iter(_avatar_cache))]
+    _avatar_cache[user_id] = (time.time() + ttl, avatar_pic_url, file_unique_id)
 
-    now = time.time()
-    cached = _avatar_cache.get(user_id)
-    if cached and cached[0] > now:
-        return cached[1]
 
+async def _fetch_avatar_pic_url(bot, user_id: int) -> str | None:
     try:
         user_photos = await bot.get_user_profile_photos(user_id, limit=1)
         avatar_pic_url = None
+        file_unique_id = None
         if user_photos and user_photos.photos and user_photos.photos[0]:
-            file_id = user_photos.photos[0][0].file_id
-            file_info = await bot.get_file(file_id)
-            avatar_pic_url = f"https://api.telegram.org/file/bot{bot.token}/{file_info.file_path}"
+            photo = user_photos.photos[0][0]
+            file_unique_id = photo.file_unique_id
+            previous = _avatar_cache.get(user_id)
+            if previous and previous[1] and previous[2] == file_unique_id:
+                # Same photo as last time: its file path is already known, skip getFile
+                avatar_pic_url = previous[1]
+            else:
+                file_info = await bot.get_file(photo.file_id)
+                avatar_pic_url = (
+                    f"https://api.telegram.org/file/bot{bot.token}/{file_info.file_path}"
+                )
 
-        _avatar_cache[user_id] = (now + AVATAR_CACHE_TTL_SECONDS, avatar_pic_url)
+        _store_avatar(user_id, AVATAR_CACHE_TTL_SECONDS, avatar_pic_url, file_unique_id)
         return avatar_pic_url
     except Exception as e:
-        logging.warning(f"Failed to fetch avatar for user {user_id}: {e}")
-        _avatar_cache[user_id] = (now + AVATAR_ERROR_CACHE_TTL_SECONDS, None)
+        logger.warning(f"Failed to fetch avatar for user {user_id}: {e}")
+        _store_avatar(user_id, AVATAR_ERROR_CACHE_TTL_SECONDS, None)
+        return None
+
+
+async def _get_avatar_pic_url(bot, user_id: int, allow_stale: bool = False) -> str | None:
+    """
+    allow_stale returns an expired entry instead of refreshing it; only users with no
+    entry at all trigger a fetch then.
+    """
+    if not bot or not user_id:
         return None
 
+    cached = _avatar_cache.get(user_id)
+    if cached and (allow_stale or cached[0] > time.time()):
+        return cached[1]
+
+    task = _avatar_fetches.get(user_id)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_avatar_pic_url(bot, user_id))
+        _avatar_fetches[user_id] = task
+        task.add_done_callback(lambda _: _avatar_fetches.pop(user_id, None))
+    # shield: a cancelled update must not cancel the lookup other updates are awaiting
+    return await asyncio.shield(task)
+
+
+KNOWN_USERS_MAXSIZE = 50_000
+# Users whose row this process has already ensured, insertion-ordered so the oldest id is evicted
+# first. The first update from any other user creates the row before its handler runs.
+_known_user_ids: dict[int, None] = {}
+
+
+async def _ensure_user_row(
+    user_id: int, username: str | None, full_name: str | None, avatar_pic_url: str | None
+) -> None:
+    if user_id in _known_user_ids:
+        return
+    try:
+        await ensure_user_exists(user_id, username, full_name, avatar_pic_url)
+    except Exception as e:
+        logger.error(f"Failed to ensure user {user_id} exists: {e}", exc_info=True)
+        return
+    if len(_known_user_ids) >= KNOWN_USERS_MAXSIZE:
+        del _known_user_ids[next(iter(_known_user_ids))]
+    _known_user_ids[user_id] = None
+
+
+ACTION_LOG_BATCH_SIZE = 200
+ACTION_LOG_FLUSH_INTERVAL_SECONDS = 1.0
+ACTION_LOG_QUEUE_MAXSIZE = 10_000
+# Rows for log_user_actions_batch; None is the stop sentinel put by flush_user_actions.
+_action_log_queue: asyncio.Queue | None = None
+_action_log_flusher: asyncio.Task | None = None
+
+
+async def _write_user_actions(rows: list[tuple]) -> None:
+    try:
+        await log_user_actions_batch(rows)
+        return
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error(f"Failed to write user action for user {rows[0][0]}: {e}", exc_info=True)
+            return
+        logger.warning(f"Failed to write {len(rows)} user actions, retrying one by one: {e}")
+    # One bad row fails the whole transaction: write the rows separately so only it is lost
+    for row in rows:
+        await _write_user_actions([row])
+
+
+async def _run_action_log_flusher(queue: asyncio.Queue) -> None:
+    """Writes queued actions in batches of up to ACTION_LOG_BATCH_SIZE, at least once a second."""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        row = await queue.get()
+        if row is None:
+            break
+        rows = [row]
+        deadline = loop.time() + ACTION_LOG_FLUSH_INTERVAL_SECONDS
+        while len(rows) < ACTION_LOG_BATCH_SIZE:
+            try:
+                row = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except TimeoutError:
+                break
+            if row is None:
+                stopping = True
+                break
+            rows.append(row)
+        await _write_user_actions(rows)
+
+
+def _enqueue_user_action(row: tuple) -> None:
+    global _action_log_queue, _action_log_flusher
+    if _action_log_queue is None:
+        _action_log_queue = asyncio.Queue(maxsize=ACTION_LOG_QUEUE_MAXSIZE)
+    if _action_log_flusher is None or _action_log_flusher.done():
+        _action_log_flusher = asyncio.create_task(_run_action_log_flusher(_action_log_queue))
+    try:
+        _action_log_queue.put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning(f"User action log queue is full, dropping action for user {row[0]}")
+
+
+async def flush_user_actions() -> None:
+    """Writes every queued action and stops the flusher. Called on bot shutdown."""
+    global _action_log_flusher
+    if _action_log_flusher is None or _action_log_flusher.done():
+        return
+    await _action_log_queue.put(None)
+    await _action_log_flusher
+    _action_log_flusher = None
+
 
 class UserLoggingMiddleware(BaseMiddleware):
     async def __call__(self, handler, event: Update, data):
@@ -58,70 +194,65 @@ class UserLoggingMiddleware(BaseMiddleware):
         action_type = "unknown_event"
         action_details = None
 
-        console_log_message = "Received unknown update type."
-
-        if event.message:
-            user = event.message.from_user
+        message = event.message
+        callback_query = event.callback_query
+        if message:
+            user = message.from_user
             user_id = user.id
             tg_username = user.username
             full_name = user.full_name
 
             if bot and user:
-                avatar_pic_url = await _get_avatar_pic_url(bot, user.id)
-
-            if event.message.text and event.message.text.startswith("/"):
-                action_type = "command"
-                action_details = event.message.text
-            elif event.message.text:
-                action_type = "text_message"
-                action_details = event.message.text
-            elif event.message.photo:
+                avatar_pic_url = await _get_avatar_pic_url(bot, user_id)
+
+            text = message.text
+            if text:
+                action_type = "command" if text.startswith("/") else "text_message"
+                action_details = text
+            elif photo := message.photo:
                 action_type = "photo_message"
-                action_details = (
-                    f"Photo ID: {event.message.photo[-1].file_id}. "
-                    f"Caption: {event.message.caption or ''}"
-                )
-            elif event.message.document:
+                action_details = f"Photo ID: {photo[-1].file_id}. Caption: {message.caption or ''}"
+            elif document := message.document:
                 action_type = "document_message"
                 action_details = (
-                    f"Document: {event.message.document.file_name or 'N/A'}. "
-                    f"Caption: {event.message.caption or ''}"
+                    f"Document: {document.file_name or 'N/A'}. Caption: {message.caption or ''}"
                 )
             else:
                 action_type = "other_message"
-                action_details = f"Message type: {event.message.content_type}"
+                action_details = f"Message type: {message.content_type}"
 
-            console_log_message = (
-                f"User: {full_name} (@{tg_username or 'no_username'}), "
-                f"Action: {action_type}, Details: {str(action_details)[:100] if action_details else ''}"
-            )
-
-        elif event.callback_query:
-            user = event.callback_query.from_user
+        elif callback_query:
+            user = callback_query.from_user
             user_id = user.id
             tg_username = user.username
             full_name = user.full_name
 
             if bot and user:
-                avatar_pic_url = await _get_avatar_pic_url(bot, user.id)
+                # Button presses are the most frequent updates: they never refresh an
+                # expired avatar, the user's next message does.
+                avatar_pic_url = await _get_avatar_pic_url(bot, user_id, allow_stale=True)
 
             action_type = "callback_query"
-            action_details = event.callback_query.data
-            console_log_message = (
-                f"User: {full_name} (@{tg_username or 'no_username'}), "
-                f"Action: {action_type}, Details: {action_details}"
-            )
+            action_details = callback_query.data
 
-        logging.info(console_log_message)
+        # The console line is only built when INFO is enabled (production may run at WARNING)
+        if logger.isEnabledFor(logging.INFO):
+            if user_id:
+                # Message details are truncated for the console, callback data is short already
+                details = action_details[:100] if message else action_details
+                logger.info(
+                    f"User: {full_name} (@{tg_username or 'no_username'}), "
+                    f"Action: {action_type}, Details: {details}"
+                )
+            else:
+                logger.info("Received unknown update type.")
 
         if user_id:
-            await log_user_action(
-                user_id,
-                tg_username,
-                full_name,
-                avatar_pic_url,
-                action_type,
-                action_details,
+            # The users row must exist before the handler writes settings, favorites or repos;
+            # the action itself and the profile refresh are written by the background flusher.
+            await _ensure_user_row(user_id, tg_username, full_name, avatar_pic_url)
+            _enqueue_user_action(
+                (user_id, tg_username, full_name, avatar_pic_url, action_type, action_details)
             )
 
         return await handler(event, data)
@@ -1,6 +1,6 @@
 import asyncio
+import functools
 import logging
-import os
 from contextlib import suppress
 
 import aiohttp
@@ -18,21 +18,20 @@ from shared_lib.egress import (
     get_telegram_proxy_url,
 )
 from shared_lib.i18n import translator
-from shared_lib.services.university_api import create_ruz_api_client
+from shared_lib.services.university_api import create_ruz_api_client, create_ruz_connector
 from shared_lib.telegram_bot_session import TelegramBotSession
 from shared_lib.telegram_http import normalize_proxy_url
 from shared_lib.telegram_polling import run_polling_with_retry
 from shared_lib.telemetry import configure_service_telemetry
 
+from .config import BOT_TOKEN, POLLING_RETRY_DELAY_SECONDS
 from .handlers import setup_handlers
-from .logger import UserLoggingMiddleware
+from .logger import UserLoggingMiddleware, flush_user_actions
 from .middleware import GroupMentionCommandMiddleware
 from .services.search_utils import index_matplobblib_library
 from .tracing import BotTracingMiddleware
 
-BOT_TOKEN = os.getenv("BOT_TOKEN")
 TELEGRAM_PROXY_URL = get_telegram_proxy_url()
-POLLING_RETRY_DELAY_SECONDS = float(os.getenv("BOT_POLLING_RETRY_DELAY_SECONDS", "15"))
 
 configure_process_http_proxy_env(
     get_global_http_proxy_url(),
@@ -41,106 +40,59 @@ configure_process_http_proxy_env(
 configure_service_telemetry("matplobbot-bot")
 
 
-def get_cmd_desc(lang: str, key: str) -> str:
-    """
-    Safely extracts a command description from a translation string.
-    Expected format: 'Icon /command - Description'.
-    If the delimiter is missing, returns the full string.
-    """
-    text = translator.gettext(lang, key)
-    parts = text.split(" - ")
-    if len(parts) > 1:
-        return parts[1]
-    return text
+# Private-chat menu, in display order; descriptions come from Translator.get_command_descriptions.
+USER_COMMANDS = (
+    "start",
+    "help",
+    "schedule",
+    "myschedule",
+    "studio",
+    "matp_all",
+    "matp_search",
+    "search",
+    "search_presets",
+    "lec_all",
+    "lec_search",
+    "favorites",
+    "settings",
+    "latex",
+    "mermaid",
+    "offershorter",
+    "cancel",
+)
 
 
-async def set_bot_commands(bot: Bot):
-    """Sets the bot's command list in the UI for different user scopes."""
+@functools.lru_cache(maxsize=4)
+def _build_commands(lang: str) -> tuple[types.BotCommand, ...]:
+    """The private-chat command list for one language; built once, reused on polling restarts."""
+    descriptions = translator.get_command_descriptions(lang)
+    return tuple(
+        types.BotCommand(command=command, description=descriptions.get(command, command))
+        for command in USER_COMMANDS
+    )
 
-    user_commands_ru = [
-        types.BotCommand(
-            command="start", description=translator.gettext("ru", "command_desc_start")
-        ),
-        types.BotCommand(command="help", description=get_cmd_desc("ru", "help_btn_help")),
-        types.BotCommand(command="schedule", description=get_cmd_desc("ru", "help_btn_schedule")),
-        types.BotCommand(
-            command="myschedule", description=get_cmd_desc("ru", "help_btn_myschedule")
-        ),
-        types.BotCommand(
-            command="studio", description=translator.gettext("ru", "command_desc_studio")
-        ),
-        types.BotCommand(command="matp_all", description=get_cmd_desc("ru", "help_btn_matp_all")),
-        types.BotCommand(
-            command="matp_search", description=get_cmd_desc("ru", "help_btn_matp_search")
-        ),
-        types.BotCommand(command="search", description=get_cmd_desc("ru", "help_btn_search")),
-        types.BotCommand(
-            command="search_presets",
-            description=get_cmd_desc("ru", "help_btn_search_presets"),
-        ),
-        types.BotCommand(command="lec_all", description=get_cmd_desc("ru", "help_btn_lec_all")),
-        types.BotCommand(
-            command="lec_search", description=get_cmd_desc("ru", "help_btn_lec_search")
-        ),
-        types.BotCommand(command="favorites", description=get_cmd_desc("ru", "help_btn_favorites")),
-        types.BotCommand(command="settings", description=get_cmd_desc("ru", "help_btn_settings")),
-        types.BotCommand(command="latex", description=get_cmd_desc("ru", "help_btn_latex")),
-        types.BotCommand(command="mermaid", description=get_cmd_desc("ru", "help_btn_mermaid")),
-        types.BotCommand(
-            command="offershorter", description=get_cmd_desc("ru", "help_btn_offershorter")
-        ),
-        types.BotCommand(
-            command="cancel", description=translator.gettext("ru", "command_desc_cancel")
-        ),
-    ]
-
-    user_commands_en = [
-        types.BotCommand(
-            command="start", description=translator.gettext("en", "command_desc_start")
-        ),
-        types.BotCommand(command="help", description=get_cmd_desc("en", "help_btn_help")),
-        types.BotCommand(command="schedule", description=get_cmd_desc("en", "help_btn_schedule")),
-        types.BotCommand(
-            command="myschedule", description=get_cmd_desc("en", "help_btn_myschedule")
-        ),
-        types.BotCommand(
-            command="studio", description=translator.gettext("en", "command_desc_studio")
-        ),
-        types.BotCommand(command="matp_all", description=get_cmd_desc("en", "help_btn_matp_all")),
-        types.BotCommand(
-            command="matp_search", description=get_cmd_desc("en", "help_btn_matp_search")
-        ),
-        types.BotCommand(command="search", description=get_cmd_desc("en", "help_btn_search")),
-        types.BotCommand(
-            command="search_presets",
-            description=get_cmd_desc("en", "help_btn_search_presets"),
-        ),
-        types.BotCommand(command="lec_all", description=get_cmd_desc("en", "help_btn_lec_all")),
-        types.BotCommand(
-            command="lec_search", description=get_cmd_desc("en", "help_btn_lec_search")
-        ),
-        types.BotCommand(command="favorites", description=get_cmd_desc("en", "help_btn_favorites")),
-        types.BotCommand(command="settings", description=get_cmd_desc("en", "help_btn_settings")),
-        types.BotCommand(command="latex", description=get_cmd_desc("en", "help_btn_latex")),
-        types.BotCommand(command="mermaid", description=get_cmd_desc("en", "help_btn_mermaid")),
-        types.BotCommand(
-            command="offershorter", description=get_cmd_desc("en", "help_btn_offershorter")
-        ),
-        types.BotCommand(
-            command="cancel", description=translator.gettext("en", "command_desc_cancel")
-        ),
-    ]
 
-    try:
-        await bot.set_my_commands(
-            user_commands_ru, scope=types.BotCommandScopeAllPrivateChats(), language_code="ru"
-        )
-        await bot.set_my_commands(
-            user_commands_en, scope=types.BotCommandScopeAllPrivateChats(), language_code="en"
-        )
+async def set_bot_commands(bot: Bot):
+    """Sets the bot's command list in the UI for different user scopes."""
+    languages = ("ru", "en")
+    results = await asyncio.gather(
+        *(
+            bot.set_my_commands(
+                list(_build_commands(lang)),
+                scope=types.BotCommandScopeAllPrivateChats(),
+                language_code=lang,
+            )
+            for lang in languages
+        ),
+        return_exceptions=True,
+    )
+    failed = False
+    for lang, result in zip(languages, results):
+        if isinstance(result, Exception):
+            failed = True
+            logging.error("Failed to set bot commands for '%s': %s", lang, result)
+    if not failed:
         logging.info("Default user commands have been set.")
-    except Exception as exc:
-        logging.error("Failed to set bot commands: %s", exc)
 
 
 async def run_bot_once(ruz_api_client_instance) -> None:
@@ -158,26 +110,41 @@ async def run_bot_once(ruz_api_client_instance) -> None:
     dp.update.middleware(UserLoggingMiddleware())
     setup_handlers(dp, bot=bot, ruz_api_client=ruz_api_client_instance)
 
+    # The command menu does not gate update handling: set it while polling starts up.
+    commands_task = asyncio.create_task(set_bot_commands(bot))
     try:
-        await set_bot_commands(bot)
         await dp.start_polling(bot)
     finally:
         logging.warning("Shutting down...")
+        commands_task.cancel()
+        with suppress(Exception):
+            await flush_user_actions()
         with suppress(Exception):
             await dp.storage.close()
         with suppress(Exception):
             await bot.session.close()
 
 
+def _log_index_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logging.error("Semantic index build failed", exc_info=task.exception())
+
+
 async def main():
+    if not BOT_TOKEN:
+        logging.critical("BOT_TOKEN is not set.")
+        raise ValueError("BOT_TOKEN is not set.")
+
     await init_db_pool()
 
-    logging.info("Building semantic search index...")
-    asyncio.create_task(index_matplobblib_library())
-    logging.info("Semantic index built.")
+    logging.info("Building semantic search index in the background...")
+    index_task = asyncio.create_task(index_matplobblib_library())
+    index_task.add_done_callback(_log_index_failure)
 
     timeout_client = aiohttp.ClientTimeout(total=600)
-    async with aiohttp.ClientSession(timeout=timeout_client, trust_env=False) as ruz_session:
+    async with aiohttp.ClientSession(
+        connector=create_ruz_connector(), timeout=timeout_client, trust_env=False
+    ) as ruz_session:
         ruz_api_client_instance = create_ruz_api_client(ruz_session)
         await run_polling_with_retry(
             lambda: run_bot_once(ruz_api_client_instance),
@@ -188,7 +155,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    run = asyncio.run
+    # libuv-based event loop; uvloop has no Windows build, where the stock loop is kept.
+    with suppress(ModuleNotFoundError):
+        import uvloop
+
+        run = uvloop.run
     try:
-        asyncio.run(main())
+        run(main())
     except (KeyboardInterrupt, SystemExit):
         logging.error("Bot stopped!")
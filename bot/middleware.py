@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import Awaitable, Callable
 from typing import Any
@@ -7,6 +8,8 @@ from aiogram.types import Message, Update
 
 logger = logging.getLogger(__name__)
 
+GROUP_CHAT_TYPES = frozenset({"group", "supergroup"})
+
 
 class GroupMentionCommandMiddleware(BaseMiddleware):
     """
@@ -19,6 +22,24 @@ class GroupMentionCommandMiddleware(BaseMiddleware):
     def __init__(self):
         # Cache for the bot's username to avoid repeated API calls.
         self.bot_username = None
+        # "@username" and its length, built once so each group message is a single startswith.
+        self._mention_prefix: str | None = None
+        self._mention_len = 0
+        # Concurrent first updates wait for one get_me() call instead of each making their own.
+        self._get_me_lock = asyncio.Lock()
+
+    async def _resolve_mention_prefix(self, bot: Bot) -> str | None:
+        async with self._get_me_lock:
+            if self._mention_prefix is None:
+                try:
+                    me = await bot.get_me()
+                except Exception as e:
+                    logger.error(f"Could not get bot info in GroupMentionCommandMiddleware: {e}")
+                    return None
+                self.bot_username = me.username
+                self._mention_len = len(me.username) + 1
+                self._mention_prefix = f"@{me.username}"
+        return self._mention_prefix
 
     async def __call__(
         self,
@@ -31,35 +52,33 @@ class GroupMentionCommandMiddleware(BaseMiddleware):
             return await handler(event, data)
 
         message: Message = event.message
+        entities = message.entities
         bot: Bot = data.get("bot")
 
-        # The middleware should only work in group chats and if the message has text and entities.
-        if (
-            message.chat.type in ("group", "supergroup")
+        # Cheap local checks first: only a group message that starts with a mention can need
+        # the bot's username, so every other message skips the get_me() await entirely.
+        if not (
+            entities
+            and entities[0].type == "mention"
+            and entities[0].offset == 0
+            and message.chat.type in GROUP_CHAT_TYPES
             and message.text
-            and message.entities
             and bot
         ):
-            # Fetch and cache the bot's username on the first run.
-            if self.bot_username is None:
-                try:
-                    me = await bot.get_me()
-                    self.bot_username = me.username
-                except Exception as e:
-                    logger.error(f"Could not get bot info in GroupMentionCommandMiddleware: {e}")
-                    # If we can't get the bot's username, we can't process mentions, so we exit.
-                    return await handler(event, data)
-
-            first_entity = message.entities[0]
+            return await handler(event, data)
 
-            # Check if the first entity is a mention at the beginning of the message and it matches the bot's username
-            if first_entity.type == "mention" and first_entity.offset == 0:
-                mention_text = message.text[
-                    first_entity.offset : first_entity.offset + first_entity.length
-                ]
-                if mention_text == f"@{self.bot_username}":
-                    # Modify the message text in-place to remove the mention
-                    original_text = message.text
-                    message.text = original_text[first_entity.length :].lstrip()
+        # Fetch and cache the bot's username on the first run.
+        mention_prefix = self._mention_prefix or await self._resolve_mention_prefix(bot)
+        # If we can't get the bot's username, we can't process mentions; pass the message on.
+        if (
+            mention_prefix is not None
+            and entities[0].length == self._mention_len
+            and message.text.startswith(mention_prefix)
+        ):
+            # aiogram objects are frozen: hand the handler a copy without the mention
+            message = message.model_copy(
+                update={"text": message.text[self._mention_len :].lstrip()}
+            )
+            event = event.model_copy(update={"message": message})
 
         return await handler(event, data)
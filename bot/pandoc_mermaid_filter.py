@@ -1,82 +1,289 @@
 #!/usr/bin/env python
 
+import functools
+import hashlib
 import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# pandoc runs this file as a bare script, so it must also work where orjson is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Configuration ---
 # Path to the mmdc executable inside the Docker container.
 # We rely on it being in the PATH, which is configured in the Dockerfile.
-MMDC_PATH = shutil.which("mmdc") or "mmdc"
+_MMDC_RESOLVED_PATH = shutil.which("mmdc")
+MMDC_PATH = _MMDC_RESOLVED_PATH or "mmdc"
+# Without the binary every render would just fork and fail: cached PNGs are still served.
+_MMDC_AVAILABLE = _MMDC_RESOLVED_PATH is not None
 PUPPETEER_CONFIG = "/app/bot/puppeteer-config.json"
-# A manifest of generated temporary files for later cleanup by the parent process.
-CLEANUP_MANIFEST_FILE = "/tmp/pandoc_cleanup_paths.txt"
+# A manifest of generated temporary files. The Celery task that runs pandoc passes a per-run
+# path in PANDOC_CLEANUP_MANIFEST and deletes the listed files once LaTeX has consumed them.
+CLEANUP_MANIFEST_FILE = os.environ.get("PANDOC_CLEANUP_MANIFEST", "/tmp/pandoc_cleanup_paths.txt")
+# Rendered PNGs are kept here, named by a hash of their source, and reused across runs.
+# Mount a volume at this path to keep the cache across worker containers.
+MERMAID_CACHE_DIR = os.environ.get("MERMAID_CACHE_DIR", "/app/cache/mermaid")
+# Past this size the least recently used PNGs are evicted (a hit refreshes the file's mtime).
+MERMAID_CACHE_MAX_BYTES = int(os.environ.get("MERMAID_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Temp renders left behind by a killed filter are removed once they are this old.
+MERMAID_STALE_TMP_SECONDS = 3600
+MMDC_BACKGROUND = "transparent"
+_MMDC_COMMAND_PREFIX = (MMDC_PATH, "-p", PUPPETEER_CONFIG, "-b", MMDC_BACKGROUND)
+# Uncached renders are read by pandoc once and deleted: keep them in RAM-backed tmpfs if present.
+MERMAID_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
 
 generated_files = []
+# Diagrams are rendered from worker threads, see apply_filter.
+_generated_files_lock = threading.Lock()
+
+
+def _track_generated_file(path: str) -> None:
+    with _generated_files_lock:
+        generated_files.append(path)
+
+
+@functools.lru_cache(maxsize=1)
+def _mmdc_version() -> str:
+    """
+    Version of the mermaid-cli package behind MMDC_PATH, read from its package.json:
+    running `mmdc --version` would cost a Node start-up on every filter run.
+    """
+    directory = os.path.dirname(os.path.realpath(MMDC_PATH))
+    while directory != os.path.dirname(directory):
+        package_json = os.path.join(directory, "package.json")
+        if os.path.exists(package_json):
+            try:
+                with open(package_json, encoding="utf-8") as f:
+                    package = json.load(f)
+            except (OSError, ValueError):
+                break
+            if package.get("name") == "@mermaid-js/mermaid-cli":
+                return package.get("version", "unknown")
+        directory = os.path.dirname(directory)
+    return "unknown"
+
+
+def _canonicalize(mermaid_code: str) -> str:
+    """
+    The diagram source as far as rendering is concerned: line endings, trailing whitespace,
+    surrounding blank lines and `%%` comments dropped. `%%{...}%%` directives change the
+    output and are kept.
+    """
+    lines = []
+    for line in mermaid_code.replace("\r\n", "\n").strip().split("\n"):
+        stripped = line.lstrip()
+        if stripped.startswith("%%") and not stripped.startswith("%%{"):
+            continue
+        lines.append(line.rstrip())
+    return "\n".join(lines)
+
+
+def _cache_path(mermaid_code: str) -> str:
+    """Content address of a diagram: the source plus everything that changes its pixels."""
+    digest = hashlib.sha256()
+    for part in (_mmdc_version(), MMDC_BACKGROUND, PUPPETEER_CONFIG, _canonicalize(mermaid_code)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return os.path.join(MERMAID_CACHE_DIR, f"{digest.hexdigest()}.png")
+
+
+def _run_mmdc(
+    input_path: str, output_path: str, *extra_args: str, input_text: str | None = None
+) -> bool:
+    """Runs mmdc once; with input_path "-" the diagram source is piped in as input_text."""
+    if not _MMDC_AVAILABLE:
+        sys.stderr.write("Mermaid rendering skipped: mmdc is not installed\n")
+        return False
+
+    command = [*_MMDC_COMMAND_PREFIX, "-i", input_path, "-o", output_path, *extra_args]
+
+    process = subprocess.run(
+        command,
+        input=input_text,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="ignore",
+    )
+
+    if process.returncode != 0 or not os.path.exists(output_path):
+        sys.stderr.write(f"Mermaid rendering failed: {process.stderr}\n")
+        return False
+    return True
 
 
 def render_mermaid_to_image_file(mermaid_code: str) -> str | None:
     """
     Renders a Mermaid diagram to a PNG file and returns the file path.
+    A diagram rendered before is served from MERMAID_CACHE_DIR without running mmdc.
     Returns None if rendering fails.
     """
     try:
-        with tempfile.NamedTemporaryFile(
-            mode="w", delete=False, suffix=".mmd", encoding="utf-8"
-        ) as infile:
-            infile.write(mermaid_code)
-            input_path = infile.name
-        generated_files.append(input_path)
-
-        # The output path will be in the same directory with a .png extension
-        output_path = os.path.splitext(input_path)[0] + ".png"
-        generated_files.append(output_path)
-
-        command = [
-            MMDC_PATH,
-            "-p",
-            PUPPETEER_CONFIG,
-            "-i",
-            input_path,
-            "-o",
-            output_path,
-            "-b",
-            "transparent",
-        ]
-
-        process = subprocess.run(
-            command, capture_output=True, text=True, encoding="utf-8", errors="ignore"
-        )
+        cached_path = _cache_path(mermaid_code)
+        if os.path.exists(cached_path):
+            try:
+                # Mark the entry as recently used for prune_mermaid_cache.
+                os.utime(cached_path)
+            except OSError:
+                pass
+            return cached_path
 
-        if process.returncode != 0 or not os.path.exists(output_path):
-            sys.stderr.write(f"Mermaid rendering failed: {process.stderr}\n")
+        # The source is piped to mmdc's stdin ("-i -"), so no input file is written.
+        try:
+            os.makedirs(MERMAID_CACHE_DIR, exist_ok=True)
+        except OSError as e:
+            sys.stderr.write(f"Mermaid cache unavailable, rendering uncached: {e}\n")
+            fd, output_path = tempfile.mkstemp(suffix=".png", dir=MERMAID_TMP_DIR)
+            os.close(fd)
+            _track_generated_file(output_path)
+            if _run_mmdc("-", output_path, input_text=mermaid_code):
+                return output_path
             return None
 
-        return output_path
+        # Render next to the cache entry and rename it into place, so concurrent renders of
+        # the same diagram never expose a half-written PNG. mmdc picks the format by extension.
+        tmp_output_path = (
+            f"{os.path.splitext(cached_path)[0]}.{os.getpid()}.{threading.get_ident()}.tmp.png"
+        )
+        if not _run_mmdc("-", tmp_output_path, input_text=mermaid_code):
+            if os.path.exists(tmp_output_path):
+                os.remove(tmp_output_path)
+            return None
+        os.replace(tmp_output_path, cached_path)
+        return cached_path
 
     except Exception as e:
         sys.stderr.write(f"Exception during Mermaid rendering: {e}\n")
         return None
 
 
-def apply_filter(doc):
+def prune_mermaid_cache(max_bytes: int | None = None) -> None:
     """
-    Walks through the pandoc AST and replaces Mermaid code blocks with rendered images.
+    Keeps MERMAID_CACHE_DIR under max_bytes by deleting the least recently used PNGs,
+    down to 90% of the limit so that not every run has to prune. Stale temp renders go too.
     """
+    max_bytes = MERMAID_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    now = time.time()
+    entries = []
+    total = 0
+    try:
+        with os.scandir(MERMAID_CACHE_DIR) as it:
+            for entry in it:
+                if not entry.is_file() or not entry.name.endswith(".png"):
+                    continue
+                stat = entry.stat()
+                if entry.name.endswith(".tmp.png"):
+                    if now - stat.st_mtime > MERMAID_STALE_TMP_SECONDS:
+                        os.remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    except OSError as e:
+        sys.stderr.write(f"Mermaid cache pruning failed: {e}\n")
+        return
+    if total <= max_bytes:
+        return
+
+    target = max_bytes * 9 // 10
+    for _mtime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            sys.stderr.write(f"Could not evict cached Mermaid render {path}: {e}\n")
+            continue
+        total -= size
+
+
+def prerender_mermaid_batch(mermaid_codes: list[str]) -> None:
+    """
+    Renders every uncached diagram in one mmdc process and stores the PNGs in MERMAID_CACHE_DIR,
+    so Node and Chromium start once per document rather than once per diagram.
+    mmdc renders each mermaid fence of a markdown input to `<output>-<n>.png`, numbered from 1.
+    Diagrams the batch could not render are left to render_mermaid_to_image_file.
+    """
+    # Sources that differ only in whitespace or comments share a cache entry: render it once.
+    pending_by_path = {}
+    for code in mermaid_codes:
+        # A ``` line inside the diagram would close mmdc's fence early.
+        if "```" in code:
+            continue
+        cached_path = _cache_path(code)
+        if cached_path not in pending_by_path and not os.path.exists(cached_path):
+            pending_by_path[cached_path] = code
+    if len(pending_by_path) < 2:
+        return
+
+    try:
+        os.makedirs(MERMAID_CACHE_DIR, exist_ok=True)
+        # Stay on the cache's filesystem so the PNGs can be renamed into place.
+        with tempfile.TemporaryDirectory(dir=MERMAID_CACHE_DIR) as tmpdir:
+            input_path = os.path.join(tmpdir, "batch.md")
+            output_path = os.path.join(tmpdir, "batch.out.md")
+            with open(input_path, "w", encoding="utf-8") as f:
+                for code in pending_by_path.values():
+                    f.write(f"```mermaid\n{code.rstrip()}\n```\n\n")
+            # Even a failed run may have rendered the diagrams before the broken one.
+            _run_mmdc(input_path, output_path, "-e", "png")
+            for n, cached_path in enumerate(pending_by_path, start=1):
+                rendered_path = os.path.join(tmpdir, f"batch.out-{n}.png")
+                if os.path.exists(rendered_path):
+                    os.replace(rendered_path, cached_path)
+    except Exception as e:
+        sys.stderr.write(f"Batched Mermaid rendering failed: {e}\n")
+
+
+def find_mermaid_blocks(doc) -> list[tuple[int, str]]:
+    """Returns (index, source) of every top-level CodeBlock with the mermaid class."""
+    mermaid_blocks = []
     for i, element in enumerate(doc["blocks"]):
         if element["t"] == "CodeBlock":
             [[_id, classes, _kv_pairs], code] = element["c"]
             if "mermaid" in classes:
-                image_path = render_mermaid_to_image_file(code)
-                if image_path:
-                    # Replace the CodeBlock with a Para containing the Image
-                    # The image path must be absolute for pandoc to find it.
-                    image_node = {"t": "Image", "c": [["", [], []], [], [image_path, ""]]}
-                    # Wrap the image in a paragraph
-                    doc["blocks"][i] = {"t": "Para", "c": [image_node]}
+                mermaid_blocks.append((i, code))
+    return mermaid_blocks
+
+
+def apply_filter(doc, mermaid_blocks: list[tuple[int, str]] | None = None):
+    """
+    Walks through the pandoc AST and replaces Mermaid code blocks with rendered images.
+    """
+    if mermaid_blocks is None:
+        mermaid_blocks = find_mermaid_blocks(doc)
+    if not mermaid_blocks:
+        return doc
+
+    codes = list(dict.fromkeys(code for _i, code in mermaid_blocks))
+    prerender_mermaid_batch(codes)
+
+    # Whatever the batch left uncached renders in parallel: the threads only wait on mmdc.
+    image_paths = {}
+    if codes:
+        with ThreadPoolExecutor(max_workers=min(len(codes), os.cpu_count() or 1)) as executor:
+            image_paths = dict(zip(codes, executor.map(render_mermaid_to_image_file, codes)))
+
+    for i, code in mermaid_blocks:
+        image_path = image_paths[code]
+        if image_path:
+            # Replace the CodeBlock with a Para containing the Image
+            # The image path must be absolute for pandoc to find it.
+            image_node = {"t": "Image", "c": [["", [], []], [], [image_path, ""]]}
+            # Wrap the image in a paragraph
+            doc["blocks"][i] = {"t": "Para", "c": [image_node]}
     return doc
 
 
@@ -85,9 +292,29 @@ def main():
     Main function to read from stdin, apply the filter, and write to stdout.
     """
     try:
-        doc = json.load(sys.stdin)
-        modified_doc = apply_filter(doc)
-        json.dump(modified_doc, sys.stdout)
+        raw_doc = sys.stdin.buffer.read()
+        # Without a mermaid class anywhere there is nothing to replace: echo the AST back as is
+        # instead of building (and re-serializing) the whole document as Python objects.
+        if b'"mermaid"' not in raw_doc:
+            sys.stdout.buffer.write(raw_doc)
+            sys.stdout.buffer.flush()
+            return
+
+        doc = orjson.loads(raw_doc) if orjson is not None else json.loads(raw_doc)
+        # "mermaid" may just be text or a nested block: with nothing to replace, echo the input.
+        mermaid_blocks = find_mermaid_blocks(doc)
+        if not mermaid_blocks:
+            sys.stdout.buffer.write(raw_doc)
+            sys.stdout.buffer.flush()
+            return
+        del raw_doc
+        modified_doc = apply_filter(doc, mermaid_blocks)
+        if orjson is not None:
+            sys.stdout.buffer.write(orjson.dumps(modified_doc))
+        else:
+            sys.stdout.buffer.write(json.dumps(modified_doc).encode("utf-8"))
+        sys.stdout.buffer.flush()
+        prune_mermaid_cache()
     except Exception as e:
         sys.stderr.write(f"Error in pandoc filter: {e}\n")
         sys.exit(1)
@@ -95,15 +322,14 @@ def main():
         # After processing, log the generated file paths for cleanup by the parent process.
         if generated_files:
             try:
-                # --- START: Improvement ---
-                manifest_dir = os.path.dirname(CLEANUP_MANIFEST_FILE)
-                if not os.path.exists(manifest_dir):
-                    os.makedirs(manifest_dir)
-                # --- END: Improvement ---
-
-                with open(CLEANUP_MANIFEST_FILE, "a", encoding="utf-8") as f:
-                    for path in generated_files:
-                        f.write(path + "\n")
+                os.makedirs(os.path.dirname(CLEANUP_MANIFEST_FILE), exist_ok=True)
+                # One O_APPEND write per run, so parallel filter processes never interleave lines.
+                payload = "".join(f"{path}\n" for path in generated_files).encode("utf-8")
+                fd = os.open(CLEANUP_MANIFEST_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, payload)
+                finally:
+                    os.close(fd)
             except Exception as e:
                 sys.stderr.write(f"Failed to write to cleanup log: {e}\n")
 
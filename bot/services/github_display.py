@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 import re
@@ -294,7 +293,7 @@ async def display_lec_all_path(
     if path:
         parent_dir = path.rsplit("/", 1) if "/" in path else ""
         parent_path = f"{repo_path}/{parent_dir}" if parent_dir else repo_path
-        path_hash = hashlib.sha1(parent_path.encode()).hexdigest()[:16]
+        path_hash = kb.callback_hash(parent_path)
         kb.code_path_cache[path_hash] = parent_path
         builder.row(
             InlineKeyboardButton(text="⬅️ .. (Назад)", callback_data=f"abs_nav_hash:{path_hash}")
@@ -304,7 +303,7 @@ async def display_lec_all_path(
         for item in contents:
             if item["type"] == "dir":
                 full_item_path = f"{repo_path}/{item['path']}"
-                path_hash = hashlib.sha1(full_item_path.encode()).hexdigest()[:16]
+                path_hash = kb.callback_hash(full_item_path)
                 kb.code_path_cache[path_hash] = full_item_path
                 builder.row(
                     InlineKeyboardButton(
@@ -313,7 +312,7 @@ async def display_lec_all_path(
                 )
             elif item["type"] == "file":
                 full_item_path = f"{repo_path}/{item['path']}"
-                path_hash = hashlib.sha1(full_item_path.encode()).hexdigest()[:16]
+                path_hash = kb.callback_hash(full_item_path)
                 kb.code_path_cache[path_hash] = full_item_path
                 builder.row(
                     InlineKeyboardButton(
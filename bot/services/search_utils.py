@@ -6,9 +6,29 @@ import matplobblib
 
 from shared_lib.services.semantic_search import search_engine
 
+from ..keyboards import import_matplobblib_submodule
+
 logger = logging.getLogger(__name__)
 
 
+def _collect_submodule_documents(submodule_name: str) -> list[tuple[str, str, dict]]:
+    """Imports one submodule and builds its (path, search text, metadata) documents."""
+    module = import_matplobblib_submodule(submodule_name)
+    code_dictionary = getattr(module, "themes_list_dicts_full", {})
+
+    documents = []
+    for topic_name, codes in code_dictionary.items():
+        for code_name, code_content in codes.items():
+            code_path = f"{submodule_name}.{topic_name}.{code_name}"
+
+            # Текст для эмбеддинга: Путь + Код (docstring важен!)
+            search_text = f"{submodule_name} {topic_name} {code_name}\n{code_content}"
+
+            metadata = {"name": code_name, "topic": topic_name}
+            documents.append((code_path, search_text, metadata))
+    return documents
+
+
 async def index_matplobblib_library():
     """
     Проходит по библиотеке и обновляет записи в БД.
@@ -19,23 +39,16 @@ async def index_matplobblib_library():
 
     for submodule_name in matplobblib.submodules:
         try:
-            module = matplobblib._importlib.import_module(f"matplobblib.{submodule_name}")
-            code_dictionary = getattr(module, "themes_list_dicts_full", {})
-
-            for topic_name, codes in code_dictionary.items():
-                for code_name, code_content in codes.items():
-                    code_path = f"{submodule_name}.{topic_name}.{code_name}"
-
-                    # Текст для эмбеддинга: Путь + Код (docstring важен!)
-                    search_text = f"{submodule_name} {topic_name} {code_name}\n{code_content}"
-
-                    metadata = {"name": code_name, "topic": topic_name}
-
-                    # Upsert в базу
-                    await search_engine.upsert_document(
-                        source_type="lib", path=code_path, content=search_text, metadata=metadata
-                    )
-                    count += 1
+            # Importing a submodule and walking its code dict is synchronous work:
+            # run it in a thread so polling is not stalled while the library loads.
+            documents = await asyncio.to_thread(_collect_submodule_documents, submodule_name)
+
+            for code_path, search_text, metadata in documents:
+                # Upsert в базу
+                await search_engine.upsert_document(
+                    source_type="lib", path=code_path, content=search_text, metadata=metadata
+                )
+                count += 1
 
         except Exception as e:
             logger.error(f"Error indexing submodule {submodule_name}: {e}")
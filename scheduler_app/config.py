@@ -16,8 +16,8 @@ if not admin_ids_str:
     logging.warning(
         "ADMIN_USER_IDS environment variable is not set. Admin commands will be disabled."
     )
-    ADMIN_USER_IDS = []
+    ADMIN_USER_IDS: frozenset[int] = frozenset()
 else:
-    ADMIN_USER_IDS = [
+    ADMIN_USER_IDS = frozenset(
         int(admin_id.strip()) for admin_id in admin_ids_str.split(",") if admin_id.strip().isdigit()
-    ]
+    )
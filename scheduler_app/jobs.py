@@ -533,87 +533,84 @@ async def send_admin_summary(
 
                 # --- 2. Handle Pending Suggestions (With Buttons) ---
                 try:
-                    pending_offers_raw = await redis_client.client.lrange(
-                        "pending_shorter_offers", 0, -1
+                    header_sent = False
+                    # Looked up once; offer dicts carry every field the template uses
+                    notification_template = translator.get_template(
+                        lang, "shorter_name_admin_notification"
                     )
-                    if pending_offers_raw:
-                        header_text = "\n\n" + translator.gettext(
-                            lang, "admin_summary_pending_offers_header"
+                    async for suggestion_id, offer_raw in redis_client.iter_pending_offers():
+                        if not header_sent:
+                            header_text = "\n\n" + translator.gettext(
+                                lang, "admin_summary_pending_offers_header"
+                            )
+                            send_attempts += 1
+                            header_result = await send_telegram_message(
+                                http_session,
+                                admin_id,
+                                header_text,
+                                request_kwargs=telegram_request_kwargs,
+                            )
+                            if header_result is None:
+                                send_failures += 1
+                            else:
+                                send_successes += 1
+                            header_sent = True
+
+                        offer = json.loads(offer_raw)
+                        notification_text = notification_template.format_map(offer)
+
+                        data_to_hash = (
+                            f"{offer['user_id']}:{offer['full_name']}:{offer['short_name']}"
                         )
+                        data_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()[:24]
+
+                        # Manually construct the Inline Keyboard JSON for raw HTTP API
+                        reply_markup = {
+                            "inline_keyboard": [
+                                [
+                                    {
+                                        "text": "✅ Одобрить",
+                                        "callback_data": f"shorter_name_admin:approve:{data_hash}",
+                                    },
+                                    {
+                                        "text": "❌ Отклонить",
+                                        "callback_data": f"shorter_name_admin:decline:{data_hash}",
+                                    },
+                                ]
+                            ]
+                        }
+
+                        # Send the message and capture result to get message_id
                         send_attempts += 1
-                        header_result = await send_telegram_message(
+                        msg_result = await send_telegram_message(
                             http_session,
                             admin_id,
-                            header_text,
+                            notification_text,
+                            reply_markup=reply_markup,
                             request_kwargs=telegram_request_kwargs,
                         )
-                        if header_result is None:
-                            send_failures += 1
-                        else:
-                            send_successes += 1
 
-                        for offer_raw in pending_offers_raw:
-                            offer = json.loads(offer_raw)
-                            notification_text = translator.gettext(
-                                lang,
-                                "shorter_name_admin_notification",
-                                user_id=offer["user_id"],
-                                user_name=offer["user_name"],
-                                full_name=offer["full_name"],
-                                short_name=offer["short_name"],
-                            )
-
-                            data_to_hash = (
-                                f"{offer['user_id']}:{offer['full_name']}:{offer['short_name']}"
-                            )
-                            data_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()[:24]
-
-                            # Manually construct the Inline Keyboard JSON for raw HTTP API
-                            reply_markup = {
-                                "inline_keyboard": [
-                                    [
-                                        {
-                                            "text": "✅ Одобрить",
-                                            "callback_data": f"shorter_name_admin:approve:{data_hash}",
-                                        },
-                                        {
-                                            "text": "❌ Отклонить",
-                                            "callback_data": f"shorter_name_admin:decline:{data_hash}",
-                                        },
-                                    ]
-                                ]
+                        if msg_result:
+                            send_successes += 1
+                            # --- CRITICAL: Populate Cache for Bot's Callback Handler ---
+                            # The bot handler expects the data to be in Redis to verify the hash and edit the message.
+                            redis_key = f"suggestion_cache:{data_hash}"
+                            payload_to_cache = {
+                                "data": data_to_hash,
+                                "suggestion_id": suggestion_id,
+                                "user_name": offer["user_name"],
+                                "messages": [
+                                    {
+                                        "chat_id": admin_id,
+                                        "message_id": msg_result["message_id"],
+                                    }
+                                ],
                             }
-
-                            # Send the message and capture result to get message_id
-                            send_attempts += 1
-                            msg_result = await send_telegram_message(
-                                http_session,
-                                admin_id,
-                                notification_text,
-                                reply_markup=reply_markup,
-                                request_kwargs=telegram_request_kwargs,
-                            )
-
-                            if msg_result:
-                                send_successes += 1
-                                # --- CRITICAL: Populate Cache for Bot's Callback Handler ---
-                                # The bot handler expects the data to be in Redis to verify the hash and edit the message.
-                                redis_key = f"suggestion_cache:{data_hash}"
-                                payload_to_cache = {
-                                    "data": data_to_hash,
-                                    "user_name": offer["user_name"],
-                                    "messages": [
-                                        {
-                                            "chat_id": admin_id,
-                                            "message_id": msg_result["message_id"],
-                                        }
-                                    ],
-                                }
-                                await redis_client.set_cache(
-                                    redis_key, payload_to_cache, ttl=604800
-                                )  # 7 days
-                            else:
-                                send_failures += 1
+                            await redis_client.set_cache(
+                                redis_key, payload_to_cache, ttl=604800
+                            )  # 7 days
+                        else:
+                            send_failures += 1
 
                 except Exception as e:
                     logger.error(
@@ -20,7 +20,7 @@ from scheduler_app.jobs import (
 )
 from shared_lib.database import close_db_pool, get_session, init_db_pool
 from shared_lib.request_context import configure_correlation_logging
-from shared_lib.services.university_api import create_ruz_api_client
+from shared_lib.services.university_api import create_ruz_api_client, create_ruz_connector
 
 # --- Logging Setup ---
 logging.basicConfig(
@@ -59,7 +59,9 @@ async def main():
             timeout, TELEGRAM_PROXY_URL, log_context="scheduler Telegram session"
         )
         async with (
-            aiohttp.ClientSession(timeout=timeout, trust_env=False) as ruz_session,
+            aiohttp.ClientSession(
+                connector=create_ruz_connector(), timeout=timeout, trust_env=False
+            ) as ruz_session,
             aiohttp.ClientSession(**telegram_session_kwargs) as telegram_session,
         ):
             ruz_api_client_instance = create_ruz_api_client(ruz_session)
@@ -13,6 +13,7 @@ setup(
         "certifi",
         "redis",
         "cachetools",
+        "orjson",
         "celery",
         "Pillow>=12.2.0",
         "markdown-it-py",
@@ -4,7 +4,8 @@ import logging
 import os
 import uuid
 
-from sqlalchemy import and_, delete, func, insert, or_, select, text, update
+from sqlalchemy import JSON, and_, cast, delete, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
@@ -49,6 +50,11 @@ async def init_db_pool():
             echo=False,  # Set True for SQL debugging
             pool_size=20,
             max_overflow=10,
+            # Recycle idle connections before the server or a proxy drops them.
+            pool_recycle=1800,
+            # asyncpg prepares every statement; keep more of them per connection so the
+            # short settings/subscription queries are not re-prepared on each click.
+            connect_args={"prepared_statement_cache_size": 500},
         )
         async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
         logger.info("Shared DB: SQLAlchemy Async Engine initialized.")
@@ -277,6 +283,113 @@ async def log_user_action(
             logger.error(f"Redis publish error: {e}")
 
 
+async def ensure_user_exists(
+    user_id: int,
+    username: str | None,
+    full_name: str | None,
+    avatar_pic_url: str | None,
+) -> None:
+    """
+    Creates the users row if it is missing (INSERT ... ON CONFLICT DO NOTHING), so handlers can
+    write settings, favorites and repos before the batched action log refreshes the profile.
+    """
+    if not full_name or full_name in ["Admin", "System"]:
+        full_name = "Unknown User"
+    async with get_session() as session:
+        async with session.begin():
+            await session.execute(
+                pg_insert(User)
+                .values(
+                    user_id=user_id,
+                    username=username,
+                    full_name=full_name,
+                    avatar_pic_url=avatar_pic_url,
+                )
+                .on_conflict_do_nothing()
+            )
+
+
+async def log_user_actions_batch(rows: list[tuple]) -> None:
+    """
+    Batched log_user_action: rows are (user_id, username, full_name, avatar_pic_url,
+    action_type, action_details) tuples, written in one transaction with multi-row INSERTs.
+    """
+    if not rows:
+        return
+
+    # ON CONFLICT DO UPDATE cannot touch one row twice per statement: keep the latest data per user
+    known_users = {}
+    unknown_user_ids = {}
+    for user_id, username, full_name, avatar_pic_url, _, _ in rows:
+        if full_name and full_name not in ["Admin", "System"]:
+            known_users[user_id] = {
+                "user_id": user_id,
+                "username": username,
+                "full_name": full_name,
+                "avatar_pic_url": avatar_pic_url,
+            }
+        else:
+            unknown_user_ids[user_id] = None
+
+    async with get_session() as session:
+        async with session.begin():
+            if known_users:
+                stmt = pg_insert(User).values(list(known_users.values()))
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["user_id"],
+                        set_=dict(
+                            username=stmt.excluded.username,
+                            full_name=stmt.excluded.full_name,
+                            avatar_pic_url=stmt.excluded.avatar_pic_url,
+                        ),
+                    )
+                )
+            unknown_users = [
+                {"user_id": user_id, "full_name": "Unknown User"}
+                for user_id in unknown_user_ids
+                if user_id not in known_users
+            ]
+            if unknown_users:
+                await session.execute(
+                    pg_insert(User).values(unknown_users).on_conflict_do_nothing()
+                )
+
+            result = await session.execute(
+                pg_insert(UserAction)
+                .values(
+                    [
+                        {"user_id": row[0], "action_type": row[4], "action_details": row[5]}
+                        for row in rows
+                    ]
+                )
+                .returning(
+                    UserAction.id,
+                    UserAction.user_id,
+                    UserAction.action_type,
+                    UserAction.action_details,
+                    UserAction.timestamp,
+                )
+            )
+            inserted = result.all()
+
+    try:
+        async with redis_client.client.pipeline(transaction=False) as pipe:
+            for action in inserted:
+                payload = {
+                    "id": action.id,
+                    "action_type": action.action_type,
+                    "action_details": action.action_details,
+                    "timestamp": action.timestamp.isoformat()
+                    if action.timestamp
+                    else datetime.datetime.now().isoformat(),
+                }
+                pipe.publish(f"user_updates:{action.user_id}", json.dumps(payload))
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Redis publish error: {e}")
+
+
 async def get_user_settings(user_id: int) -> dict:
     async with get_session() as session:
         result = await session.execute(select(User.settings).where(User.user_id == user_id))
@@ -287,6 +400,22 @@ async def get_user_settings(user_id: int) -> dict:
     return merged
 
 
+async def get_user_settings_and_repo_flag(user_id: int) -> tuple[dict, bool]:
+    """Returns the merged user settings and whether the user has saved repos, in one query."""
+    has_repos = select(UserGithubRepo.id).where(UserGithubRepo.user_id == user_id).exists()
+    async with get_session() as session:
+        result = await session.execute(
+            select(User.settings, has_repos).where(User.user_id == user_id)
+        )
+        row = result.first()
+
+    merged = DEFAULT_SETTINGS.copy()
+    if row is None:
+        return merged, False
+    merged.update(row[0] or {})
+    return merged, bool(row[1])
+
+
 async def get_chat_settings(chat_id: int) -> dict:
     async with get_session() as session:
         # Upsert pattern via insert().on_conflict_do_nothing is cleaner, but simple select/insert works too
@@ -310,6 +439,18 @@ async def update_user_settings_db(user_id: int, settings: dict):
         await session.commit()
 
 
+async def update_user_setting_field(user_id: int, field: str, value):
+    """Updates a single settings key in place instead of rewriting the whole settings blob."""
+    merged = func.coalesce(cast(User.settings, JSONB), literal({}, JSONB)).op(
+        "||", return_type=JSONB
+    )(literal({field: value}, JSONB))
+    async with get_session() as session:
+        await session.execute(
+            update(User).where(User.user_id == user_id).values(settings=cast(merged, JSON))
+        )
+        await session.commit()
+
+
 async def get_user_myschedule_filters(user_id: int) -> dict:
     settings = await get_user_settings(user_id)
     return normalize_myschedule_filters(settings.get("myschedule_filters"))
@@ -650,32 +791,32 @@ async def add_schedule_subscription(
         return result.scalar()
 
 
-async def get_user_subscriptions(
-    user_id: int, page: int = 0, page_size: int = 5
-) -> tuple[list, int]:
+async def _fetch_subscriptions_page(condition, page: int, page_size: int) -> tuple[list, int]:
+    """
+    Returns one page of subscriptions matching `condition` plus the total match count.
+    The total comes from COUNT(*) OVER() on the same query, so both arrive in one round-trip.
+    """
     async with get_session() as session:
         offset = page * page_size
-
-        # Count
-        count_stmt = (
-            select(func.count())
-            .select_from(UserScheduleSubscription)
-            .where(UserScheduleSubscription.user_id == user_id)
-        )
-        total_count = (await session.execute(count_stmt)).scalar() or 0
-
-        # Data
         stmt = (
-            select(UserScheduleSubscription)
-            .where(UserScheduleSubscription.user_id == user_id)
+            select(UserScheduleSubscription, func.count().over().label("total_count"))
+            .where(condition)
             .order_by(
                 UserScheduleSubscription.entity_name, UserScheduleSubscription.notification_time
             )
             .limit(page_size)
             .offset(offset)
         )
-        result = await session.execute(stmt)
-        subs = result.scalars().all()
+        rows = (await session.execute(stmt)).all()
+
+        if rows:
+            total_count = rows[0].total_count
+        elif offset:
+            # Page past the end: the window count has no row to ride on, ask for it directly.
+            count_stmt = select(func.count()).select_from(UserScheduleSubscription).where(condition)
+            total_count = (await session.execute(count_stmt)).scalar() or 0
+        else:
+            total_count = 0
 
         # Convert to dict to match old API
         return [
@@ -689,48 +830,24 @@ async def get_user_subscriptions(
                 "notification_time": s.notification_time.strftime("%H:%M"),
                 "is_active": s.is_active,
             }
-            for s in subs
+            for s, _ in rows
         ], total_count
 
 
-async def get_chat_subscriptions(
-    chat_id: int, page: int = 0, page_size: int = 5
+async def get_user_subscriptions(
+    user_id: int, page: int = 0, page_size: int = 5
 ) -> tuple[list, int]:
-    async with get_session() as session:
-        offset = page * page_size
-
-        count_stmt = (
-            select(func.count())
-            .select_from(UserScheduleSubscription)
-            .where(UserScheduleSubscription.chat_id == chat_id)
-        )
-        total_count = (await session.execute(count_stmt)).scalar() or 0
+    return await _fetch_subscriptions_page(
+        UserScheduleSubscription.user_id == user_id, page, page_size
+    )
 
-        stmt = (
-            select(UserScheduleSubscription)
-            .where(UserScheduleSubscription.chat_id == chat_id)
-            .order_by(
-                UserScheduleSubscription.entity_name, UserScheduleSubscription.notification_time
-            )
-            .limit(page_size)
-            .offset(offset)
-        )
-        result = await session.execute(stmt)
-        subs = result.scalars().all()
 
-        return [
-            {
-                "id": s.id,
-                "user_id": s.user_id,
-                "chat_id": s.chat_id,
-                "entity_type": s.entity_type,
-                "entity_id": s.entity_id,
-                "entity_name": s.entity_name,
-                "notification_time": s.notification_time.strftime("%H:%M"),
-                "is_active": s.is_active,
-            }
-            for s in subs
-        ], total_count
+async def get_chat_subscriptions(
+    chat_id: int, page: int = 0, page_size: int = 5
+) -> tuple[list, int]:
+    return await _fetch_subscriptions_page(
+        UserScheduleSubscription.chat_id == chat_id, page, page_size
+    )
 
 
 async def toggle_subscription_status(
@@ -1467,12 +1584,22 @@ async def update_subscription_modules(subscription_id: int, modules: list[str]):
         await session.commit()
 
 
-async def get_subscription_by_id(subscription_id: int) -> dict | None:
-    """Получает полную информацию о подписке."""
+async def get_subscription_by_id(
+    subscription_id: int, user_id: int | None = None, chat_id: int | None = None
+) -> dict | None:
+    """
+    Получает полную информацию о подписке.
+    Если передан user_id, подписка ищется только среди подписок этого пользователя,
+    если chat_id — только среди подписок этого чата.
+    """
     async with get_session() as session:
         stmt = select(UserScheduleSubscription).where(
             UserScheduleSubscription.id == subscription_id
         )
+        if user_id is not None:
+            stmt = stmt.where(UserScheduleSubscription.user_id == user_id)
+        if chat_id is not None:
+            stmt = stmt.where(UserScheduleSubscription.chat_id == chat_id)
         result = await session.execute(stmt)
         sub = result.scalar()
         if sub:
@@ -1,5 +1,7 @@
+import functools
 import json
 import logging
+import string
 from pathlib import Path
 
 from .database import get_chat_settings, get_user_settings
@@ -12,7 +14,14 @@ class Translator:
         self.locales_dir = locales_dir
         self.default_lang = default_lang
         self.translations = {}
+        # (lang, key) -> text, with default-language fallbacks already merged into every language.
+        self._flat: dict[tuple[str, str], str] = {}
+        # (lang, key) -> (template, field names), see _compile_template.
+        self._fast_templates: dict[tuple[str, str], tuple[str, tuple[str, ...] | None]] = {}
+        # lang -> {command: BotCommand description}, see get_command_descriptions.
+        self._cmd_desc_cache: dict[str, dict[str, str]] = {}
         self._load_translations()
+        self._build_lookup_tables()
 
     def _load_translations(self):
         """Loads all .json language files from the locales directory."""
@@ -25,6 +34,15 @@ class Translator:
             except (OSError, json.JSONDecodeError) as e:
                 logger.error(f"Failed to load language file {lang_file}: {e}")
 
+    def _build_lookup_tables(self):
+        """Flattens the catalogs into (lang, key)-keyed tables for single-probe lookups."""
+        default_catalog = self.translations.get(self.default_lang, {})
+        for lang_code, catalog in self.translations.items():
+            for key, text in {**default_catalog, **catalog}.items():
+                self._flat[(lang_code, key)] = text
+                if isinstance(text, str):
+                    self._fast_templates[(lang_code, key)] = self._compile_template(text)
+
     async def get_language(self, user_id: int, chat_id: int | None = None) -> str:
         """
         Fetches the appropriate language.
@@ -44,13 +62,114 @@ class Translator:
         Gets a translated string for a given key and language.
         Falls back to the default language if the key is not found.
         """
-        text = self.translations.get(lang, {}).get(key)
+        text = self._flat.get((lang, key))
         if text is None:
-            # Fallback to default language
-            text = self.translations.get(self.default_lang, {}).get(key, f"_{key}_")
+            # Unknown language: fall back to the default one
+            text = self._flat.get((self.default_lang, key), f"_{key}_")
 
         return text.format(**kwargs)
 
+    def get_template(self, lang: str, key: str) -> str:
+        """
+        Returns the raw str.format template for a key, with the same fallbacks as gettext,
+        so callers formatting one key many times can skip the lookup on each call.
+        """
+        text = self._flat.get((lang, key))
+        if text is None:
+            text = self._flat.get((self.default_lang, key), f"_{key}_")
+        return text
+
+    def get_command_descriptions(self, lang: str) -> dict[str, str]:
+        """
+        Maps command names to their menu descriptions, built once per language:
+        help_btn_<command> texts ('Icon /command - Description') contribute the part after
+        ' - ', command_desc_<command> texts are used whole.
+        """
+        descriptions = self._cmd_desc_cache.get(lang)
+        if descriptions is None:
+            source_lang = lang if lang in self.translations else self.default_lang
+            descriptions = {}
+            for (key_lang, key), text in self._flat.items():
+                if key_lang != source_lang or not isinstance(text, str):
+                    continue
+                if key.startswith("help_btn_"):
+                    _, sep, description = text.partition(" - ")
+                    descriptions[key.removeprefix("help_btn_")] = description if sep else text
+                elif key.startswith("command_desc_"):
+                    descriptions[key.removeprefix("command_desc_")] = text
+            self._cmd_desc_cache[lang] = descriptions
+        return descriptions
+
+    @staticmethod
+    def _compile_template(text: str) -> tuple[str, tuple[str, ...] | None]:
+        """
+        Converts a str.format template into a %-style one plus its field names in order.
+        Templates the fast path cannot express (format specs, conversions, repeated or
+        attribute fields) keep the original text and `None` instead of field names.
+        """
+        literal_parts: list[str] = []
+        percent_parts: list[str] = []
+        fields: list[str] = []
+        for literal_text, field_name, format_spec, conversion in string.Formatter().parse(text):
+            literal_parts.append(literal_text)
+            percent_parts.append(literal_text.replace("%", "%%"))
+            if field_name is None:
+                continue
+            if format_spec or conversion or not field_name.isidentifier() or field_name in fields:
+                return text, None
+            percent_parts.append("%s")
+            fields.append(field_name)
+        if not fields:
+            return "".join(literal_parts), ()
+        return "".join(percent_parts), tuple(fields)
+
+    def gettext_fast(self, lang: str, key: str, *args) -> str:
+        """
+        Like gettext, but takes the placeholder values positionally, in the order they
+        first appear in the template, and substitutes them with precompiled %-formatting.
+        """
+        entry = self._fast_templates.get((lang, key))
+        if entry is None:
+            entry = self._fast_templates.get((self.default_lang, key))
+            if entry is None:
+                return f"_{key}_"
+        template, fields = entry
+        if fields is None:
+            names = dict.fromkeys(
+                name.split(".")[0].split("[")[0]
+                for _, name, _, _ in string.Formatter().parse(template)
+                if name
+            )
+            return template.format(**dict(zip(names, args)))
+        if not fields:
+            return template
+        return template % args
+
+    def gettext_many(self, lang: str, keys: tuple[str, ...]) -> tuple[str, ...]:
+        """
+        Translates several placeholder-free keys at once, in the order given.
+        Keys whose text has placeholders are returned as their raw str.format template
+        (see get_template), unformatted.
+        """
+        templates = self._fast_templates
+        default_lang = self.default_lang
+        texts = []
+        for key in keys:
+            entry = templates.get((lang, key)) or templates.get((default_lang, key))
+            if entry is None:
+                texts.append(f"_{key}_")
+            elif entry[1] == ():
+                texts.append(entry[0])
+            else:
+                texts.append(self.get_template(lang, key))
+        return tuple(texts)
+
 
 # Create a single instance of the translator
 translator = Translator(locales_dir=Path(__file__).parent / "locales")
+
+
+@functools.lru_cache(maxsize=4096)
+def cached_gettext(lang: str, key: str) -> str:
+    """Cached translation lookup for keyboard labels that take no format arguments."""
+    return translator.gettext(lang, key)
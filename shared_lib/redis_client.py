@@ -1,6 +1,8 @@
+import hashlib
 import json
 import logging
 
+import orjson
 import redis.asyncio as redis
 
 logger = logging.getLogger(__name__)
@@ -8,12 +10,98 @@ logger = logging.getLogger(__name__)
 # TTL для кэша в секундах (например, 1 час)
 CACHE_TTL = 3600
 
+# HASH suggestion_id -> JSON предложения сокращённого названия, ожидающего решения админа.
+# Заменяет прежний LIST "pending_shorter_offers": удаление по id через HDEL вместо LREM.
+PENDING_SHORTER_OFFERS_KEY = "pending_shorter_offers:by_id"
+# Прежнее хранилище (LIST предложений и SET ключей дедупликации): переносится в хэш один раз.
+LEGACY_PENDING_SHORTER_OFFERS_KEY = "pending_shorter_offers"
+LEGACY_PENDING_SHORTER_OFFERS_INDEX_KEY = "pending_shorter_offers:index"
+
+
+def pending_offer_id(full_name: str, short_name: str) -> str:
+    """
+    Id предложения в PENDING_SHORTER_OFFERS_KEY. Выводится из пары (полное название,
+    сокращение), поэтому одна и та же пара, предложенная дважды, попадает в одно поле хэша.
+    """
+    return hashlib.blake2b(f"{full_name}|{short_name}".encode(), digest_size=16).hexdigest()
+
+
+# HSETNX предложения + INCR/EXPIRE счётчика лимита за один round-trip.
+# Счётчик растёт только если предложение действительно добавлено (не дубликат).
+# EXPIRE ... NX (Redis 7+) ставит TTL только если его нет: окно фиксировано с первого инкремента.
+ADD_PENDING_OFFER_LUA = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3], 'NX')
+return 1
+"""
+
 
 class RedisClient:
     def __init__(self, host="localhost", port=6379):
         # Используем connection_pool для более эффективного управления соединениями
         self.pool = redis.ConnectionPool(host=host, port=port, db=0, decode_responses=True)
         self.client = redis.Redis(connection_pool=self.pool)
+        # register_script вызывает EVALSHA и сам догружает скрипт при NOSCRIPT
+        self._add_pending_offer_script = self.client.register_script(ADD_PENDING_OFFER_LUA)
+        self._legacy_offers_migrated = False
+
+    async def migrate_legacy_pending_offers(self) -> int:
+        """
+        Переносит предложения из старого LIST в PENDING_SHORTER_OFFERS_KEY (HSETNX по id)
+        и удаляет LIST вместе со старым SET-индексом. Выполняется один раз за процесс;
+        возвращает число перенесённых предложений.
+        """
+        if self._legacy_offers_migrated:
+            return 0
+        legacy_offers = await self.client.lrange(LEGACY_PENDING_SHORTER_OFFERS_KEY, 0, -1)
+        migrated = 0
+        async with self.client.pipeline(transaction=True) as pipe:
+            for offer_raw in legacy_offers:
+                try:
+                    offer = json.loads(offer_raw)
+                    suggestion_id = pending_offer_id(offer["full_name"], offer["short_name"])
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Пропущено повреждённое предложение из старого списка: {e}")
+                    continue
+                pipe.hsetnx(PENDING_SHORTER_OFFERS_KEY, suggestion_id, offer_raw)
+                migrated += 1
+            pipe.delete(LEGACY_PENDING_SHORTER_OFFERS_KEY, LEGACY_PENDING_SHORTER_OFFERS_INDEX_KEY)
+            await pipe.execute()
+        self._legacy_offers_migrated = True
+        if migrated:
+            logger.info(f"Перенесено предложений сокращений из старого списка: {migrated}")
+        return migrated
+
+    async def add_pending_offer(
+        self, suggestion_id: str, payload: str | bytes, limit_key: str, limit_ttl: int
+    ) -> bool:
+        """
+        Добавляет предложение в PENDING_SHORTER_OFFERS_KEY и увеличивает счётчик лимита.
+        Возвращает False, если предложение с таким id уже ожидает решения.
+        """
+        added = await self._add_pending_offer_script(
+            keys=[PENDING_SHORTER_OFFERS_KEY, limit_key],
+            args=[suggestion_id, payload, limit_ttl],
+        )
+        return bool(int(added))
+
+    async def iter_pending_offers(self, batch_size: int = 100):
+        """
+        Итерирует (suggestion_id, JSON) из PENDING_SHORTER_OFFERS_KEY порциями через HSCAN,
+        не загружая весь хэш разом. HSCAN может повторять элементы — они отбрасываются.
+        """
+        await self.migrate_legacy_pending_offers()
+        seen = set()
+        async for suggestion_id, offer_raw in self.client.hscan_iter(
+            PENDING_SHORTER_OFFERS_KEY, count=batch_size
+        ):
+            if suggestion_id in seen:
+                continue
+            seen.add(suggestion_id)
+            yield suggestion_id, offer_raw
 
     async def set_user_cache(self, user_id: int, key: str, data: dict, ttl: int = CACHE_TTL):
         """Сохраняет данные в кэш для конкретного пользователя."""
@@ -38,9 +126,12 @@ class RedisClient:
     async def set_cache(self, key: str, data: dict, ttl: int = CACHE_TTL):
         """Сохраняет данные в кэш по общему ключу."""
         try:
-            # Используем префикс 'cache:' для общих данных
+            # Используем префикс 'cache:' для общих данных.
+            # orjson быстрее json; OPT_NON_STR_KEYS приводит нестроковые ключи к строкам, как json.
             redis_key = f"cache:{key}"
-            await self.client.set(redis_key, json.dumps(data), ex=ttl)
+            await self.client.set(
+                redis_key, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), ex=ttl
+            )
         except Exception as e:
             logger.error(f"Ошибка при записи в Redis для ключа={key}: {e}")
 
@@ -50,7 +141,7 @@ class RedisClient:
             redis_key = f"cache:{key}"
             data = await self.client.get(redis_key)
             if data:
-                return json.loads(data)
+                return orjson.loads(data)
             return None
         except Exception as e:
             logger.error(f"Ошибка при чтении из Redis для ключа={key}: {e}")
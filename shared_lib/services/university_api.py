@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import logging
 import random
 import ssl
@@ -8,6 +9,28 @@ import aiohttp
 import certifi
 
 
+@functools.lru_cache(maxsize=1)
+def _ruz_ssl_context() -> ssl.SSLContext:
+    # One context for all requests: aiohttp keys pooled connections by the ssl object,
+    # so a fresh context per request would never reuse a keep-alive connection.
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+def create_ruz_connector() -> aiohttp.TCPConnector:
+    """
+    Connector for the long-lived RUZ sessions: keeps TLS connections to ruz.fa.ru
+    alive between requests and caches its DNS lookup.
+    Must be called from within a running event loop.
+    """
+    return aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=30,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+        ssl=_ruz_ssl_context(),
+    )
+
+
 class RuzAPIError(Exception):
     """Custom exception for RUZ API errors."""
 
@@ -33,7 +56,7 @@ class RuzAPIClient:
 
     async def _request(self, sub_url: str) -> dict[str, Any] | list[dict[str, Any]]:
         full_url = self.HOST + sub_url
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        ssl_context = _ruz_ssl_context()
         last_exception = None
 
         for attempt in range(self.max_retries):
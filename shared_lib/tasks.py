@@ -28,6 +28,9 @@ MATH_FILTER_PATH = os.path.join(BASE_DIR, "pandoc_math_filter.lua")
 PUPPETEER_CONFIG_PATH = os.path.join(BASE_DIR, "puppeteer-config.json")
 PANDOC_HEADER_PATH = os.path.join(BASE_DIR, "templates", "pandoc_header.tex")
 
+# The Mermaid filter lists its uncached renders (kept in /dev/shm) here for deletion.
+PANDOC_CLEANUP_MANIFEST_ENV = "PANDOC_CLEANUP_MANIFEST"
+
 CSS_TEMPLATE_PATH = os.path.join(BASE_DIR, "templates", "report.css")
 JS_TEMPLATE_PATH = os.path.join(BASE_DIR, "templates", "report.js")
 
@@ -188,8 +191,30 @@ def render_mermaid(self, mermaid_code: str):
         return {"status": "error", "error": str(e)}
 
 
+def _remove_pandoc_generated_files(manifest_path: str) -> None:
+    """Deletes the files a pandoc filter listed in manifest_path, then the manifest itself."""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            paths = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Не удалось удалить временный файл pandoc {path}: {e}")
+    os.remove(manifest_path)
+
+
 @app.task(bind=True, soft_time_limit=120, name="shared_lib.tasks.render_pdf")
 def render_pdf_task(self, markdown_string: str, title: str, author_string: str, date_string: str):
+    # latexmk reads the rendered diagrams after pandoc exits, so they are removed only once the
+    # task is done.
+    manifest_fd, manifest_path = tempfile.mkstemp(prefix="pandoc_cleanup_", suffix=".txt")
+    os.close(manifest_fd)
+    pandoc_env = {**os.environ, PANDOC_CLEANUP_MANIFEST_ENV: manifest_path}
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
             header_path = os.path.join(temp_dir, "header.tex")
@@ -228,7 +253,11 @@ def render_pdf_task(self, markdown_string: str, title: str, author_string: str,
                 pandoc_cmd.append("--toc")
 
             proc_pandoc = subprocess.run(
-                pandoc_cmd, input=markdown_string.encode("utf-8"), capture_output=True, timeout=45
+                pandoc_cmd,
+                input=markdown_string.encode("utf-8"),
+                capture_output=True,
+                timeout=45,
+                env=pandoc_env,
             )
 
             if proc_pandoc.returncode != 0:
@@ -277,6 +306,8 @@ def render_pdf_task(self, markdown_string: str, title: str, author_string: str,
         return {"status": "error", "error": "Process timed out."}
     except Exception as e:
         return {"status": "error", "error": str(e)}
+    finally:
+        _remove_pandoc_generated_files(manifest_path)
 
 
 def generate_toc_from_tokens(tokens) -> str:
@@ -4,6 +4,7 @@ import os
 from typing import Any, cast
 
 import aiohttp
+import orjson
 from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.exceptions import TelegramNetworkError
 from aiogram.methods import TelegramMethod
@@ -29,6 +30,11 @@ def _read_retry_delay_seconds(value: str | None, default: float) -> float:
         return default
 
 
+def _orjson_dumps(value: Any) -> str:
+    # aiogram expects str from json_dumps; orjson returns UTF-8 bytes
+    return orjson.dumps(value).decode()
+
+
 class TelegramBotSession(AiohttpSession):
     def __init__(
         self,
@@ -56,6 +62,9 @@ class TelegramBotSession(AiohttpSession):
         normalized_proxy_url = normalize_proxy_url(proxy_url)
 
         kwargs.pop("connector", None)
+        # Every Bot API request and response goes through these: use orjson unless overridden
+        kwargs.setdefault("json_loads", orjson.loads)
+        kwargs.setdefault("json_dumps", _orjson_dumps)
         super().__init__(limit=limit, **kwargs)
 
         if not normalized_proxy_url:
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+try:
+    from bot import logger as bot_logger
+
+    BOT_LOGGER_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"aiogram", "cachetools", "sqlalchemy", "redis"}:
+        raise
+    BOT_LOGGER_AVAILABLE = False
+
+
+def _bot(photos):
+    async def get_user_profile_photos(user_id, limit=1):
+        await asyncio.sleep(0)
+        return SimpleNamespace(photos=photos)
+
+    return SimpleNamespace(
+        token="TOKEN",
+        get_user_profile_photos=AsyncMock(side_effect=get_user_profile_photos),
+        get_file=AsyncMock(return_value=SimpleNamespace(file_path="photos/1.jpg")),
+    )
+
+
+@unittest.skipUnless(BOT_LOGGER_AVAILABLE, "bot dependencies are not installed")
+class TestAvatarCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        bot_logger._avatar_cache.clear()
+        bot_logger._avatar_fetches.clear()
+
+    def tearDown(self):
+        bot_logger._avatar_cache.clear()
+        bot_logger._avatar_fetches.clear()
+
+    async def test_concurrent_lookups_share_one_fetch(self):
+        bot = _bot([[SimpleNamespace(file_id="f1", file_unique_id="u1")]])
+
+        urls = await asyncio.gather(*(bot_logger._get_avatar_pic_url(bot, 7) for _ in range(5)))
+        cached = await bot_logger._get_avatar_pic_url(bot, 7)
+
+        self.assertEqual(set(urls), {"https://api.telegram.org/file/botTOKEN/photos/1.jpg"})
+        self.assertEqual(cached, urls[0])
+        bot.get_user_profile_photos.assert_awaited_once()
+        bot.get_file.assert_awaited_once_with("f1")
+        self.assertEqual(bot_logger._avatar_fetches, {})
+
+    async def test_cancelled_waiter_does_not_cancel_shared_fetch(self):
+        bot = _bot([[SimpleNamespace(file_id="f1", file_unique_id="u1")]])
+
+        cancelled = asyncio.ensure_future(bot_logger._get_avatar_pic_url(bot, 11))
+        waiting = asyncio.ensure_future(bot_logger._get_avatar_pic_url(bot, 11))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        self.assertEqual(await waiting, "https://api.telegram.org/file/botTOKEN/photos/1.jpg")
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        bot.get_user_profile_photos.assert_awaited_once()
+
+    async def test_missing_photo_is_cached(self):
+        bot = _bot([])
+
+        self.assertIsNone(await bot_logger._get_avatar_pic_url(bot, 8))
+        self.assertIsNone(await bot_logger._get_avatar_pic_url(bot, 8))
+
+        bot.get_user_profile_photos.assert_awaited_once()
+        bot.get_file.assert_not_awaited()
+
+    async def test_stale_avatar_is_reused_when_allowed(self):
+        bot = _bot([[SimpleNamespace(file_id="f1", file_unique_id="u1")]])
+        bot_logger._avatar_cache[9] = (0.0, "https://old", "u0")
+
+        stale = await bot_logger._get_avatar_pic_url(bot, 9, allow_stale=True)
+        fresh = await bot_logger._get_avatar_pic_url(bot, 9)
+
+        self.assertEqual(stale, "https://old")
+        self.assertEqual(fresh, "https://api.telegram.org/file/botTOKEN/photos/1.jpg")
+        bot.get_user_profile_photos.assert_awaited_once()
+
+    async def test_unchanged_photo_skips_get_file_on_refresh(self):
+        bot = _bot([[SimpleNamespace(file_id="f1", file_unique_id="u1")]])
+        bot_logger._avatar_cache[10] = (0.0, "https://known", "u1")
+
+        url = await bot_logger._get_avatar_pic_url(bot, 10)
+
+        self.assertEqual(url, "https://known")
+        bot.get_user_profile_photos.assert_awaited_once()
+        bot.get_file.assert_not_awaited()
+        self.assertGreater(bot_logger._avatar_cache[10][0], 0.0)
+
+    def test_cache_evicts_oldest_user_when_full(self):
+        original_maxsize = bot_logger.AVATAR_CACHE_MAXSIZE
+        bot_logger.AVATAR_CACHE_MAXSIZE = 2
+        try:
+            for user_id in (1, 2, 3):
+                bot_logger._store_avatar(user_id, 60, None)
+        finally:
+            bot_logger.AVATAR_CACHE_MAXSIZE = original_maxsize
+
+        self.assertEqual(list(bot_logger._avatar_cache), [2, 3])
@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+try:
+    from aiogram.types import Chat, Message, MessageEntity, Update
+
+    from bot.middleware import GroupMentionCommandMiddleware
+
+    AIOGRAM_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name != "aiogram":
+        raise
+    AIOGRAM_AVAILABLE = False
+
+
+def _group_update(text: str, mention_length: int, mention_offset: int = 0) -> "Update":
+    message = Message(
+        message_id=1,
+        date=datetime.datetime(2025, 1, 1),
+        chat=Chat(id=-100, type="supergroup"),
+        text=text,
+        entities=[MessageEntity(type="mention", offset=mention_offset, length=mention_length)],
+    )
+    return Update(update_id=1, message=message)
+
+
+@unittest.skipUnless(AIOGRAM_AVAILABLE, "aiogram is not installed in this environment")
+class TestGroupMentionCommandMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_strips_own_mention_and_resolves_username_once(self):
+        middleware = GroupMentionCommandMiddleware()
+        bot = SimpleNamespace(get_me=AsyncMock(return_value=SimpleNamespace(username="mbot")))
+        handler = AsyncMock()
+        updates = [_group_update("@mbot /help", 5) for _ in range(3)]
+
+        await asyncio.gather(*(middleware(handler, update, {"bot": bot}) for update in updates))
+
+        bot.get_me.assert_awaited_once()
+        self.assertEqual(
+            [call.args[0].message.text for call in handler.await_args_list], ["/help"] * 3
+        )
+
+    async def test_keeps_mentions_of_other_bots(self):
+        middleware = GroupMentionCommandMiddleware()
+        bot = SimpleNamespace(get_me=AsyncMock(return_value=SimpleNamespace(username="mbot")))
+        update = _group_update("@mbot_other /help", 11)
+        handler = AsyncMock()
+
+        await middleware(handler, update, {"bot": bot})
+
+        handler.assert_awaited_once_with(update, {"bot": bot})
+
+    async def test_messages_without_leading_mention_skip_get_me(self):
+        middleware = GroupMentionCommandMiddleware()
+        bot = SimpleNamespace(get_me=AsyncMock())
+        update = _group_update("hi @mbot", 5, mention_offset=3)
+        handler = AsyncMock()
+
+        await middleware(handler, update, {"bot": bot})
+
+        bot.get_me.assert_not_awaited()
+        handler.assert_awaited_once_with(update, {"bot": bot})
@@ -1,7 +1,9 @@
 import importlib
 import sys
+import tempfile
 import types
 import unittest
+from unittest.mock import patch
 
 
 def _install_matplobblib_stub() -> None:
@@ -39,6 +41,12 @@ class _FakeTranslator:
         }
         return translations.get(key, key)
 
+    def get_template(self, lang, key):
+        return key
+
+    def gettext_many(self, lang, keys):
+        return tuple(self.gettext(lang, key) for key in keys)
+
 
 @unittest.skipUnless(KEYBOARDS_AVAILABLE, "bot keyboard dependencies are not installed")
 class TestTelegramWebAppKeyboards(unittest.IsolatedAsyncioTestCase):
@@ -48,11 +56,27 @@ class TestTelegramWebAppKeyboards(unittest.IsolatedAsyncioTestCase):
         self.original_warning_flag = kb._WEB_APP_URL_WARNING_EMITTED
         kb.translator = _FakeTranslator()
         kb._WEB_APP_URL_WARNING_EMITTED = False
+        kb.help_keyboard_cache.clear()
+        kb.main_reply_keyboard_cache.clear()
+        kb._gt.cache_clear()
+        kb._gt_list.cache_clear()
+        kb._calendar_day_header.cache_clear()
+        kb.language_cache.clear()
+        kb.schedule_type_keyboard_cache.clear()
+        kb.web_apps_keyboard_cache.clear()
 
     def tearDown(self):
         kb.PUBLIC_SITE_URL = self.original_public_site_url
         kb.translator = self.original_translator
         kb._WEB_APP_URL_WARNING_EMITTED = self.original_warning_flag
+        kb.help_keyboard_cache.clear()
+        kb.main_reply_keyboard_cache.clear()
+        kb._gt.cache_clear()
+        kb._gt_list.cache_clear()
+        kb._calendar_day_header.cache_clear()
+        kb.language_cache.clear()
+        kb.schedule_type_keyboard_cache.clear()
+        kb.web_apps_keyboard_cache.clear()
 
     def test_web_app_inline_keyboard_uses_https_public_site_url(self):
         kb.PUBLIC_SITE_URL = "https://example.com"
@@ -88,3 +112,121 @@ class TestTelegramWebAppKeyboards(unittest.IsolatedAsyncioTestCase):
         buttons = [button for row in help_markup.inline_keyboard for button in row]
         self.assertFalse(any(button.web_app for button in buttons))
         self.assertIn("help_btn_matp_all", [button.text for button in buttons])
+
+    async def test_help_keyboard_is_reused_for_same_language(self):
+        kb.PUBLIC_SITE_URL = "https://example.com"
+
+        first = await kb.get_help_inline_keyboard(user_id=123)
+        second = await kb.get_help_inline_keyboard(user_id=456)
+        kb.PUBLIC_SITE_URL = "http://localhost:8080"
+        third = await kb.get_help_inline_keyboard(user_id=123)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+
+    async def test_main_reply_keyboard_is_reused_for_same_language(self):
+        kb.PUBLIC_SITE_URL = "https://example.com"
+
+        first = await kb.get_main_reply_keyboard(user_id=123)
+        second = await kb.get_main_reply_keyboard(user_id=456)
+
+        self.assertIs(first, second)
+        self.assertEqual(
+            [button.text for row in first.keyboard for button in row][-len(kb.BASE_COMMANDS) :],
+            list(kb.BASE_COMMANDS),
+        )
+
+    def test_topics_data_imports_submodule_on_first_lookup(self):
+        submodule = types.ModuleType("matplobblib.fake_topics")
+        submodule.themes_list_dicts_full = {"Topic": {"code_a": "...", "code_b": "..."}}
+        topics = kb.LazyTopicsData()
+
+        with (
+            patch.object(kb.matplobblib, "submodules", ["fake_topics", "broken"]),
+            patch.dict(sys.modules, {"matplobblib.fake_topics": submodule}),
+        ):
+            self.assertEqual(len(topics), 0)
+            entry = topics.get("fake_topics", {})
+            self.assertEqual(topics.get("broken", {}), {})
+            self.assertEqual(topics.get("unknown", {}), {})
+
+        self.assertEqual(entry, {"topics": ["Topic"], "codes": {"Topic": ["code_a", "code_b"]}})
+        self.assertIs(topics["fake_topics"], entry)
+
+    async def test_language_is_cached_per_user_until_invalidated(self):
+        calls = []
+
+        async def get_language(user_id, chat_id=None):
+            calls.append((user_id, chat_id))
+            return "en"
+
+        with patch.object(kb.translator, "get_language", new=get_language):
+            await kb.get_help_inline_keyboard(user_id=123)
+            await kb.get_main_reply_keyboard(user_id=123)
+            kb.invalidate_language_cache(123)
+            await kb.get_help_inline_keyboard(user_id=123)
+
+        self.assertEqual(calls, [(123, None), (123, None)])
+
+    async def test_schedule_type_keyboard_is_cached_only_without_history(self):
+        history = [{"entity_name": "Group A", "entity_type": "group", "entity_id": "1"}]
+
+        first = await kb.get_schedule_type_keyboard("en")
+        second = await kb.get_schedule_type_keyboard("en", history_items=[])
+        with_history = await kb.get_schedule_type_keyboard("en", history)
+
+        self.assertIs(first, second)
+        self.assertIn(
+            "sch_history:group:1",
+            [button.callback_data for row in with_history.inline_keyboard for button in row],
+        )
+
+    def test_calendar_marks_selected_day_and_builds_date_callbacks(self):
+        markup = kb.build_calendar_keyboard(
+            2025, 1, "group", "42", "en", selected_date=kb.date(2025, 1, 7)
+        )
+
+        day_buttons = {
+            button.text: button.callback_data
+            for row in markup.inline_keyboard
+            for button in row
+            if (button.callback_data or "").startswith("sch_date_:")
+        }
+        self.assertEqual(day_buttons["*7*"], "sch_date_:group:42:2025-01-07")
+        self.assertEqual(day_buttons["1"], "sch_date_:group:42:2025-01-01")
+        self.assertEqual(len(day_buttons), 31)
+
+    async def test_help_keyboard_has_one_button_per_command_row(self):
+        kb.PUBLIC_SITE_URL = "http://localhost:8080"
+
+        markup = await kb.get_help_inline_keyboard(user_id=123)
+
+        self.assertTrue(all(len(row) == 1 for row in markup.inline_keyboard))
+        self.assertEqual(
+            [row[0].callback_data for row in markup.inline_keyboard],
+            [f"help_cmd_{cmd}" for cmd in kb.HELP_COMMANDS + ("help",)],
+        )
+
+    def test_path_cache_evicts_oldest_entry_when_full(self):
+        cache = kb.BoundedPathCache(maxsize=2)
+        cache["a"] = "path/a"
+        cache["b"] = "path/b"
+        cache["a"] = "path/a2"
+        cache.update({"c": "path/c"})
+
+        self.assertEqual(cache, {"b": "path/b", "c": "path/c"})
+
+    def test_topics_data_cache_round_trips_as_json_and_ignores_bad_files(self):
+        data = {"fake_topics": {"topics": ["Topic"], "codes": {"Topic": ["code_a"]}}}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = f"{cache_dir}/topics_data.json"
+            kb._store_cached_topics_data(cache_path, data)
+            self.assertEqual(kb._load_cached_topics_data(cache_path), data)
+
+            with open(cache_path, "wb") as f:
+                f.write(b"\x80\x04not json")
+            self.assertIsNone(kb._load_cached_topics_data(cache_path))
+
+            with open(cache_path, "wb") as f:
+                f.write(b'{"fake_topics": {"topics": "bad"}}')
+            self.assertEqual(kb._load_cached_topics_data(cache_path), {})
@@ -54,3 +54,73 @@ class TestLocalizationCompleteness(unittest.TestCase):
             self.assertEqual(translator.gettext("ru", "missing_key"), "_missing_key_")
         finally:
             shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def test_gettext_fast_matches_gettext(self):
+        tmp_path = Path("tests/.tmp_localization_test")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True, exist_ok=True)
+        try:
+            (tmp_path / "en.json").write_text(
+                json.dumps(
+                    {
+                        "dpi": "DPI: {dpi}",
+                        "pair": "{a} of {b} (100%)",
+                        "spec": "{value:.1f} / {value}",
+                        "plain": "{{literal}}",
+                    }
+                ),
+                encoding="utf-8",
+            )
+            (tmp_path / "ru.json").write_text(json.dumps({}), encoding="utf-8")
+
+            translator = Translator(locales_dir=tmp_path, default_lang="en")
+
+            self.assertEqual(translator.gettext_fast("en", "dpi", 300), "DPI: 300")
+            self.assertEqual(
+                translator.gettext_fast("ru", "pair", 1, 2),
+                translator.gettext("ru", "pair", a=1, b=2),
+            )
+            self.assertEqual(translator.gettext_fast("en", "spec", 2.0), "2.0 / 2.0")
+            self.assertEqual(translator.gettext_fast("en", "plain"), "{literal}")
+            self.assertEqual(translator.gettext_fast("en", "missing_key"), "_missing_key_")
+            self.assertEqual(
+                translator.get_template("ru", "dpi").format(dpi=300),
+                translator.gettext("ru", "dpi", dpi=300),
+            )
+            self.assertEqual(
+                translator.gettext_many("ru", ("plain", "missing_key", "dpi")),
+                ("{literal}", "_missing_key_", "DPI: {dpi}"),
+            )
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def test_command_descriptions_are_parsed_once_per_language(self):
+        tmp_path = Path("tests/.tmp_localization_test")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True, exist_ok=True)
+        try:
+            (tmp_path / "en.json").write_text(
+                json.dumps(
+                    {
+                        "help_btn_help": "❓ /help - This help",
+                        "help_btn_latex": "LaTeX",
+                        "command_desc_start": "Start - the bot",
+                    }
+                ),
+                encoding="utf-8",
+            )
+            (tmp_path / "ru.json").write_text(
+                json.dumps({"help_btn_help": "❓ /help - Справка"}), encoding="utf-8"
+            )
+
+            translator = Translator(locales_dir=tmp_path, default_lang="en")
+            descriptions = translator.get_command_descriptions("ru")
+
+            self.assertEqual(
+                descriptions,
+                {"help": "Справка", "latex": "LaTeX", "start": "Start - the bot"},
+            )
+            self.assertIs(translator.get_command_descriptions("ru"), descriptions)
+            self.assertEqual(translator.get_command_descriptions("es")["help"], "This help")
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
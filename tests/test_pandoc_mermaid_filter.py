@@ -0,0 +1,227 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from bot import pandoc_mermaid_filter as mermaid_filter
+
+
+class TestMermaidRenderCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self._tmp.name
+        mermaid_filter.generated_files.clear()
+
+    def tearDown(self):
+        for path in mermaid_filter.generated_files:
+            Path(path).unlink(missing_ok=True)
+        mermaid_filter.generated_files.clear()
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _fake_mmdc(input_path: str, output_path: str, input_text: str | None = None) -> bool:
+        assert input_path == "-" and input_text
+        Path(output_path).write_bytes(b"png")
+        return True
+
+    def test_identical_diagram_is_rendered_once(self):
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(mermaid_filter, "_run_mmdc", side_effect=self._fake_mmdc) as run_mmdc,
+        ):
+            first = mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B")
+            second = mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B")
+            other = mermaid_filter.render_mermaid_to_image_file("graph TD; A-->C")
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(run_mmdc.call_count, 2)
+        self.assertEqual(
+            sorted(p.name for p in Path(self.cache_dir).iterdir()),
+            sorted([Path(first).name, Path(other).name]),
+        )
+        self.assertEqual(mermaid_filter.generated_files, [])
+
+    def test_failed_render_is_not_cached(self):
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(mermaid_filter, "_run_mmdc", return_value=False) as run_mmdc,
+        ):
+            self.assertIsNone(mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B"))
+            self.assertIsNone(mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B"))
+
+        self.assertEqual(run_mmdc.call_count, 2)
+        self.assertEqual(list(Path(self.cache_dir).iterdir()), [])
+
+    @staticmethod
+    def _fake_batch_mmdc(input_path: str, output_path: str, *extra_args: str) -> bool:
+        fences = Path(input_path).read_text(encoding="utf-8").count("```mermaid")
+        stem = output_path.removesuffix(".md")
+        for n in range(1, fences + 1):
+            Path(f"{stem}-{n}.png").write_bytes(b"png")
+        Path(output_path).write_text("", encoding="utf-8")
+        return True
+
+    def test_document_diagrams_render_in_one_mmdc_call(self):
+        def block(code):
+            return {"t": "CodeBlock", "c": [["", ["mermaid"], []], code]}
+
+        doc = {
+            "blocks": [
+                block("graph TD; A-->B"),
+                {"t": "Para", "c": []},
+                block("graph TD; A-->C"),
+                block("graph TD; A-->B"),
+            ]
+        }
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(
+                mermaid_filter, "_run_mmdc", side_effect=self._fake_batch_mmdc
+            ) as run_mmdc,
+        ):
+            mermaid_filter.apply_filter(doc)
+
+        run_mmdc.assert_called_once()
+        self.assertEqual(run_mmdc.call_args.args[2:], ("-e", "png"))
+        image_paths = [
+            block["c"][0]["c"][2][0]
+            for block in doc["blocks"]
+            if block["t"] == "Para" and block["c"]
+        ]
+        self.assertEqual(len(image_paths), 3)
+        self.assertEqual(image_paths[0], image_paths[2])
+        self.assertEqual(len(list(Path(self.cache_dir).iterdir())), 2)
+
+    def test_uncached_diagrams_render_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_mmdc(input_path, output_path, input_text=None):
+            # Both renders must be in flight at once to pass the barrier.
+            barrier.wait()
+            return self._fake_mmdc(input_path, output_path, input_text)
+
+        doc = {
+            "blocks": [
+                {"t": "CodeBlock", "c": [["", ["mermaid"], []], "graph TD; A-->B"]},
+                {"t": "CodeBlock", "c": [["", ["mermaid"], []], "graph TD; A-->C"]},
+            ]
+        }
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(mermaid_filter, "prerender_mermaid_batch"),
+            patch.object(mermaid_filter.os, "cpu_count", return_value=4),
+            patch.object(mermaid_filter, "_run_mmdc", side_effect=fake_mmdc),
+        ):
+            mermaid_filter.apply_filter(doc)
+
+        self.assertEqual([block["t"] for block in doc["blocks"]], ["Para", "Para"])
+
+    def _run_main(self, payload: bytes) -> bytes:
+        stdin = io.TextIOWrapper(io.BytesIO(payload))
+        stdout = io.TextIOWrapper(io.BytesIO())
+        manifest = str(Path(self.cache_dir) / "cleanup.txt")
+        with (
+            patch.object(mermaid_filter.sys, "stdin", stdin),
+            patch.object(mermaid_filter.sys, "stdout", stdout),
+            patch.object(mermaid_filter, "CLEANUP_MANIFEST_FILE", manifest),
+        ):
+            mermaid_filter.main()
+        return stdout.buffer.getvalue()
+
+    def test_document_without_mermaid_is_passed_through_unparsed(self):
+        payload = b'{"blocks":[{"t":"CodeBlock","c":[["",["python"],[]],"x = 1"]}]}'
+
+        with patch.object(mermaid_filter, "apply_filter") as apply_filter:
+            output = self._run_main(payload)
+
+        apply_filter.assert_not_called()
+        self.assertEqual(output, payload)
+
+    def test_document_with_mermaid_is_filtered(self):
+        payload = b'{"blocks":[{"t":"CodeBlock","c":[["",["mermaid"],[]],"graph TD; A-->B"]}]}'
+
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(mermaid_filter, "_run_mmdc", side_effect=self._fake_mmdc),
+        ):
+            output = json.loads(self._run_main(payload))
+
+        self.assertEqual(output["blocks"][0]["t"], "Para")
+
+    def test_uncached_renders_are_listed_in_cleanup_manifest(self):
+        blocker = Path(self.cache_dir) / "not_a_dir"
+        blocker.write_text("", encoding="utf-8")
+        payload = (
+            b'{"blocks":[{"t":"CodeBlock","c":[["",["mermaid"],[]],"graph TD; A-->B"]},'
+            b'{"t":"CodeBlock","c":[["",["mermaid"],[]],"graph TD; A-->C"]}]}'
+        )
+
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", str(blocker / "cache")),
+            patch.object(mermaid_filter, "_run_mmdc", side_effect=self._fake_mmdc),
+        ):
+            self._run_main(payload)
+
+        manifest = (Path(self.cache_dir) / "cleanup.txt").read_text(encoding="utf-8")
+        self.assertEqual(sorted(manifest.splitlines()), sorted(mermaid_filter.generated_files))
+        self.assertEqual(len(mermaid_filter.generated_files), 2)
+
+    def test_mermaid_text_without_mermaid_blocks_is_echoed_verbatim(self):
+        payload = b'{"blocks": [{"t": "Para", "c": [{"t": "Str", "c": "mermaid"}]}]}'
+
+        with patch.object(mermaid_filter, "apply_filter") as apply_filter:
+            output = self._run_main(payload)
+
+        apply_filter.assert_not_called()
+        self.assertEqual(output, payload)
+
+    def test_missing_mmdc_fails_without_spawning(self):
+        with (
+            patch.object(mermaid_filter, "_MMDC_AVAILABLE", False),
+            patch.object(mermaid_filter.subprocess, "run") as run,
+            patch.object(mermaid_filter.sys, "stderr"),
+        ):
+            self.assertFalse(mermaid_filter._run_mmdc("-", "out.png", input_text="graph TD"))
+
+        run.assert_not_called()
+
+    def test_cache_key_ignores_whitespace_and_comments_but_not_directives(self):
+        base = mermaid_filter._cache_path("graph TD\n    A-->B")
+
+        self.assertEqual(base, mermaid_filter._cache_path("\r\ngraph TD  \r\n    A-->B\r\n\r\n"))
+        self.assertEqual(base, mermaid_filter._cache_path("graph TD\n    %% edge\n    A-->B"))
+        self.assertNotEqual(base, mermaid_filter._cache_path("graph TD\n    A-->C"))
+        self.assertNotEqual(
+            base, mermaid_filter._cache_path("%%{init: {'theme': 'dark'}}%%\ngraph TD\n    A-->B")
+        )
+
+    def test_prune_evicts_least_recently_used_renders(self):
+        cache = Path(self.cache_dir)
+        for age, name in enumerate(["newest", "middle", "oldest"]):
+            path = cache / f"{name}.png"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1_000_000 - age, 1_000_000 - age))
+        stale_tmp = cache / "entry.1.2.tmp.png"
+        stale_tmp.write_bytes(b"x")
+        os.utime(stale_tmp, (0, 0))
+
+        with patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir):
+            mermaid_filter.prune_mermaid_cache(max_bytes=250)
+
+        self.assertEqual(sorted(p.name for p in cache.iterdir()), ["middle.png", "newest.png"])
+
+    def test_cache_hit_refreshes_entry_for_pruning(self):
+        with (
+            patch.object(mermaid_filter, "MERMAID_CACHE_DIR", self.cache_dir),
+            patch.object(mermaid_filter, "_run_mmdc", side_effect=self._fake_mmdc),
+        ):
+            path = mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B")
+            os.utime(path, (0, 0))
+            mermaid_filter.render_mermaid_to_image_file("graph TD; A-->B")
+
+        self.assertGreater(os.path.getmtime(path), 0)
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+try:
+    from shared_lib import tasks
+
+    TASKS_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"celery", "PIL", "markdown_it", "mdit_py_plugins", "redis"}:
+        raise
+    TASKS_AVAILABLE = False
+
+
+@unittest.skipUnless(TASKS_AVAILABLE, "worker task dependencies are not installed")
+class TestRenderPdfCleanup(unittest.TestCase):
+    def test_files_listed_by_the_mermaid_filter_are_removed(self):
+        with tempfile.TemporaryDirectory() as render_dir:
+            rendered = Path(render_dir) / "diagram.png"
+            manifests = []
+
+            def fake_run(cmd, **kwargs):
+                if cmd[0] == "pandoc":
+                    rendered.write_bytes(b"png")
+                    manifest = kwargs["env"][tasks.PANDOC_CLEANUP_MANIFEST_ENV]
+                    manifests.append(manifest)
+                    with open(manifest, "a", encoding="utf-8") as f:
+                        f.write(f"{rendered}\n")
+                return subprocess.CompletedProcess(cmd, 1, stdout="", stderr=b"")
+
+            with patch.object(tasks.subprocess, "run", side_effect=fake_run):
+                result = tasks.render_pdf_task.run("# Title", "title", "author", "date")
+
+            self.assertEqual(result["status"], "error")
+            self.assertFalse(rendered.exists())
+            self.assertEqual(len(manifests), 1)
+            self.assertFalse(os.path.exists(manifests[0]))
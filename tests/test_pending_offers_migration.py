@@ -0,0 +1,59 @@
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+try:
+    from shared_lib import redis_client as redis_module
+
+    REDIS_CLIENT_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"redis", "orjson"}:
+        raise
+    REDIS_CLIENT_AVAILABLE = False
+
+
+def _offer(full_name: str, short_name: str) -> str:
+    return json.dumps(
+        {"user_id": 1, "user_name": "U", "full_name": full_name, "short_name": short_name}
+    )
+
+
+@unittest.skipUnless(REDIS_CLIENT_AVAILABLE, "redis client dependencies are not installed")
+class TestLegacyPendingOffersMigration(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = redis_module.RedisClient()
+        self.pipe = MagicMock()
+        self.pipe.execute = AsyncMock()
+        self.pipe.__aenter__ = AsyncMock(return_value=self.pipe)
+        self.pipe.__aexit__ = AsyncMock(return_value=False)
+
+    async def test_legacy_list_is_moved_into_hash_once(self):
+        legacy = [_offer("Full A", "A"), "not json", _offer("Full B", "B")]
+        with (
+            patch.object(self.client.client, "lrange", new=AsyncMock(return_value=legacy)) as lr,
+            patch.object(self.client.client, "pipeline", return_value=self.pipe),
+        ):
+            self.assertEqual(await self.client.migrate_legacy_pending_offers(), 2)
+            self.assertEqual(await self.client.migrate_legacy_pending_offers(), 0)
+
+        lr.assert_awaited_once_with(redis_module.LEGACY_PENDING_SHORTER_OFFERS_KEY, 0, -1)
+        self.assertEqual(
+            [call.args for call in self.pipe.hsetnx.call_args_list],
+            [
+                (
+                    redis_module.PENDING_SHORTER_OFFERS_KEY,
+                    redis_module.pending_offer_id("Full A", "A"),
+                    legacy[0],
+                ),
+                (
+                    redis_module.PENDING_SHORTER_OFFERS_KEY,
+                    redis_module.pending_offer_id("Full B", "B"),
+                    legacy[2],
+                ),
+            ],
+        )
+        self.pipe.delete.assert_called_once_with(
+            redis_module.LEGACY_PENDING_SHORTER_OFFERS_KEY,
+            redis_module.LEGACY_PENDING_SHORTER_OFFERS_INDEX_KEY,
+        )
+        self.pipe.execute.assert_awaited_once()
@@ -0,0 +1,277 @@
+import importlib
+import sys
+import types
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+
+def _install_matplobblib_stub() -> None:
+    if "matplobblib" in sys.modules:
+        return
+
+    stub = types.ModuleType("matplobblib")
+    stub.submodules = []
+    stub._importlib = importlib
+    sys.modules["matplobblib"] = stub
+
+
+_install_matplobblib_stub()
+
+try:
+    from bot.handlers import settings as settings_module
+
+    SETTINGS_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"aiogram", "cachetools", "sqlalchemy", "celery", "redis"}:
+        raise
+    SETTINGS_AVAILABLE = False
+
+
+def _settings(**overrides) -> dict:
+    settings = {
+        "language": "en",
+        "show_docstring": True,
+        "md_display_mode": "md_file",
+        "latex_padding": 15,
+        "latex_dpi": 300,
+    }
+    settings.update(overrides)
+    return settings
+
+
+@unittest.skipUnless(SETTINGS_AVAILABLE, "bot settings dependencies are not installed")
+class TestSettingsKeyboard(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        settings_module.settings_keyboard_cache.clear()
+        settings_module.subscription_list_cache.clear()
+        self.manager = settings_module.SettingsManager(schedule_manager=None, admin_manager=None)
+
+    def tearDown(self):
+        settings_module.settings_keyboard_cache.clear()
+        settings_module.subscription_list_cache.clear()
+
+    @staticmethod
+    def _callback_data(markup) -> list[str]:
+        return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+    async def test_build_from_loaded_settings_does_not_touch_db(self):
+        with patch.object(
+            settings_module, "get_user_settings_and_repo_flag", new=AsyncMock()
+        ) as mocked_fetch:
+            markup = await self.manager._build_settings_keyboard(1, _settings(), False)
+
+        mocked_fetch.assert_not_awaited()
+        self.assertIn("settings_toggle_docstring", self._callback_data(markup))
+        self.assertIn("latex_dpi_incr", self._callback_data(markup))
+
+    async def test_unchanged_settings_reuse_cached_markup(self):
+        first = await self.manager._build_settings_keyboard(1, _settings(), True)
+        second = await self.manager._build_settings_keyboard(1, _settings(), True)
+        changed = await self.manager._build_settings_keyboard(1, _settings(latex_dpi=350), True)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, changed)
+
+    async def test_identical_settings_share_markup_across_users(self):
+        first = await self.manager._build_settings_keyboard(1, _settings(), False)
+        second = await self.manager._build_settings_keyboard(2, _settings(), False)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(settings_module.settings_keyboard_cache), 1)
+
+    async def test_get_settings_keyboard_fetches_once(self):
+        with patch.object(
+            settings_module,
+            "get_user_settings_and_repo_flag",
+            new=AsyncMock(return_value=(_settings(), True)),
+        ) as mocked_fetch:
+            await self.manager.get_settings_keyboard(7)
+
+        mocked_fetch.assert_awaited_once_with(7)
+
+    async def test_latex_dpi_increment_is_clamped(self):
+        callback = SimpleNamespace(
+            data="latex_dpi_incr",
+            from_user=SimpleNamespace(id=5),
+            message=SimpleNamespace(edit_reply_markup=AsyncMock()),
+            answer=AsyncMock(),
+        )
+        with (
+            patch.object(
+                settings_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                settings_module,
+                "get_user_settings_and_repo_flag",
+                new=AsyncMock(return_value=(_settings(latex_dpi=600), False)),
+            ),
+            patch.object(
+                settings_module, "update_user_setting_field", new=AsyncMock()
+            ) as mocked_update,
+        ):
+            await self.manager.cq_change_latex_setting(callback)
+
+        mocked_update.assert_not_awaited()
+        callback.message.edit_reply_markup.assert_not_awaited()
+        callback.answer.assert_awaited_once()
+
+    async def test_markup_already_shown_by_the_message_is_not_resent(self):
+        markup = await self.manager._build_settings_keyboard(5, _settings(), False)
+        changed = await self.manager._build_settings_keyboard(5, _settings(latex_dpi=350), False)
+        # What Telegram reports back for the message, not the object the bot built
+        shown = settings_module.InlineKeyboardMarkup.model_validate_json(markup.model_dump_json())
+
+        def message_showing(reply_markup):
+            return SimpleNamespace(reply_markup=reply_markup, edit_reply_markup=AsyncMock())
+
+        unchanged = message_showing(shown)
+        await self.manager._edit_settings_markup(unchanged, markup)
+        unchanged.edit_reply_markup.assert_not_awaited()
+
+        # Edited to another keyboard elsewhere (or a failed edit): going back must be sent
+        edited_elsewhere = message_showing(changed)
+        await self.manager._edit_settings_markup(edited_elsewhere, markup)
+        edited_elsewhere.edit_reply_markup.assert_awaited_once_with(reply_markup=markup)
+
+        without_markup = message_showing(None)
+        await self.manager._edit_settings_markup(without_markup, markup)
+        without_markup.edit_reply_markup.assert_awaited_once()
+
+    async def test_subscription_callbacks_dispatch_by_prefix(self):
+        callback = SimpleNamespace(data="sub_time:12")
+        state = object()
+        mocked_time, mocked_card = AsyncMock(), AsyncMock()
+        with patch.dict(
+            self.manager._subscription_handlers,
+            {"sub_time": mocked_time, "sub_open": mocked_card},
+        ):
+            await self.manager.cq_subscription_action(callback, state)
+            callback.data = "sub_open:12"
+            await self.manager.cq_subscription_action(callback, state)
+
+        mocked_time.assert_awaited_once_with(callback, state)
+        mocked_card.assert_awaited_once_with(callback)
+        self.assertEqual(settings_module._subscription_op(None), "")
+
+    async def test_subscription_list_page_is_served_from_cache_until_invalidated(self):
+        def make_callback():
+            return SimpleNamespace(
+                data="subs_page:0",
+                from_user=SimpleNamespace(id=9),
+                message=SimpleNamespace(edit_text=AsyncMock()),
+                answer=AsyncMock(),
+            )
+
+        subs = [{"id": 1, "entity_name": "Group A", "is_active": True}]
+        with (
+            patch.object(
+                settings_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                settings_module, "get_user_subscriptions", new=AsyncMock(return_value=(subs, 1))
+            ) as mocked_fetch,
+        ):
+            await self.manager.cq_subs_list(make_callback())
+            await self.manager.cq_subs_list(make_callback())
+            self.assertEqual(mocked_fetch.await_count, 1)
+
+            settings_module.invalidate_subscription_list_cache(9)
+            await self.manager.cq_subs_list(make_callback())
+            self.assertEqual(mocked_fetch.await_count, 2)
+
+    def test_parse_id_and_page_rejects_malformed_data(self):
+        parse = settings_module._parse_id_and_page
+        self.assertEqual(parse("csub_del:12:3"), (12, 3))
+        self.assertIsNone(parse("csub_del:12"))
+        self.assertIsNone(parse("csub_del:abc:3"))
+        self.assertIsNone(parse("csub_del:12:3:4"))
+        self.assertIsNone(parse("csub_del:²:3"))
+
+    async def test_chat_subscription_delete_prompt_looks_up_one_subscription(self):
+        callback = SimpleNamespace(
+            data="csub_del:12:3",
+            from_user=SimpleNamespace(id=5),
+            message=SimpleNamespace(chat=SimpleNamespace(id=-100), edit_text=AsyncMock()),
+            answer=AsyncMock(),
+        )
+        with (
+            patch.object(
+                settings_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                settings_module,
+                "get_subscription_by_id",
+                new=AsyncMock(return_value={"id": 12, "entity_name": "Group A"}),
+            ) as mocked_lookup,
+            patch.object(settings_module, "get_chat_subscriptions", new=AsyncMock()) as list_all,
+        ):
+            await self.manager.cq_delete_chat_subscription_prompt(callback)
+
+        mocked_lookup.assert_awaited_once_with(12, chat_id=-100)
+        list_all.assert_not_awaited()
+        markup = callback.message.edit_text.await_args.kwargs["reply_markup"]
+        self.assertIn("csub_del_confirm:12:3", self._callback_data(markup))
+
+    async def test_chat_subscription_delete_prompt_rejects_foreign_subscription(self):
+        callback = SimpleNamespace(
+            data="csub_del:12:0",
+            from_user=SimpleNamespace(id=5),
+            message=SimpleNamespace(chat=SimpleNamespace(id=-100), edit_text=AsyncMock()),
+            answer=AsyncMock(),
+        )
+        with (
+            patch.object(
+                settings_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                settings_module, "get_subscription_by_id", new=AsyncMock(return_value=None)
+            ),
+        ):
+            await self.manager.cq_delete_chat_subscription_prompt(callback)
+
+        callback.message.edit_text.assert_not_awaited()
+        self.assertTrue(callback.answer.await_args.kwargs["show_alert"])
+
+    async def test_chat_admin_writes_drop_the_owners_subscription_list(self):
+        def make_callback(data):
+            return SimpleNamespace(
+                data=data,
+                from_user=SimpleNamespace(id=5),
+                message=SimpleNamespace(chat=SimpleNamespace(id=-100)),
+                answer=AsyncMock(),
+            )
+
+        owner_id = 77
+        with (
+            patch.object(
+                settings_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                settings_module,
+                "get_subscription_by_id",
+                new=AsyncMock(return_value={"id": 12, "user_id": owner_id}),
+            ) as mocked_lookup,
+            patch.object(
+                settings_module,
+                "toggle_subscription_status",
+                new=AsyncMock(return_value=(False, "Group A")),
+            ),
+            patch.object(
+                settings_module,
+                "remove_schedule_subscription",
+                new=AsyncMock(return_value="Group A"),
+            ),
+            patch.object(self.manager, "_render_chat_subscriptions", new=AsyncMock()),
+        ):
+            settings_module.subscription_list_cache[(owner_id, 0, "en")] = ("text", None)
+            await self.manager.cq_toggle_chat_subscription(make_callback("csub_toggle:12:0"), None)
+            self.assertNotIn((owner_id, 0, "en"), settings_module.subscription_list_cache)
+
+            settings_module.subscription_list_cache[(owner_id, 0, "en")] = ("text", None)
+            await self.manager.cq_confirm_delete_chat_subscription(
+                make_callback("csub_del_confirm:12:0"), None
+            )
+            self.assertNotIn((owner_id, 0, "en"), settings_module.subscription_list_cache)
+
+        self.assertEqual(mocked_lookup.await_args.kwargs, {"chat_id": -100})
@@ -0,0 +1,52 @@
+import re
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+try:
+    from bot.handlers import suggestions as suggestions_module
+
+    SUGGESTIONS_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"aiogram", "sqlalchemy", "redis", "orjson"}:
+        raise
+    SUGGESTIONS_AVAILABLE = False
+
+
+@unittest.skipUnless(SUGGESTIONS_AVAILABLE, "bot suggestion dependencies are not installed")
+class TestShorterNameAdminDecision(unittest.IsolatedAsyncioTestCase):
+    async def test_blocked_user_does_not_keep_offer_pending_or_fail_decision(self):
+        bot = SimpleNamespace(send_message=AsyncMock(side_effect=RuntimeError("bot was blocked")))
+        manager = suggestions_module.SuggestionsManager(bot)
+        callback = SimpleNamespace(
+            from_user=SimpleNamespace(id=1),
+            message=SimpleNamespace(chat=SimpleNamespace(id=1), text="offer"),
+            answer=AsyncMock(),
+        )
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        payload = {"data": "42:Full Name:FN", "messages": [], "suggestion_id": "abc"}
+        decision = re.match(r"(\w+):(\w+)", "decline:" + "0" * 24)
+
+        with (
+            patch.object(
+                suggestions_module.translator, "get_language", new=AsyncMock(return_value="en")
+            ),
+            patch.object(
+                suggestions_module.redis_client, "get_cache", new=AsyncMock(return_value=payload)
+            ),
+            patch.object(
+                suggestions_module.redis_client,
+                "client",
+                new=SimpleNamespace(pipeline=MagicMock(return_value=pipe)),
+            ),
+            patch.object(manager, "_update_admin_messages", new=AsyncMock()) as update_messages,
+        ):
+            await manager.handle_admin_decision(callback, decision)
+
+        pipe.hdel.assert_called_once_with(suggestions_module.PENDING_SHORTER_OFFERS_KEY, "abc")
+        pipe.execute.assert_awaited_once()
+        update_messages.assert_awaited_once()
+        callback.answer.assert_awaited_once_with()
@@ -0,0 +1,87 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+try:
+    from bot import logger as bot_logger
+
+    BOT_LOGGER_AVAILABLE = True
+except ModuleNotFoundError as exc:
+    if exc.name not in {"aiogram", "cachetools", "sqlalchemy", "redis"}:
+        raise
+    BOT_LOGGER_AVAILABLE = False
+
+
+def _row(user_id: int) -> tuple:
+    return (user_id, "user", "User", None, "command", "/start")
+
+
+@unittest.skipUnless(BOT_LOGGER_AVAILABLE, "bot dependencies are not installed")
+class TestUserActionLog(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        bot_logger._action_log_queue = None
+        bot_logger._action_log_flusher = None
+        bot_logger._known_user_ids.clear()
+
+    def tearDown(self):
+        bot_logger._action_log_queue = None
+        bot_logger._action_log_flusher = None
+        bot_logger._known_user_ids.clear()
+
+    async def test_queued_actions_are_written_in_one_batch_on_flush(self):
+        with patch.object(bot_logger, "log_user_actions_batch", new=AsyncMock()) as mocked_write:
+            for user_id in (1, 2, 3):
+                bot_logger._enqueue_user_action(_row(user_id))
+            mocked_write.assert_not_awaited()
+
+            await bot_logger.flush_user_actions()
+
+        mocked_write.assert_awaited_once_with([_row(1), _row(2), _row(3)])
+        self.assertIsNone(bot_logger._action_log_flusher)
+
+    async def test_batches_are_capped_and_a_bad_row_only_loses_itself(self):
+        async def write(rows):
+            if _row(2) in rows:
+                raise OSError("bad row")
+
+        with (
+            patch.object(bot_logger, "ACTION_LOG_BATCH_SIZE", 2),
+            patch.object(
+                bot_logger, "log_user_actions_batch", new=AsyncMock(side_effect=write)
+            ) as mocked_write,
+        ):
+            for user_id in (1, 2, 3):
+                bot_logger._enqueue_user_action(_row(user_id))
+            await bot_logger.flush_user_actions()
+
+        self.assertEqual(
+            [call.args[0] for call in mocked_write.await_args_list],
+            [[_row(1), _row(2)], [_row(1)], [_row(2)], [_row(3)]],
+        )
+
+    async def test_new_user_row_exists_before_handler_writes_settings(self):
+        events = []
+
+        async def ensure_user(user_id, *args):
+            events.append(("ensure_user", user_id))
+
+        async def handler(event, data):
+            # e.g. update_user_settings_db: an UPDATE that needs the users row already
+            events.append(("handler", event.callback_query.from_user.id))
+
+        user = SimpleNamespace(id=7, username="new", full_name="New User")
+        event = SimpleNamespace(
+            message=None, callback_query=SimpleNamespace(from_user=user, data="set_lang_en")
+        )
+        middleware = bot_logger.UserLoggingMiddleware()
+        with (
+            patch.object(bot_logger, "ensure_user_exists", new=AsyncMock(side_effect=ensure_user)),
+            patch.object(bot_logger, "log_user_actions_batch", new=AsyncMock()) as mocked_write,
+        ):
+            await middleware(handler, event, {})
+            await middleware(handler, event, {})
+            mocked_write.assert_not_awaited()
+            await bot_logger.flush_user_actions()
+
+        self.assertEqual(events, [("ensure_user", 7), ("handler", 7), ("handler", 7)])
+        mocked_write.assert_awaited_once()